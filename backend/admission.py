@@ -0,0 +1,204 @@
+from collections import OrderedDict
+from starlette.responses import JSONResponse
+from typing import Optional, Tuple
+import asyncio
+import math
+import os
+import time
+
+# Admission control settings
+ADMISSION_ENABLED = os.environ.get("ADMISSION_ENABLED", "true").lower() in ("1", "true", "yes")
+# Per authenticated user (JWT roll_no)
+USER_RATE_PER_SECOND = float(os.environ.get("USER_RATE_PER_SECOND", "10"))
+USER_RATE_BURST = float(os.environ.get("USER_RATE_BURST", "30"))
+# Per client IP and roll number on /api/auth/login. Keying on both keeps password guessing slow for each
+# account while a whole campus behind one NAT (or every client, seen through a proxy) can still log in at once.
+LOGIN_RATE_PER_SECOND = float(os.environ.get("LOGIN_RATE_PER_SECOND", "1"))
+LOGIN_RATE_BURST = float(os.environ.get("LOGIN_RATE_BURST", "10"))
+# Per client IP across all roll numbers, so one client cycling through accounts is still bounded. Set it for
+# the busiest NAT or proxy address expected (behind a proxy, enable TRUST_FORWARDED_FOR to key on the client).
+LOGIN_IP_RATE_PER_SECOND = float(os.environ.get("LOGIN_IP_RATE_PER_SECOND", "20"))
+LOGIN_IP_RATE_BURST = float(os.environ.get("LOGIN_IP_RATE_BURST", "100"))
+# Use the first X-Forwarded-For address as the client IP. Set this when deployed behind an ingress or
+# reverse proxy that sets the header; otherwise every request appears to come from the proxy's address.
+# Leave it off when clients connect directly, or they can pick their own address.
+TRUST_FORWARDED_FOR = os.environ.get("TRUST_FORWARDED_FOR", "false").lower() in ("1", "true", "yes")
+# Requests doing database work at once per worker, and how many may wait (and for how long) for a slot
+DB_CONCURRENCY_LIMIT = int(os.environ.get("DB_CONCURRENCY_LIMIT", "64"))
+DB_QUEUE_LIMIT = int(os.environ.get("DB_QUEUE_LIMIT", "256"))
+DB_QUEUE_TIMEOUT_SECONDS = float(os.environ.get("DB_QUEUE_TIMEOUT_SECONDS", "0.5"))
+
+# Routes that never touch Mongo per request or hold the connection open: health, metrics, SSE and file downloads
+UNGATED_PATHS = ("/api/health", "/api/health/live", "/api/health/ready", "/metrics", "/api/stream")
+UNGATED_SUFFIXES = ("/download",)
+
+
+def retry_after(seconds: float) -> str:
+    return str(max(1, math.ceil(seconds)))
+
+
+class RateLimiter:
+    """Token buckets, one per key, refilled lazily on each request.
+
+    A bucket is two floats, touched only by the request that uses it. Buckets
+    are kept in last-use order, and the ones at the front that have sat idle
+    long enough to be full again are dropped. That loses nothing, because a
+    fresh bucket starts full, so memory follows the number of recently active
+    keys.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.idle_seconds = burst / rate if rate > 0 else math.inf
+        # key -> [tokens, updated_at]
+        self._buckets = OrderedDict()
+        self.allowed = 0
+        self.rejected = 0
+        self.evicted = 0
+
+    def acquire(self, key: str) -> float:
+        """Take a token for `key`; returns 0 if allowed, otherwise the seconds until one is available."""
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [self.burst, now]
+        else:
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            self._buckets.move_to_end(key)
+        self._evict_idle(now)
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            self.allowed += 1
+            return 0.0
+        self.rejected += 1
+        return (1 - bucket[0]) / self.rate if self.rate > 0 else math.inf
+
+    def _evict_idle(self, now: float) -> None:
+        while self._buckets:
+            key, (_, updated_at) = next(iter(self._buckets.items()))
+            if now - updated_at < self.idle_seconds:
+                return
+            del self._buckets[key]
+            self.evicted += 1
+
+    def stats(self) -> dict:
+        return {
+            "buckets": len(self._buckets),
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "evicted": self.evicted,
+        }
+
+
+class Overloaded(Exception):
+    pass
+
+
+class ConcurrencyGate:
+    """Caps requests doing database work at once; the rest wait briefly in a bounded queue, then get a 503."""
+
+    def __init__(
+        self,
+        limit: int = DB_CONCURRENCY_LIMIT,
+        queue_limit: int = DB_QUEUE_LIMIT,
+        queue_timeout: float = DB_QUEUE_TIMEOUT_SECONDS,
+    ):
+        self.limit = limit
+        self.queue_limit = queue_limit
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(limit)
+        self.in_flight = 0
+        self.waiting = 0
+        self.peak_in_flight = 0
+        self.admitted = 0
+        self.shed = 0
+        self.timeouts = 0
+
+    async def acquire(self) -> None:
+        if self._semaphore.locked():
+            # Turn excess load away at once rather than letting it pile up
+            if self.waiting >= self.queue_limit:
+                self.shed += 1
+                raise Overloaded("Server busy")
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                raise Overloaded("Server busy")
+            finally:
+                self.waiting -= 1
+        else:
+            await self._semaphore.acquire()
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        self.admitted += 1
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "peak_in_flight": self.peak_in_flight,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "timeouts": self.timeouts,
+        }
+
+
+def gated(path: str) -> bool:
+    return path.startswith("/api/") and path not in UNGATED_PATHS and not path.endswith(UNGATED_SUFFIXES)
+
+
+class AdmissionMiddleware:
+    """Holds a gate slot for the whole request on database-bound routes; plain ASGI like MetricsMiddleware."""
+
+    def __init__(self, app, gate: ConcurrencyGate):
+        self.app = app
+        self.gate = gate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS" or not gated(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self.gate.acquire()
+        except Overloaded as e:
+            response = JSONResponse(
+                {"detail": str(e)}, status_code=503, headers={"Retry-After": retry_after(self.gate.queue_timeout)}
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.gate.release()
+
+
+def client_ip(headers, client: Optional[Tuple[str, int]]) -> str:
+    if TRUST_FORWARDED_FOR:
+        forwarded = headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",", 1)[0].strip()
+    return client[0] if client else "unknown"
+
+
+def login_key(headers, client: Optional[Tuple[str, int]], roll_no: str) -> str:
+    return f"{client_ip(headers, client)}|{roll_no}"
+
+
+def login_wait(headers, client: Optional[Tuple[str, int]], roll_no: str) -> float:
+    """Seconds until this login attempt may go ahead; 0 admits it against both login limiters."""
+    return login_ip_limiter.acquire(client_ip(headers, client)) or login_limiter.acquire(login_key(headers, client, roll_no))
+
+
+user_limiter = RateLimiter(USER_RATE_PER_SECOND, USER_RATE_BURST)
+login_limiter = RateLimiter(LOGIN_RATE_PER_SECOND, LOGIN_RATE_BURST)
+login_ip_limiter = RateLimiter(LOGIN_IP_RATE_PER_SECOND, LOGIN_IP_RATE_BURST)
+db_gate = ConcurrencyGate()
@@ -0,0 +1,191 @@
+from datetime import datetime, timedelta, timezone
+from pymongo import ASCENDING, ReplaceOne, UpdateOne
+from typing import Dict, List, Optional
+import asyncio
+import os
+
+from change_log import allocate_sequence, record_deletes
+from database import acquire_lock, db
+from response_cache import response_cache
+from search_index import search_index
+
+# Archival settings
+ARCHIVE_ENABLED = os.environ.get("ARCHIVE_ENABLED", "true").lower() in ("1", "true", "yes")
+ARCHIVE_INTERVAL_SECONDS = float(os.environ.get("ARCHIVE_INTERVAL_SECONDS", "600"))
+ARCHIVE_BATCH_SIZE = int(os.environ.get("ARCHIVE_BATCH_SIZE", "500"))
+# Notices move to the archive this long after their date, events this long after they took place
+NOTICE_RETENTION_DAYS = int(os.environ.get("NOTICE_RETENTION_DAYS", "180"))
+EVENT_RETENTION_DAYS = int(os.environ.get("EVENT_RETENTION_DAYS", "30"))
+
+RETENTION_DAYS = {"notices": NOTICE_RETENTION_DAYS, "events": EVENT_RETENTION_DAYS}
+# Formats tried, after ISO 8601, for dates stored as free-form strings
+DATE_FORMATS = ("%d-%m-%Y", "%d/%m/%Y", "%B %d, %Y", "%b %d, %Y", "%d %B %Y", "%d %b %Y")
+OLDEST_FIRST = [("date", ASCENDING)]
+
+
+def archive_name(collection_name: str) -> str:
+    return f"{collection_name}_archive"
+
+
+def naive_utc(value: datetime) -> datetime:
+    """The same instant as a naive UTC datetime, which is how dates are stored and compared."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def parse_date(value: str) -> Optional[datetime]:
+    """Read a legacy string date as a naive UTC datetime, the way Mongo hands dates back."""
+    value = value.strip()
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        for date_format in DATE_FORMATS:
+            try:
+                return datetime.strptime(value, date_format)
+            except ValueError:
+                continue
+        return None
+    return naive_utc(parsed)
+
+
+async def move_to_archive(collection_name: str, batch: List[dict], fields: Optional[dict] = None, database=db) -> None:
+    """Copy documents into the archive (keyed by _id, so a repeated batch is harmless), tombstone, then delete."""
+    archived_at = datetime.utcnow()
+    await database[archive_name(collection_name)].bulk_write([
+        ReplaceOne({"_id": doc["_id"]}, {**doc, **(fields or {}), "archived_at": archived_at}, upsert=True)
+        for doc in batch
+    ], ordered=False)
+    ids = [doc["id"] for doc in batch if doc.get("id")]
+    await record_deletes(collection_name, ids, database)
+    await database[collection_name].delete_many({"_id": {"$in": [doc["_id"] for doc in batch]}})
+    await response_cache.mark_changed(collection_name, database=database)
+    search_index.remove(collection_name, ids)
+
+
+async def migrate_dates(database=db, batch_size: int = ARCHIVE_BATCH_SIZE) -> Dict[str, dict]:
+    """Convert string dates from before dates were typed, in batches.
+
+    Converted documents get a new change sequence, so delta sync clients pick up
+    the typed value. Documents whose date cannot be parsed would never match a
+    date range or a page cursor, nor expire, so they are quarantined in the
+    archive with date_unparsed set, keeping the original string, and reported.
+    """
+    report = {}
+    for name in RETENTION_DAYS:
+        migrated, quarantined = 0, []
+        last_id = None
+        while True:
+            query = {"date": {"$type": "string"}}
+            if last_id is not None:
+                query["_id"] = {"$gt": last_id}
+            batch = await database[name].find(query, {"_id": 1, "id": 1, "date": 1}).sort("_id", ASCENDING).to_list(
+                length=batch_size
+            )
+            if not batch:
+                break
+            last_id = batch[-1]["_id"]
+            parsed, unparsed = [], []
+            for doc in batch:
+                value = parse_date(doc["date"])
+                if value is None:
+                    unparsed.append(doc)
+                else:
+                    parsed.append((doc, value))
+            if parsed:
+                sequence = await allocate_sequence(len(parsed), database)
+                changed_at = datetime.utcnow()
+                await database[name].bulk_write([
+                    # Matching the old value skips documents rewritten since they were read
+                    UpdateOne(
+                        {"_id": doc["_id"], "date": doc["date"]},
+                        {"$set": {"date": value, "seq": seq, "changed_at": changed_at}},
+                    )
+                    for (doc, value), seq in zip(parsed, sequence)
+                ], ordered=False)
+                migrated += len(parsed)
+            if unparsed:
+                documents = await database[name].find(
+                    {"_id": {"$in": [doc["_id"] for doc in unparsed]}, "date": {"$type": "string"}}
+                ).to_list(length=None)
+                if documents:
+                    await move_to_archive(name, documents, {"date_unparsed": True}, database)
+                    quarantined += [doc.get("id") for doc in documents]
+        report[name] = {"migrated": migrated, "quarantined": quarantined}
+    return report
+
+
+class Archiver:
+    """Moves notices and events past their retention into <name>_archive collections.
+
+    A pass takes a lease on the locks collection, so only one worker archives at
+    a time. Each batch goes through move_to_archive: copied into the archive,
+    tombstoned for delta sync, then deleted from the hot collection. The hot
+    collections therefore only ever hold recent content.
+    """
+
+    def __init__(self, batch_size: int = ARCHIVE_BATCH_SIZE, enabled: bool = ARCHIVE_ENABLED):
+        self.batch_size = batch_size
+        self.enabled = enabled
+        self.archived: Dict[str, int] = {name: 0 for name in RETENTION_DAYS}
+        self.passes = 0
+        self.last_pass_at: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def archive_expired(self, collection_name: str, cutoff: datetime, database=db) -> int:
+        hot = database[collection_name]
+        moved = 0
+        while True:
+            batch: List[dict] = await hot.find({"date": {"$lt": cutoff}}).sort(OLDEST_FIRST).to_list(
+                length=self.batch_size
+            )
+            if not batch:
+                break
+            await move_to_archive(collection_name, batch, database=database)
+            moved += len(batch)
+            if len(batch) < self.batch_size:
+                break
+        self.archived[collection_name] += moved
+        return moved
+
+    async def run_once(self, database=db) -> Dict[str, int]:
+        if not await acquire_lock("archiver", ARCHIVE_INTERVAL_SECONDS, database):
+            return {}
+        now = datetime.utcnow()
+        moved = {}
+        for name, days in RETENTION_DAYS.items():
+            moved[name] = await self.archive_expired(name, now - timedelta(days=days), database)
+        self.passes += 1
+        self.last_pass_at = now
+        return moved
+
+    async def _archive_loop(self) -> None:
+        while True:
+            await asyncio.sleep(ARCHIVE_INTERVAL_SECONDS)
+            try:
+                moved = await self.run_once()
+            except Exception as e:
+                print(f"Archival failed: {e}")
+                continue
+            if any(moved.values()):
+                print(f"Archived: {moved}")
+
+    def start(self) -> None:
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._archive_loop())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "passes": self.passes,
+            "last_pass_at": self.last_pass_at.isoformat() if self.last_pass_at else None,
+            "archived": dict(self.archived),
+        }
+
+
+archiver = Archiver()
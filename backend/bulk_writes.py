@@ -0,0 +1,71 @@
+from pydantic import BaseModel, ValidationError
+from pymongo.errors import BulkWriteError
+from typing import Any, List, Tuple, Type
+import os
+import uuid
+
+from change_log import stamp
+
+# Batch write settings
+BULK_MAX_ITEMS = int(os.environ.get("BULK_MAX_ITEMS", "1000"))
+
+
+class BatchTooLarge(Exception):
+    pass
+
+
+def validate_items(items: List[Any], model: Type[BaseModel]) -> Tuple[List[Tuple[int, dict]], List[dict]]:
+    """Validate every item in one pass; return (index, document) pairs and the failures."""
+    documents = []
+    failures = []
+    for index, item in enumerate(items):
+        try:
+            document = model.model_validate(item).model_dump()
+        except ValidationError as e:
+            messages = [f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()]
+            failures.append({"index": index, "status": "invalid", "errors": messages})
+            continue
+        document["id"] = str(uuid.uuid4())
+        documents.append((index, document))
+    return documents, failures
+
+
+async def insert_items(
+    collection, items: List[Any], model: Type[BaseModel], sequenced: bool = False, max_items: int = BULK_MAX_ITEMS
+):
+    """Validate and insert a batch with one unordered insert_many; `sequenced` stamps delta sync sequences.
+
+    Returns (report, created) where report has a result per input item and created
+    holds the inserted documents, for the caller to invalidate caches and notify once.
+    """
+    if len(items) > max_items:
+        raise BatchTooLarge(f"At most {max_items} items per request")
+
+    documents, results = validate_items(items, model)
+    failed = {}
+    if documents:
+        if sequenced:
+            await stamp([document for _, document in documents])
+        try:
+            # insert_many adds _id to the documents it is given, so pass copies
+            await collection.insert_many([dict(document) for _, document in documents], ordered=False)
+        except BulkWriteError as e:
+            for write_error in e.details.get("writeErrors", []):
+                failed[write_error["index"]] = write_error.get("errmsg", "write failed")
+
+    created = []
+    for position, (index, document) in enumerate(documents):
+        if position in failed:
+            results.append({"index": index, "status": "failed", "error": failed[position]})
+        else:
+            results.append({"index": index, "status": "created", "id": document["id"]})
+            created.append(document)
+    results.sort(key=lambda result: result["index"])
+    report = {
+        "received": len(items),
+        "created": len(created),
+        "invalid": len(items) - len(documents),
+        "failed": len(failed),
+        "results": results,
+    }
+    return report, created
@@ -0,0 +1,169 @@
+from datetime import datetime, timedelta
+from pymongo import ASCENDING, ReturnDocument, UpdateOne
+from typing import Dict, List, Optional, Tuple
+import base64
+import json
+import os
+import time
+
+from database import db
+
+# Delta sync settings
+SYNC_MAX_CHANGES = int(os.environ.get("SYNC_MAX_CHANGES", "1000"))
+# Tokens only move past changes at least this old, so slower in-flight writes with lower sequence numbers are not skipped
+SYNC_SETTLE_SECONDS = float(os.environ.get("SYNC_SETTLE_SECONDS", "5"))
+# Tombstones are kept this long; older tokens get a full resync
+SYNC_TOMBSTONE_DAYS = int(os.environ.get("SYNC_TOMBSTONE_DAYS", "30"))
+
+SYNC_COLLECTIONS = ("notices", "events", "resources")
+SEQUENCE_SORT = [("seq", ASCENDING)]
+# Written by stamp(); internal to delta sync, so left out of every other response
+CHANGE_FIELDS = ("seq", "changed_at")
+
+
+class InvalidSyncToken(ValueError):
+    pass
+
+
+def encode_token(seq: int, issued_at: float) -> str:
+    raw = json.dumps([seq, int(issued_at)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_token(token: str) -> Tuple[int, float]:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        seq, issued_at = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise InvalidSyncToken("Invalid sync token")
+    if not isinstance(seq, int) or not isinstance(issued_at, int):
+        raise InvalidSyncToken("Invalid sync token")
+    return seq, issued_at
+
+
+async def allocate_sequence(count: int = 1, database=db) -> range:
+    """Reserve `count` consecutive sequence numbers shared by every synced collection."""
+    counter = await database.counters.find_one_and_update(
+        {"_id": "changes"},
+        {"$inc": {"seq": count}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    return range(counter["seq"] - count + 1, counter["seq"] + 1)
+
+
+async def stamp(documents: List[dict], database=db) -> List[dict]:
+    """Give documents about to be written their change sequence.
+
+    The sequence lives in the document itself, so the insert or update that
+    carries it records the change atomically, without a transaction.
+    """
+    if documents:
+        changed_at = datetime.utcnow()
+        for document, seq in zip(documents, await allocate_sequence(len(documents), database)):
+            document["seq"] = seq
+            document["changed_at"] = changed_at
+    return documents
+
+
+def without_change_fields(document: dict) -> dict:
+    return {key: value for key, value in document.items() if key not in CHANGE_FIELDS}
+
+
+async def record_deletes(collection_name: str, ids: List[str], database=db) -> None:
+    """Write tombstones for documents that are about to be deleted.
+
+    Call this before deleting. If the delete then fails, a client drops an item
+    that still exists until its next full sync; the other order could lose the
+    delete altogether.
+    """
+    if not ids:
+        return
+    changed_at = datetime.utcnow()
+    expires_at = changed_at + timedelta(days=SYNC_TOMBSTONE_DAYS)
+    sequence = await allocate_sequence(len(ids), database)
+    await database.tombstones.insert_many([
+        {"seq": seq, "collection": collection_name, "id": item_id, "changed_at": changed_at, "expires_at": expires_at}
+        for item_id, seq in zip(ids, sequence)
+    ])
+
+
+async def backfill_sequence(database=db, batch_size: int = 1000) -> int:
+    """Stamp documents written before delta sync existed, so a full sync includes them."""
+    stamped = 0
+    for name in SYNC_COLLECTIONS:
+        while True:
+            batch = await database[name].find({"seq": {"$exists": False}}, {"_id": 1}).to_list(length=batch_size)
+            if not batch:
+                break
+            sequence = await allocate_sequence(len(batch), database)
+            changed_at = datetime.utcnow()
+            await database[name].bulk_write([
+                UpdateOne({"_id": doc["_id"], "seq": {"$exists": False}}, {"$set": {"seq": seq, "changed_at": changed_at}})
+                for doc, seq in zip(batch, sequence)
+            ], ordered=False)
+            stamped += len(batch)
+    return stamped
+
+
+async def read_changes(
+    since: int, limit: int = SYNC_MAX_CHANGES, tombstones: bool = True, projection: Optional[dict] = None, database=db
+) -> Tuple[List[tuple], bool]:
+    """Up to `limit` changes with a sequence above `since`, oldest first, and whether more remain.
+
+    Entries are (seq, collection, "upsert" | "delete", document or tombstone).
+    Each collection is read through its seq index, so the cost follows the number
+    of changes, not the collection size.
+    """
+    query = {"seq": {"$gt": since}}
+    projection = projection or {"_id": 0}
+    entries = []
+    for name in SYNC_COLLECTIONS:
+        async for doc in database[name].find(query, projection).sort(SEQUENCE_SORT).limit(limit + 1):
+            entries.append((doc["seq"], name, "upsert", doc))
+    if tombstones:
+        async for doc in database.tombstones.find(query, {"_id": 0}).sort(SEQUENCE_SORT).limit(limit + 1):
+            entries.append((doc["seq"], doc["collection"], "delete", doc))
+    entries.sort(key=lambda entry: entry[0])
+    return entries[:limit], len(entries) > limit
+
+
+def settled_through(entries: List[tuple], since: int) -> int:
+    """The sequence a reader can safely continue from: the end of the settled prefix of `entries`.
+
+    More recent entries are read again next time, so slower in-flight writes with
+    lower sequence numbers are not skipped.
+    """
+    settled_before = datetime.utcnow() - timedelta(seconds=SYNC_SETTLE_SECONDS)
+    for seq, _, _, doc in entries:
+        if doc["changed_at"] > settled_before:
+            break
+        since = seq
+    return since
+
+
+async def changes_since(token: Optional[str], limit: int = SYNC_MAX_CHANGES, database=db) -> dict:
+    """Everything that changed after `token`, oldest first, plus the token to send next time."""
+    since, reset = 0, True
+    if token:
+        since, issued_at = decode_token(token)
+        reset = issued_at < time.time() - SYNC_TOMBSTONE_DAYS * 86400
+        if reset:
+            since = 0
+
+    entries, truncated = await read_changes(since, limit, tombstones=not reset, database=database)
+    next_seq = settled_through(entries, since)
+
+    changes: Dict[str, dict] = {name: {"upserted": [], "deleted": []} for name in SYNC_COLLECTIONS}
+    for _, name, op, doc in entries:
+        if op == "upsert":
+            changes[name]["upserted"].append(doc)
+        else:
+            changes[name]["deleted"].append(doc["id"])
+    return {
+        "token": encode_token(next_seq, time.time()),
+        "reset": reset,
+        # Only worth calling straight back if the token moved; otherwise wait for the batch to settle
+        "has_more": truncated and next_seq > since,
+        "changes": changes,
+    }
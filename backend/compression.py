@@ -0,0 +1,135 @@
+from typing import Optional
+import gzip
+import os
+
+# Response compression settings
+COMPRESSION_ENABLED = os.environ.get("COMPRESSION_ENABLED", "true").lower() in ("1", "true", "yes")
+COMPRESSION_MIN_BYTES = int(os.environ.get("COMPRESSION_MIN_BYTES", "1024"))
+# Per-request compression favours speed; cached bodies are compressed once per version, so they can afford more
+GZIP_LEVEL = int(os.environ.get("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.environ.get("BROTLI_QUALITY", "4"))
+GZIP_CACHED_LEVEL = int(os.environ.get("GZIP_CACHED_LEVEL", "9"))
+BROTLI_CACHED_QUALITY = int(os.environ.get("BROTLI_CACHED_QUALITY", "9"))
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Preferred first
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+COMPRESSIBLE_TYPES = (
+    "application/json", "application/x-ndjson", "application/javascript", "text/",
+)
+
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick the best encoding we support from an Accept-Encoding header, or None for identity."""
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip()] = quality
+    wildcard = accepted.get("*", 0.0)
+    for encoding in ENCODINGS:
+        if accepted.get(encoding, wildcard) > 0:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: str, cached: bool = False) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_CACHED_QUALITY if cached else BROTLI_QUALITY)
+    # mtime=0 keeps the output (and so cached ETags) identical for identical input
+    return gzip.compress(body, compresslevel=GZIP_CACHED_LEVEL if cached else GZIP_LEVEL, mtime=0)
+
+
+def variant_etag(etag: str, encoding: str) -> str:
+    """ETag of the `encoding` representation of a response whose identity ETag is `etag`."""
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def is_compressible(content_type: str) -> bool:
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    """Compresses complete responses per request; plain ASGI like MetricsMiddleware.
+
+    Responses that already carry a Content-Encoding (the precompressed bodies from
+    the response cache) are left alone. So are streamed responses, such as SSE and
+    NDJSON exports, and anything that is or may be answered by byte range (file
+    downloads): a range is taken from the identity body, so a compressed body
+    would no longer match Content-Range. A compressed response gets its own
+    strong ETag, derived from the identity one the same way as in the response cache.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = None
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                encoding = negotiate(value.decode("latin-1"))
+                break
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+
+        async def send_wrapper(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if start_message is None:
+                await send(message)
+                return
+            start, start_message = start_message, None
+            headers = dict((name.lower(), value) for name, value in start["headers"])
+            body = message.get("body", b"")
+            if (
+                message["type"] != "http.response.body"
+                or message.get("more_body", False)
+                or start["status"] == 206
+                or b"content-encoding" in headers
+                or b"content-range" in headers
+                or b"accept-ranges" in headers
+                or len(body) < self.minimum_size
+                or not is_compressible(headers.get(b"content-type", b"").decode("latin-1"))
+            ):
+                await send(start)
+                await send(message)
+                return
+            compressed = compress(body, encoding)
+            raw_headers = [
+                (name, value) for name, value in start["headers"]
+                if name.lower() not in (b"content-length", b"vary", b"etag")
+            ]
+            vary = headers.get(b"vary")
+            raw_headers += [
+                (b"content-encoding", encoding.encode()),
+                (b"content-length", str(len(compressed)).encode()),
+                (b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"),
+            ]
+            etag = headers.get(b"etag")
+            if etag:
+                raw_headers.append((b"etag", variant_etag(etag.decode("latin-1"), encoding).encode("latin-1")))
+            await send({**start, "headers": raw_headers})
+            await send({**message, "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,227 @@
+from datetime import datetime, timedelta
+from pymongo import monitoring
+from pymongo.errors import DuplicateKeyError
+from typing import AsyncIterator, Optional, List
+import os
+import socket
+import time
+
+from metrics import METRICS_ENABLED, mongo_listener
+
+# Environment variables
+MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
+DB_NAME = os.environ.get("DB_NAME", "test_database")
+
+# Connection pool settings (per worker process)
+MONGO_MAX_POOL_SIZE = int(os.environ.get("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.environ.get("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_MAX_IDLE_TIME_MS = int(os.environ.get("MONGO_MAX_IDLE_TIME_MS", "60000"))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.environ.get("MONGO_WAIT_QUEUE_TIMEOUT_MS", "10000"))
+# Fail fast when Mongo is unreachable instead of the driver's 20s/30s defaults
+MONGO_CONNECT_TIMEOUT_MS = int(os.environ.get("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Connection pool counters for the readiness probe; called on the driver's threads."""
+
+    def __init__(self):
+        self.open = 0
+        self.checked_out = 0
+        self.waiting = 0
+        self.check_out_failures = 0
+        self.cleared = 0
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self.cleared += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self.open += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self.open -= 1
+
+    def connection_check_out_started(self, event):
+        self.waiting += 1
+
+    def connection_check_out_failed(self, event):
+        self.waiting -= 1
+        self.check_out_failures += 1
+
+    def connection_checked_out(self, event):
+        self.waiting -= 1
+        self.checked_out += 1
+
+    def connection_checked_in(self, event):
+        self.checked_out -= 1
+
+    def stats(self) -> dict:
+        return {
+            "max_size": MONGO_MAX_POOL_SIZE,
+            "min_size": MONGO_MIN_POOL_SIZE,
+            "open": self.open,
+            "checked_out": self.checked_out,
+            "waiting": self.waiting,
+            "check_out_failures": self.check_out_failures,
+            "cleared": self.cleared,
+        }
+
+
+pool_monitor = PoolMonitor()
+_client = None
+
+
+def get_client():
+    """The process's motor client, created on first use.
+
+    Importing the backend therefore opens nothing and costs nothing, and the
+    client is created on the event loop that uses it. Motor connects in the
+    background on the first operation.
+    """
+    global _client
+    if _client is None:
+        # Looked up here so that tools can swap in another client class before first use
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        listeners = [pool_monitor, mongo_listener] if METRICS_ENABLED else [pool_monitor]
+        _client = AsyncIOMotorClient(
+            MONGO_URL,
+            maxPoolSize=MONGO_MAX_POOL_SIZE,
+            minPoolSize=MONGO_MIN_POOL_SIZE,
+            maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+            waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+            connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+            serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            event_listeners=listeners,
+        )
+    return _client
+
+
+def close_client() -> None:
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+
+
+class LazyDatabase:
+    """Stands in for the motor database; attribute and item access go to the real one, created on first use."""
+
+    def __getattr__(self, name: str):
+        return getattr(get_client()[DB_NAME], name)
+
+    def __getitem__(self, name: str):
+        return get_client()[DB_NAME][name]
+
+
+class LazyCollection:
+    """Stands in for a motor collection until first use, so modules can bind collections at import time."""
+
+    __slots__ = ("_name", "_collection")
+
+    def __init__(self, name: str):
+        self._name = name
+        self._collection = None
+
+    def __getattr__(self, attribute: str):
+        if self._collection is None:
+            self._collection = db[self._name]
+        return getattr(self._collection, attribute)
+
+    def __repr__(self) -> str:
+        return f"LazyCollection({self._name!r})"
+
+
+db = LazyDatabase()
+
+# Collections
+users_collection = LazyCollection("users")
+notices_collection = LazyCollection("notices")
+events_collection = LazyCollection("events")
+timetables_collection = LazyCollection("timetables")
+resources_collection = LazyCollection("resources")
+faculty_collection = LazyCollection("faculty")
+
+# Default projection for documents returned by the API; the delta sync bookkeeping is only sent by /api/sync
+PUBLIC_PROJECTION = {"_id": 0, "seq": 0, "changed_at": 0}
+
+
+# Data access helpers
+async def find_one(collection, query: dict, projection: Optional[dict] = None) -> Optional[dict]:
+    return await collection.find_one(query, projection)
+
+
+async def find_all(
+    collection,
+    query: Optional[dict] = None,
+    projection: Optional[dict] = PUBLIC_PROJECTION,
+    sort: Optional[list] = None,
+    limit: int = 0,
+) -> List[dict]:
+    cursor = collection.find(query or {}, projection)
+    if sort:
+        cursor = cursor.sort(sort)
+    if limit:
+        cursor = cursor.limit(limit)
+    return await cursor.to_list(length=None)
+
+
+async def iter_batches(
+    collection,
+    query: Optional[dict] = None,
+    projection: Optional[dict] = PUBLIC_PROJECTION,
+    sort: Optional[list] = None,
+    batch_size: int = 500,
+) -> AsyncIterator[List[dict]]:
+    """Yield a query's documents one driver batch at a time, never holding the whole result."""
+    cursor = collection.find(query or {}, projection, batch_size=batch_size)
+    if sort:
+        cursor = cursor.sort(sort)
+    while True:
+        batch = await cursor.to_list(length=batch_size)
+        if not batch:
+            return
+        yield batch
+
+
+async def insert_one(collection, document: dict) -> str:
+    result = await collection.insert_one(document)
+    return str(result.inserted_id)
+
+
+
+async def acquire_lock(lock_id: str, ttl_seconds: float, database=db) -> bool:
+    """Take a named lease in the locks collection; False while another process holds a live one."""
+    now = datetime.utcnow()
+    lock = {
+        "owner": f"{socket.gethostname()}:{os.getpid()}",
+        "expires_at": now + timedelta(seconds=ttl_seconds),
+    }
+    try:
+        await database.locks.insert_one({"_id": lock_id, **lock})
+        return True
+    except DuplicateKeyError:
+        result = await database.locks.update_one(
+            {"_id": lock_id, "expires_at": {"$lt": now}},
+            {"$set": lock},
+        )
+        return result.modified_count == 1
+
+
+async def ping() -> float:
+    """Round trip to Mongo in seconds; raises if no server can be selected in time."""
+    start = time.perf_counter()
+    await db.command("ping")
+    return time.perf_counter() - start
@@ -0,0 +1,126 @@
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+from typing import Dict, List, Mapping
+
+from database import db
+
+# Sort orders used by the list routes; each one is served by an index below
+TIMETABLE_SORT = [("semester", ASCENDING), ("section", ASCENDING)]
+RESOURCES_SORT = [("semester", ASCENDING)]
+FACULTY_SORT = [("name", ASCENDING)]
+
+# Index registry: collection name -> indexes every query pattern of the API relies on
+INDEX_REGISTRY: Dict[str, List[IndexModel]] = {
+    "users": [
+        # login and get_current_user
+        IndexModel([("roll_no", ASCENDING)], name="roll_no_unique", unique=True),
+    ],
+    "notices": [
+        # keyset pagination and from/to ranges in get_notices; oldest-first scans in the archiver
+        IndexModel([("date", DESCENDING), ("id", DESCENDING)], name="date_id"),
+        IndexModel([("id", ASCENDING)], name="id"),
+        # seeding natural key
+        IndexModel([("title", ASCENDING), ("date", ASCENDING)], name="title_date"),
+        # delta sync
+        IndexModel([("seq", ASCENDING)], name="seq"),
+    ],
+    "events": [
+        IndexModel([("date", DESCENDING), ("id", DESCENDING)], name="date_id"),
+        IndexModel([("id", ASCENDING)], name="id"),
+        IndexModel([("title", ASCENDING), ("date", ASCENDING)], name="title_date"),
+        IndexModel([("seq", ASCENDING)], name="seq"),
+    ],
+    "notices_archive": [
+        # archived notices keep their identity and stay browsable by date
+        IndexModel([("id", ASCENDING)], name="id"),
+        IndexModel([("date", DESCENDING), ("id", DESCENDING)], name="date_id"),
+    ],
+    "events_archive": [
+        IndexModel([("id", ASCENDING)], name="id"),
+        IndexModel([("date", DESCENDING), ("id", DESCENDING)], name="date_id"),
+    ],
+    "timetables": [
+        # student filter and admin ordering in get_timetable; also the seeding natural key
+        IndexModel(
+            [("semester", ASCENDING), ("section", ASCENDING), ("day", ASCENDING), ("time", ASCENDING)],
+            name="semester_section_day_time",
+        ),
+        IndexModel([("id", ASCENDING)], name="id"),
+    ],
+    "resources": [
+        # student filter and admin ordering in get_resources
+        IndexModel([("semester", ASCENDING)], name="semester"),
+        IndexModel([("id", ASCENDING)], name="id"),
+        IndexModel([("seq", ASCENDING)], name="seq"),
+    ],
+    "faculty": [
+        IndexModel([("name", ASCENDING)], name="name"),
+        IndexModel([("id", ASCENDING)], name="id"),
+        # seeding natural key
+        IndexModel([("email", ASCENDING)], name="email"),
+    ],
+    "tombstones": [
+        # deletes in delta sync, kept for SYNC_TOMBSTONE_DAYS
+        IndexModel([("seq", ASCENDING)], name="seq"),
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+    "revoked_tokens": [
+        # revocations disappear once the tokens they cover have expired
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+        # incremental polling in RevocationList.sync
+        IndexModel([("revoked_at", ASCENDING)], name="revoked_at"),
+    ],
+    "refresh_families": [
+        # a family goes once its newest refresh token has expired
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+}
+
+
+def _index_options(spec: dict) -> dict:
+    # IndexModel stores keys as a SON, index_information() as a list of pairs
+    key = spec["key"].items() if isinstance(spec["key"], Mapping) else spec["key"]
+    return {
+        "key": [(field, int(direction)) for field, direction in key],
+        "unique": bool(spec.get("unique", False)),
+    }
+
+
+async def ensure_indexes(database=db) -> None:
+    """Create every declared index. create_indexes is a no-op for indexes that already exist."""
+    for collection_name, models in INDEX_REGISTRY.items():
+        try:
+            await database[collection_name].create_indexes(models)
+        except OperationFailure as e:
+            print(f"Index creation failed on {collection_name}: {e}")
+
+
+async def index_drift(database=db) -> dict:
+    """Compare declared indexes against the ones that exist in the database.
+
+    Returns {collection: {"missing": [...], "unexpected": [...], "mismatched": [...]}}
+    for collections that drifted; an empty dict means everything matches.
+    """
+    drift = {}
+    for collection_name, models in INDEX_REGISTRY.items():
+        existing = await database[collection_name].index_information()
+        existing.pop("_id_", None)
+        declared = {m.document["name"]: _index_options(m.document) for m in models}
+        actual = {name: _index_options(spec) for name, spec in existing.items()}
+
+        report = {
+            "missing": sorted(set(declared) - set(actual)),
+            "unexpected": sorted(set(actual) - set(declared)),
+            "mismatched": sorted(n for n in set(declared) & set(actual) if declared[n] != actual[n]),
+        }
+        if any(report.values()):
+            drift[collection_name] = report
+    return drift
+
+
+async def build_indexes(database=db) -> dict:
+    await ensure_indexes(database)
+    drift = await index_drift(database)
+    for collection_name, report in drift.items():
+        print(f"Index drift on {collection_name}: {report}")
+    return drift
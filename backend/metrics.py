@@ -0,0 +1,218 @@
+from bisect import bisect_left
+from pymongo import monitoring
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import asyncio
+import os
+import time
+
+# Metrics settings
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+LOOP_LAG_INTERVAL_SECONDS = float(os.environ.get("LOOP_LAG_INTERVAL_SECONDS", "0.5"))
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (128, 512, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class HistogramFamily:
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.children: Dict[Labels, Histogram] = {}
+
+    def labels(self, *pairs: Tuple[str, str]) -> Histogram:
+        child = self.children.get(pairs)
+        if child is None:
+            child = self.children[pairs] = Histogram(self.buckets)
+        return child
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, child in self.children.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield f"{self.name}_bucket{format_labels(labels + (('le', le),))} {cumulative}"
+            yield f"{self.name}_sum{format_labels(labels)} {child.sum}"
+            yield f"{self.name}_count{format_labels(labels)} {child.count}"
+
+
+class CounterFamily:
+    def __init__(self, name: str, help_text: str, metric_type: str = "counter"):
+        self.name = name
+        self.help_text = help_text
+        self.metric_type = metric_type
+        self.values: Dict[Labels, float] = {}
+
+    def inc(self, *pairs: Tuple[str, str], amount: float = 1) -> None:
+        self.values[pairs] = self.values.get(pairs, 0) + amount
+
+    def set(self, *pairs: Tuple[str, str], value: float) -> None:
+        self.values[pairs] = value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} {self.metric_type}"
+        for labels, value in self.values.items():
+            yield f"{self.name}{format_labels(labels)} {value}"
+
+
+def format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (f'{key}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+               for key, value in labels)
+    return "{" + ",".join(escaped) + "}"
+
+
+class MetricsRegistry:
+    def __init__(self, enabled: bool = METRICS_ENABLED):
+        self.enabled = enabled
+        self.requests = CounterFamily("http_requests_total", "HTTP requests by route and status")
+        self.latency = HistogramFamily("http_request_duration_seconds", "HTTP request latency", LATENCY_BUCKETS)
+        self.response_size = HistogramFamily("http_response_size_bytes", "HTTP response body size", SIZE_BUCKETS)
+        self.in_flight = CounterFamily("http_requests_in_flight", "HTTP requests being served", "gauge")
+        self.mongo_latency = HistogramFamily("mongo_command_duration_seconds", "MongoDB command latency", LATENCY_BUCKETS)
+        self.mongo_failures = CounterFamily("mongo_command_failures_total", "Failed MongoDB commands")
+        self.loop_lag = HistogramFamily("event_loop_lag_seconds", "Event loop scheduling delay", LAG_BUCKETS)
+        self.in_flight.set(value=0)
+        self._route_series: Dict[Tuple[str, str], Tuple[Histogram, Histogram]] = {}
+        self._collectors: List[Tuple[str, str, str, Callable[[], Dict[str, float]]]] = []
+        self._lag_task: Optional[asyncio.Task] = None
+
+    def route_series(self, method: str, route: str) -> Tuple[Histogram, Histogram]:
+        series = self._route_series.get((method, route))
+        if series is None:
+            series = self._route_series[(method, route)] = (
+                self.latency.labels(("method", method), ("route", route)),
+                self.response_size.labels(("route", route)),
+            )
+        return series
+
+    def add_collector(self, name: str, metric_type: str, help_text: str, collect: Callable[[], Dict[str, float]]) -> None:
+        """Export values computed at scrape time, e.g. cache counters. collect() maps a `kind` label to a value."""
+        self._collectors.append((name, metric_type, help_text, collect))
+
+    def render(self) -> str:
+        lines = []
+        for family in (self.requests, self.latency, self.response_size, self.in_flight,
+                       self.mongo_latency, self.mongo_failures, self.loop_lag):
+            lines.extend(family.render())
+        for name, metric_type, help_text, collect in self._collectors:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for kind, value in collect().items():
+                lines.append(f"{name}{format_labels((('kind', kind),))} {value}")
+        return "\n".join(lines) + "\n"
+
+    async def _sample_loop_lag(self, interval: float) -> None:
+        lag = self.loop_lag.labels()
+        while True:
+            expected = time.perf_counter() + interval
+            await asyncio.sleep(interval)
+            lag.observe(max(0.0, time.perf_counter() - expected))
+
+    def start(self, interval: float = LOOP_LAG_INTERVAL_SECONDS) -> None:
+        if self.enabled and self._lag_task is None:
+            self._lag_task = asyncio.create_task(self._sample_loop_lag(interval))
+
+    async def stop(self) -> None:
+        if self._lag_task:
+            self._lag_task.cancel()
+            self._lag_task = None
+
+
+class MetricsMiddleware:
+    """Plain ASGI middleware; BaseHTTPMiddleware would add a task and a body copy per request."""
+
+    def __init__(self, app, registry: "MetricsRegistry"):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        registry = self.registry
+        in_flight = registry.in_flight.values
+        in_flight[()] += 1
+        status = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_flight[()] -= 1
+            # The matched route template keeps label cardinality bounded
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            method = scope["method"]
+            latency, response_size = registry.route_series(method, path)
+            latency.observe(elapsed)
+            response_size.observe(size)
+            registry.requests.inc(("method", method), ("route", path), ("status", str(status)))
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """Times every driver command per collection and command name.
+
+    Called on the driver's threads; dict operations are atomic under the GIL, and a
+    rare lost histogram increment is acceptable for monitoring.
+    """
+
+    def __init__(self, registry: "MetricsRegistry"):
+        self.registry = registry
+        self._pending: Dict[Tuple[int, int], str] = {}
+
+    def started(self, event):
+        # getMore names its collection in a separate field
+        key = "collection" if event.command_name == "getMore" else event.command_name
+        collection = event.command.get(key)
+        self._pending[(event.request_id, event.operation_id)] = collection if isinstance(collection, str) else ""
+
+    def _labels(self, event):
+        collection = self._pending.pop((event.request_id, event.operation_id), "")
+        return ("collection", collection), ("command", event.command_name)
+
+    def succeeded(self, event):
+        self.registry.mongo_latency.labels(*self._labels(event)).observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        labels = self._labels(event)
+        self.registry.mongo_latency.labels(*labels).observe(event.duration_micros / 1e6)
+        self.registry.mongo_failures.inc(*labels)
+
+
+metrics = MetricsRegistry()
+mongo_listener = MongoCommandListener(metrics)
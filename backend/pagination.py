@@ -0,0 +1,86 @@
+from datetime import datetime
+from pymongo import DESCENDING
+from typing import List, Optional, Tuple
+import base64
+import json
+import os
+
+from database import find_all
+
+# Page size settings
+PAGE_SIZE_DEFAULT = int(os.environ.get("PAGE_SIZE_DEFAULT", "50"))
+PAGE_SIZE_MAX = int(os.environ.get("PAGE_SIZE_MAX", "200"))
+
+# Newest first; id breaks ties between items on the same date.
+# Backed by the (date, id) compound indexes on notices and events, which also serve date ranges.
+KEYSET_SORT = [("date", DESCENDING), ("id", DESCENDING)]
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(document: dict) -> str:
+    date = document["date"]
+    raw = json.dumps([date.isoformat() if isinstance(date, datetime) else date, document["id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        date, item_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(date, str) or not isinstance(item_id, str):
+            raise InvalidCursor("Invalid cursor")
+        return datetime.fromisoformat(date), item_id
+    except (ValueError, TypeError):
+        raise InvalidCursor("Invalid cursor")
+
+
+def keyset_filter(cursor: Optional[str]) -> dict:
+    """Match everything strictly after the cursor position in KEYSET_SORT order."""
+    if not cursor:
+        return {}
+    date, item_id = decode_cursor(cursor)
+    return {"$or": [
+        {"date": {"$lt": date}},
+        {"date": date, "id": {"$lt": item_id}},
+    ]}
+
+
+def date_range(date_from: Optional[datetime] = None, date_to: Optional[datetime] = None) -> dict:
+    """Filter on dates between the bounds, both inclusive; either may be left open."""
+    bounds = {}
+    if date_from is not None:
+        bounds["$gte"] = date_from
+    if date_to is not None:
+        bounds["$lte"] = date_to
+    return {"date": bounds} if bounds else {}
+
+
+def clamp_page_size(limit: Optional[int]) -> int:
+    if not limit or limit < 1:
+        return PAGE_SIZE_DEFAULT
+    return min(limit, PAGE_SIZE_MAX)
+
+
+async def fetch_page(
+    collection, cursor: Optional[str] = None, limit: Optional[int] = None, query: Optional[dict] = None
+) -> dict:
+    page_size = clamp_page_size(limit)
+    # The keyset condition sits under $or, so it combines with a date range on the same field
+    filters = {**(query or {}), **keyset_filter(cursor)}
+    # Fetch one extra document to know whether another page exists
+    items = await find_all(collection, filters, sort=KEYSET_SORT, limit=page_size + 1)
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        next_cursor = encode_cursor(items[-1])
+    return {"items": items, "next_cursor": next_cursor, "limit": page_size}
+
+
+async def fetch_capped(collection, query: dict, sort: list, limit: Optional[int] = None) -> Tuple[List[dict], bool]:
+    """Up to a page of documents in `sort` order, and whether more were left out."""
+    page_size = clamp_page_size(limit)
+    items = await find_all(collection, query, sort=sort, limit=page_size + 1)
+    return items[:page_size], len(items) > page_size
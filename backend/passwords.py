@@ -0,0 +1,96 @@
+from concurrent.futures import ThreadPoolExecutor
+from passlib.context import CryptContext
+from typing import Optional, Tuple
+import asyncio
+import hmac
+import os
+
+# Password hashing settings
+# The first scheme hashes new passwords; later ones are still verified and upgraded on login.
+# "bcrypt" relies on the bcrypt<4.1 pin in requirements.txt: newer releases break passlib 1.7.4's backend check.
+PASSWORD_SCHEMES = os.environ.get("PASSWORD_SCHEMES", "pbkdf2_sha256").split(",")
+# KDF cost factor for the first scheme (pbkdf2 iterations, bcrypt log2 rounds); 0 keeps passlib's default
+PASSWORD_ROUNDS = int(os.environ.get("PASSWORD_ROUNDS", "0"))
+PASSWORD_WORKERS = int(os.environ.get("PASSWORD_WORKERS", str(min(4, os.cpu_count() or 1))))
+# How long a login may wait for a free worker before it is turned away with 503
+PASSWORD_QUEUE_TIMEOUT_SECONDS = float(os.environ.get("PASSWORD_QUEUE_TIMEOUT_SECONDS", "2"))
+
+
+class PasswordQueueTimeout(Exception):
+    pass
+
+
+def build_context(schemes=PASSWORD_SCHEMES, rounds: int = PASSWORD_ROUNDS) -> CryptContext:
+    settings = {f"{schemes[0]}__rounds": rounds} if rounds else {}
+    return CryptContext(schemes=schemes, deprecated="auto", **settings)
+
+
+password_context = build_context()
+
+
+def hash_password(password: str) -> str:
+    return password_context.hash(password)
+
+
+class PasswordVerifier:
+    """Runs the KDF on a small thread pool so slow hashes never block the event loop.
+
+    hashlib and bcrypt release the GIL while hashing, so the workers run in
+    parallel with request handling. At most `workers` verifications run at once.
+    Callers wait up to `queue_timeout` for a slot and then get PasswordQueueTimeout,
+    so a login surge queues for a bounded time instead of piling up without limit.
+    """
+
+    def __init__(self, workers: int = PASSWORD_WORKERS, queue_timeout: float = PASSWORD_QUEUE_TIMEOUT_SECONDS):
+        self.workers = workers
+        self.queue_timeout = queue_timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password")
+        self._slots = asyncio.Semaphore(workers)
+        self.waiting = 0
+        self.verified = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    async def _run(self, fn, *args):
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise PasswordQueueTimeout("Too many logins in progress, please retry")
+        finally:
+            self.waiting -= 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self._slots.release()
+
+    async def verify(self, password: str, password_hash: Optional[str], initial_password: str) -> Tuple[bool, Optional[str]]:
+        """Check a password; return (ok, new_hash) where new_hash should replace the stored one.
+
+        Accounts without a hash still use their initial password (the roll number).
+        It is hashed on the first successful login. Hashes made with a deprecated
+        scheme or an old cost factor are upgraded the same way.
+        """
+        if password_hash is None:
+            ok = hmac.compare_digest(password.encode(), initial_password.encode())
+            new_hash = await self._run(hash_password, password) if ok else None
+        else:
+            ok, new_hash = await self._run(password_context.verify_and_update, password, password_hash)
+        if ok:
+            self.verified += 1
+        else:
+            self.rejected += 1
+        return ok, new_hash
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "waiting": self.waiting,
+            "verified": self.verified,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+        }
+
+
+password_verifier = PasswordVerifier()
@@ -0,0 +1,124 @@
+from collections import deque
+from typing import AsyncIterator, Optional, Set
+import asyncio
+import os
+
+from serialization import dumps
+
+# Push channel settings
+PUSH_QUEUE_SIZE = int(os.environ.get("PUSH_QUEUE_SIZE", "64"))
+PUSH_HEARTBEAT_SECONDS = float(os.environ.get("PUSH_HEARTBEAT_SECONDS", "15"))
+PUSH_REPLAY_SIZE = int(os.environ.get("PUSH_REPLAY_SIZE", "100"))
+
+HEARTBEAT_FRAME = b": heartbeat\n\n"
+CLOSE = None
+
+
+def sse_frame(event_id: int, event: str, data: dict) -> bytes:
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (event_id, event.encode(), dumps(data))
+
+
+class Subscriber:
+    __slots__ = ("queue", "dropped")
+
+    def __init__(self, queue_size: int):
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = False
+
+
+class PushHub:
+    """In-process fan-out of server-sent events.
+
+    Frames are encoded once per publish and handed to every subscriber's bounded
+    queue. A subscriber whose queue is full is dropped rather than slowing down
+    everyone else; the client reconnects with Last-Event-ID and replays what it missed.
+    One hub task sends heartbeats to all idle connections, so an idle
+    subscriber costs a queue and a suspended generator, with no timer of its own.
+    """
+
+    def __init__(self, queue_size: int = PUSH_QUEUE_SIZE, replay_size: int = PUSH_REPLAY_SIZE):
+        self.queue_size = queue_size
+        self.subscribers: Set[Subscriber] = set()
+        self.recent = deque(maxlen=replay_size)
+        self.last_event_id = 0
+        self.published = 0
+        self.dropped = 0
+        self._heartbeat_task: Optional[asyncio.Task] = None
+
+    def _deliver(self, subscriber: Subscriber, frame: bytes) -> None:
+        try:
+            subscriber.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            self._drop(subscriber)
+
+    def _drop(self, subscriber: Subscriber) -> None:
+        if subscriber in self.subscribers:
+            self.subscribers.discard(subscriber)
+            subscriber.dropped = True
+            self.dropped += 1
+
+    def publish(self, event: str, data: dict) -> int:
+        self.last_event_id += 1
+        frame = sse_frame(self.last_event_id, event, data)
+        self.recent.append((self.last_event_id, frame))
+        self.published += 1
+        for subscriber in list(self.subscribers):
+            self._deliver(subscriber, frame)
+        return self.last_event_id
+
+    def subscribe(self, last_event_id: Optional[int] = None) -> Subscriber:
+        subscriber = Subscriber(self.queue_size)
+        if last_event_id is not None:
+            for event_id, frame in self.recent:
+                if event_id > last_event_id and not subscriber.queue.full():
+                    subscriber.queue.put_nowait(frame)
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self.subscribers.discard(subscriber)
+
+    async def stream(self, subscriber: Subscriber) -> AsyncIterator[bytes]:
+        try:
+            yield b"retry: 3000\n\n"
+            while True:
+                frame = await subscriber.queue.get()
+                if frame is CLOSE:
+                    return
+                yield frame
+                if subscriber.dropped and subscriber.queue.empty():
+                    return
+        finally:
+            self.unsubscribe(subscriber)
+
+    async def _heartbeat_loop(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            for subscriber in list(self.subscribers):
+                self._deliver(subscriber, HEARTBEAT_FRAME)
+
+    def start(self, heartbeat_seconds: float = PUSH_HEARTBEAT_SECONDS) -> None:
+        if self._heartbeat_task is None:
+            self._heartbeat_task = asyncio.create_task(self._heartbeat_loop(heartbeat_seconds))
+
+    async def stop(self) -> None:
+        if self._heartbeat_task:
+            self._heartbeat_task.cancel()
+            self._heartbeat_task = None
+        for subscriber in list(self.subscribers):
+            # Make room for the close marker so every stream ends promptly
+            while subscriber.queue.full():
+                subscriber.queue.get_nowait()
+            subscriber.queue.put_nowait(CLOSE)
+        self.subscribers.clear()
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self.subscribers),
+            "published": self.published,
+            "dropped": self.dropped,
+            "last_event_id": self.last_event_id,
+        }
+
+
+push_hub = PushHub()
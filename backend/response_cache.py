@@ -0,0 +1,195 @@
+from collections import OrderedDict
+from fastapi import Request, Response
+from pymongo import ReturnDocument
+from typing import Awaitable, Callable, Dict, Hashable, Optional, Tuple, Union
+import asyncio
+import hashlib
+import os
+
+from compression import COMPRESSION_ENABLED, COMPRESSION_MIN_BYTES, compress, negotiate, variant_etag
+from database import db
+from serialization import dumps
+from single_flight import SingleFlight
+
+# Response cache settings
+RESPONSE_CACHE_ENABLED = os.environ.get("RESPONSE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+# How often each worker picks up version bumps made by other workers
+RESPONSE_CACHE_SYNC_SECONDS = float(os.environ.get("RESPONSE_CACHE_SYNC_SECONDS", "2"))
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+class CacheEntry:
+    __slots__ = ("version", "body", "media_type", "etag", "encoded")
+
+    def __init__(self, version, body: bytes, media_type: str = "application/json"):
+        self.version = version
+        self.body = body
+        self.media_type = media_type
+        self.etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        # encoding -> compressed body, filled on first request for that encoding
+        self.encoded: Dict[str, bytes] = {}
+
+    def representation(self, encoding: Optional[str], cached: bool = True) -> Tuple[bytes, str]:
+        """Body and ETag for an encoding; each encoding has its own strong ETag.
+
+        Cached entries are compressed once per version at the slower, denser level.
+        """
+        if encoding is None:
+            return self.body, self.etag
+        body = self.encoded.get(encoding)
+        if body is None:
+            body = self.encoded[encoding] = compress(self.body, encoding, cached=cached)
+        return body, variant_etag(self.etag, encoding)
+
+
+class ResponseCache:
+    """Serialized JSON responses per (collection, variant), invalidated by per-collection versions.
+
+    Write endpoints call mark_changed(); the bump is also recorded in the
+    cache_versions collection so that other workers drop their copies on their next sync.
+    Concurrent misses for the same (collection, variant, version) share one load and
+    its serialized body, even when caching is disabled.
+    """
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES, enabled: bool = RESPONSE_CACHE_ENABLED):
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.versions: Dict[str, int] = {}
+        self._remote_versions: Dict[str, int] = {}
+        self._entries = OrderedDict()
+        self._sync_task: Optional[asyncio.Task] = None
+        self.flights = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def version(self, collection: Union[str, Tuple[str, ...]]):
+        # Responses built from several collections depend on all of their versions
+        if isinstance(collection, tuple):
+            return tuple(self.versions.get(name, 0) for name in collection)
+        return self.versions.get(collection, 0)
+
+    def bump(self, collection: str) -> None:
+        self.versions[collection] = self.version(collection) + 1
+
+    async def mark_changed(self, *collections: str, database=db) -> None:
+        for collection in collections:
+            self.bump(collection)
+            doc = await database.cache_versions.find_one_and_update(
+                {"_id": collection},
+                {"$inc": {"version": 1}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+            self._remote_versions[collection] = doc["version"]
+
+    async def sync_versions(self, database=db) -> None:
+        async for doc in database.cache_versions.find({}):
+            if self._remote_versions.get(doc["_id"]) != doc["version"]:
+                self._remote_versions[doc["_id"]] = doc["version"]
+                self.bump(doc["_id"])
+
+    async def _sync_loop(self) -> None:
+        while True:
+            await asyncio.sleep(RESPONSE_CACHE_SYNC_SECONDS)
+            try:
+                await self.sync_versions()
+            except Exception as e:
+                print(f"Response cache version sync failed: {e}")
+
+    async def start(self) -> None:
+        # The versions also drive the search index and the user cache, so they sync with caching off too
+        if self._sync_task is None:
+            await self.sync_versions()
+            self._sync_task = asyncio.create_task(self._sync_loop())
+
+    async def stop(self) -> None:
+        if self._sync_task:
+            self._sync_task.cancel()
+            self._sync_task = None
+
+    def get(self, collection: Union[str, Tuple[str, ...]], variant: Hashable) -> Optional[CacheEntry]:
+        key = (collection, variant)
+        entry = self._entries.get(key)
+        if entry is None or entry.version != self.version(collection):
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(
+        self,
+        collection: Union[str, Tuple[str, ...]],
+        variant: Hashable,
+        version,
+        data,
+        render: Callable[[object], bytes] = dumps,
+        media_type: str = "application/json",
+    ) -> CacheEntry:
+        entry = CacheEntry(version, render(data), media_type)
+        if self.enabled:
+            key = (collection, variant)
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def respond(self, request: Request, entry: CacheEntry) -> Response:
+        encoding = None
+        if COMPRESSION_ENABLED and len(entry.body) >= COMPRESSION_MIN_BYTES:
+            encoding = negotiate(request.headers.get("accept-encoding"))
+        body, etag = entry.representation(encoding, cached=self.enabled)
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Accept-Encoding"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return Response(content=body, media_type=entry.media_type, headers=headers)
+
+    async def cached_json(
+        self,
+        request: Request,
+        collection: Union[str, Tuple[str, ...]],
+        variant: Hashable,
+        loader: Callable[[], Awaitable[object]],
+        render: Callable[[object], bytes] = dumps,
+        media_type: str = "application/json",
+    ) -> Response:
+        """Answer from cache (or 304) when the collection is unchanged; otherwise load, cache and send.
+
+        `render` turns the loaded data into the body; pass it with `media_type` for non-JSON responses.
+        """
+        entry = self.get(collection, variant) if self.enabled else None
+        if entry is None:
+            # Capture the version before loading so a concurrent write is never cached as current
+            version = self.version(collection)
+
+            async def load() -> CacheEntry:
+                return self.put(collection, variant, version, await loader(), render, media_type)
+
+            entry = await self.flights.do((collection, variant, version), load)
+        return self.respond(request, entry)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "coalesced": self.flights.coalesced,
+            "versions": dict(self.versions),
+        }
+
+
+response_cache = ResponseCache()
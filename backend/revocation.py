@@ -0,0 +1,191 @@
+from datetime import datetime, timedelta, timezone
+from pymongo import ReturnDocument
+from typing import Dict, Optional, Tuple
+import asyncio
+import os
+import time
+import uuid
+
+from database import db
+
+# How often each worker picks up revocations made by other workers
+REVOCATION_SYNC_SECONDS = float(os.environ.get("REVOCATION_SYNC_SECONDS", "2"))
+# Each sync re-reads revocations this much older than the newest one seen, so slower in-flight writes
+# (and small clock differences between workers) are not skipped
+REVOCATION_SETTLE_SECONDS = float(os.environ.get("REVOCATION_SETTLE_SECONDS", "5"))
+
+
+def _timestamp(value: datetime) -> float:
+    # Mongo hands datetimes back naive, in UTC
+    return value.replace(tzinfo=timezone.utc).timestamp() if value.tzinfo is None else value.timestamp()
+
+
+class RevocationList:
+    """Revoked token ids (jti) and per-user cut-offs, kept in memory and mirrored from Mongo.
+
+    Checking a token costs two dict lookups. Revocations are written to the
+    revoked_tokens collection, which a TTL index empties once the tokens would
+    have expired anyway. Every worker polls the collection, because change
+    streams need a replica set; after the first full read, a poll only reads
+    entries written since the newest one it has seen. Entries are only ever
+    added, so a sync can never undo a revocation this worker just made.
+
+    Refresh token rotation does not add entries here: see RefreshFamilies.
+    """
+
+    def __init__(self):
+        self.tokens: Dict[str, float] = {}
+        # roll_no -> (not_before, expires_at)
+        self.users: Dict[str, Tuple[float, float]] = {}
+        # revoked_at of the newest entry read so far; None until the first full sync
+        self._synced_through: Optional[datetime] = None
+        self._sync_task: Optional[asyncio.Task] = None
+
+    def is_revoked(self, payload: dict) -> bool:
+        if payload.get("jti") in self.tokens:
+            return True
+        cut_off = self.users.get(payload.get("roll_no"))
+        return cut_off is not None and payload.get("iat", 0) < cut_off[0]
+
+    async def revoke_token(self, jti: str, expires_at: float, database=db) -> None:
+        self.tokens[jti] = expires_at
+        await database.revoked_tokens.update_one(
+            {"_id": f"token:{jti}"},
+            {"$set": {
+                "jti": jti,
+                "revoked_at": datetime.utcnow(),
+                "expires_at": datetime.fromtimestamp(expires_at, timezone.utc),
+            }},
+            upsert=True,
+        )
+
+    async def revoke_user(self, roll_no: str, lifetime_seconds: float, database=db) -> None:
+        """Reject every token issued to a user before now; the entry outlives the longest token."""
+        now = time.time()
+        self.users[roll_no] = (now, now + lifetime_seconds)
+        await database.revoked_tokens.update_one(
+            {"_id": f"user:{roll_no}"},
+            {"$set": {
+                "roll_no": roll_no,
+                "not_before": now,
+                "revoked_at": datetime.utcnow(),
+                "expires_at": datetime.fromtimestamp(now + lifetime_seconds, timezone.utc),
+            }},
+            upsert=True,
+        )
+
+    async def sync(self, database=db) -> None:
+        now = time.time()
+        query = {}
+        if self._synced_through is not None:
+            query = {"revoked_at": {"$gte": self._synced_through - timedelta(seconds=REVOCATION_SETTLE_SECONDS)}}
+        async for doc in database.revoked_tokens.find(query):
+            revoked_at = doc.get("revoked_at")
+            if revoked_at is not None and (self._synced_through is None or revoked_at > self._synced_through):
+                self._synced_through = revoked_at
+            expires_at = _timestamp(doc["expires_at"])
+            if expires_at <= now:
+                continue
+            if "jti" in doc:
+                self.tokens[doc["jti"]] = expires_at
+            else:
+                current = self.users.get(doc["roll_no"])
+                if current is None or current[0] < doc["not_before"]:
+                    self.users[doc["roll_no"]] = (doc["not_before"], expires_at)
+        if self._synced_through is None:
+            # Nothing revoked yet: later polls only need what is written from now on
+            self._synced_through = datetime.utcnow()
+        self.prune(now)
+
+    def prune(self, now: float) -> None:
+        # Expired tokens fail validation anyway
+        self.tokens = {jti: expires_at for jti, expires_at in self.tokens.items() if expires_at > now}
+        self.users = {roll_no: cut_off for roll_no, cut_off in self.users.items() if cut_off[1] > now}
+
+    async def _sync_loop(self) -> None:
+        while True:
+            await asyncio.sleep(REVOCATION_SYNC_SECONDS)
+            try:
+                await self.sync()
+            except Exception as e:
+                print(f"Revocation sync failed: {e}")
+
+    async def start(self) -> None:
+        if self._sync_task is None:
+            await self.sync()
+            self._sync_task = asyncio.create_task(self._sync_loop())
+
+    async def stop(self) -> None:
+        if self._sync_task:
+            self._sync_task.cancel()
+            self._sync_task = None
+
+    def stats(self) -> dict:
+        return {"revoked_tokens": len(self.tokens), "revoked_users": len(self.users)}
+
+
+class RefreshFamilies:
+    """Single-use refresh tokens without a revocation entry per refresh.
+
+    Every login starts a family, a document in refresh_families holding a
+    generation number. A refresh token names its family and generation, and
+    refreshing moves the family to the next generation with one conditional
+    update, so a token can only be used once, on any worker, and the previous
+    token stops working without being recorded anywhere. Presenting a token the
+    family has already moved past means it was copied, so the whole family is
+    deleted and the newer token, whoever holds it, stops working as well.
+    Logging out deletes the family. A TTL index drops families whose last token
+    has expired.
+    """
+
+    def __init__(self):
+        self.started = 0
+        self.rotated = 0
+        self.rejected = 0
+        self.reused = 0
+        self.ended = 0
+
+    async def start(self, roll_no: str, expires_at: datetime, database=db) -> Tuple[str, int]:
+        family = uuid.uuid4().hex
+        await database.refresh_families.insert_one(
+            {"_id": family, "roll_no": roll_no, "generation": 0, "expires_at": expires_at}
+        )
+        self.started += 1
+        return family, 0
+
+    async def rotate(self, family: str, generation: int, expires_at: datetime, database=db) -> Optional[int]:
+        """Use up generation `generation` of a family; returns the next one, or None if it cannot be used.
+
+        A generation that was already used revokes the family.
+        """
+        doc = await database.refresh_families.find_one_and_update(
+            {"_id": family, "generation": generation},
+            {"$inc": {"generation": 1}, "$set": {"expires_at": expires_at}},
+            return_document=ReturnDocument.AFTER,
+        )
+        if doc is None:
+            self.rejected += 1
+            result = await database.refresh_families.delete_one({"_id": family, "generation": {"$gt": generation}})
+            if result.deleted_count:
+                self.reused += 1
+                print(f"Refresh token reuse in family {family}: family revoked")
+            return None
+        self.rotated += 1
+        return doc["generation"]
+
+    async def end(self, family: str, roll_no: str, database=db) -> None:
+        result = await database.refresh_families.delete_one({"_id": family, "roll_no": roll_no})
+        self.ended += result.deleted_count
+
+    def stats(self) -> dict:
+        return {
+            "started": self.started,
+            "rotated": self.rotated,
+            "rejected": self.rejected,
+            "reused": self.reused,
+            "ended": self.ended,
+        }
+
+
+revocations = RevocationList()
+refresh_families = RefreshFamilies()
@@ -0,0 +1,153 @@
+from pydantic import BaseModel, ValidationError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Type
+import csv
+import json
+import os
+import time
+
+from database import users_collection
+from response_cache import response_cache
+from user_cache import USERS_VERSION
+
+# Roster import settings
+IMPORT_BATCH_SIZE = int(os.environ.get("IMPORT_BATCH_SIZE", "1000"))
+IMPORT_MAX_BYTES = int(os.environ.get("IMPORT_MAX_BYTES", str(64 * 1024 * 1024)))
+IMPORT_MAX_REPORTED_ERRORS = int(os.environ.get("IMPORT_MAX_REPORTED_ERRORS", "1000"))
+
+ROSTER_FORMATS = ("csv", "ndjson")
+
+
+class RosterTooLarge(Exception):
+    pass
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_bytes: int = IMPORT_MAX_BYTES) -> AsyncIterator[str]:
+    """Split a byte stream into decoded lines, holding at most one partial line in memory."""
+    received = 0
+    pending = b""
+    async for chunk in chunks:
+        received += len(chunk)
+        if received > max_bytes:
+            raise RosterTooLarge(f"Roster exceeds {max_bytes} bytes")
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line.rstrip(b"\r").decode("utf-8-sig")
+    if pending:
+        yield pending.rstrip(b"\r").decode("utf-8-sig")
+
+
+async def iter_rows(lines: AsyncIterator[str], fmt: str) -> AsyncIterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """Yield (row_number, row, parse_error) for every non-empty line of the upload."""
+    header = None
+    row_number = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        if fmt == "csv" and header is None:
+            header = [field.strip() for field in next(csv.reader([line]))]
+            continue
+        row_number += 1
+        try:
+            if fmt == "csv":
+                values = next(csv.reader([line]))
+                row = {field: value.strip() for field, value in zip(header, values) if value.strip()}
+            else:
+                row = json.loads(line)
+                if not isinstance(row, dict):
+                    raise ValueError("row is not a JSON object")
+        except (ValueError, csv.Error) as e:
+            yield row_number, None, str(e)
+            continue
+        yield row_number, row, None
+
+
+class RosterImport:
+    def __init__(self, model: Type[BaseModel], collection=users_collection, batch_size: int = IMPORT_BATCH_SIZE):
+        self.model = model
+        self.collection = collection
+        self.batch_size = batch_size
+        self.rows = 0
+        self.valid = 0
+        self.upserted = 0
+        self.modified = 0
+        self.error_count = 0
+        self.errors: List[dict] = []
+        self._batch: Dict[str, Tuple[int, dict]] = {}
+
+    def add_error(self, row_number: int, errors: List[str], roll_no: Optional[str] = None) -> None:
+        self.error_count += 1
+        if len(self.errors) < IMPORT_MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row_number, "roll_no": roll_no, "errors": errors})
+
+    async def add_row(self, row_number: int, row: Optional[dict], parse_error: Optional[str]) -> None:
+        self.rows += 1
+        if parse_error:
+            self.add_error(row_number, [parse_error])
+            return
+        try:
+            user = self.model(**row)
+        except ValidationError as e:
+            messages = [f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()]
+            self.add_error(row_number, messages, row.get("roll_no"))
+            return
+        self.valid += 1
+        # A roll number repeated within a batch keeps its last row
+        self._batch[user.roll_no] = (row_number, user.model_dump())
+        if len(self._batch) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        if not self._batch:
+            return
+        entries = list(self._batch.values())
+        self._batch = {}
+        operations = [UpdateOne({"roll_no": doc["roll_no"]}, {"$set": doc}, upsert=True) for _, doc in entries]
+        try:
+            result = await self.collection.bulk_write(operations, ordered=False)
+            self.upserted += result.upserted_count
+            self.modified += result.modified_count
+        except BulkWriteError as e:
+            details = e.details
+            self.upserted += details.get("nUpserted", 0)
+            self.modified += details.get("nModified", 0)
+            for write_error in details.get("writeErrors", []):
+                row_number, doc = entries[write_error["index"]]
+                self.valid -= 1
+                self.add_error(row_number, [write_error.get("errmsg", "write failed")], doc["roll_no"])
+        # Cached users on every worker are re-read, so a changed role or section applies at once
+        await response_cache.mark_changed(USERS_VERSION)
+
+    def report(self, elapsed: float, bytes_received: int) -> dict:
+        return {
+            "rows": self.rows,
+            "valid": self.valid,
+            "upserted": self.upserted,
+            "modified": self.modified,
+            "error_count": self.error_count,
+            "errors": self.errors,
+            "errors_truncated": self.error_count > len(self.errors),
+            "elapsed_s": round(elapsed, 3),
+            "rows_per_s": round(self.rows / elapsed, 1) if elapsed else 0.0,
+            "bytes": bytes_received,
+        }
+
+
+async def import_roster(chunks: AsyncIterator[bytes], fmt: str, model: Type[BaseModel]) -> dict:
+    """Stream a CSV or NDJSON roster into users with batched upserts keyed on roll_no."""
+    start = time.perf_counter()
+    received = 0
+
+    async def counted(source):
+        nonlocal received
+        async for chunk in source:
+            received += len(chunk)
+            yield chunk
+
+    roster = RosterImport(model)
+    async for row_number, row, parse_error in iter_rows(iter_lines(counted(chunks)), fmt):
+        await roster.add_row(row_number, row, parse_error)
+    await roster.flush()
+    return roster.report(time.perf_counter() - start, received)
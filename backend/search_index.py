@@ -0,0 +1,331 @@
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+from datetime import datetime, timedelta
+import asyncio
+import math
+import os
+import re
+
+import numpy as np
+
+from change_log import SYNC_SETTLE_SECONDS, read_changes, settled_through
+from database import events_collection, iter_batches, notices_collection, resources_collection
+from response_cache import response_cache
+
+# Search settings
+SEARCH_LIMIT_DEFAULT = int(os.environ.get("SEARCH_LIMIT_DEFAULT", "20"))
+SEARCH_LIMIT_MAX = int(os.environ.get("SEARCH_LIMIT_MAX", "100"))
+SEARCH_BM25_K1 = float(os.environ.get("SEARCH_BM25_K1", "1.2"))
+SEARCH_BM25_B = float(os.environ.get("SEARCH_BM25_B", "0.75"))
+
+# Indexed text fields per collection; the title is listed twice so that title matches rank higher
+SEARCH_FIELDS = {
+    "notices": ("title", "title", "description", "category"),
+    "events": ("title", "title", "description", "location"),
+    "resources": ("title", "title", "subject"),
+}
+# Fields returned with each hit
+HIT_FIELDS = {
+    "notices": ("id", "title", "category", "date"),
+    "events": ("id", "title", "location", "date"),
+    "resources": ("id", "title", "subject", "semester", "file_url"),
+}
+SEARCH_SOURCES = {
+    "notices": notices_collection,
+    "events": events_collection,
+    "resources": resources_collection,
+}
+# Kinds whose documents are only visible to students of the same semester
+SEMESTER_SCOPED = ("resources",)
+
+SEARCH_KINDS = tuple(SEARCH_FIELDS)
+KIND_CODES = {kind: code for code, kind in enumerate(SEARCH_KINDS, start=1)}
+# What load() takes over from the index it builds
+INDEX_STATE = (
+    "postings", "hits", "terms", "lengths", "kind_codes", "semester_codes",
+    "semesters", "slots", "free_slots", "total_length",
+)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from in is it of on or the this to with will".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def term_frequencies(kind: str, document: dict) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for field in SEARCH_FIELDS[kind]:
+        for token in tokenize(str(document.get(field) or "")):
+            counts[token] = counts.get(token, 0) + 1
+    return counts
+
+
+class Postings:
+    """One term's postings: parallel slot and term-frequency arrays, and each slot's position in them.
+
+    Adds append and removes move the last entry into the hole, so the arrays are
+    always current and a query views them as numpy arrays without copying.
+    """
+
+    __slots__ = ("slots", "tfs", "positions")
+
+    def __init__(self):
+        self.slots = array("i")
+        self.tfs = array("f")
+        self.positions: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def add(self, slot: int, tf: int) -> None:
+        self.positions[slot] = len(self.slots)
+        self.slots.append(slot)
+        self.tfs.append(tf)
+
+    def remove(self, slot: int) -> None:
+        position = self.positions.pop(slot)
+        last_slot, last_tf = self.slots.pop(), self.tfs.pop()
+        if position < len(self.slots):
+            self.slots[position], self.tfs[position] = last_slot, last_tf
+            self.positions[last_slot] = position
+
+
+class SearchIndex:
+    """In-memory BM25 inverted index over notices, events and resources.
+
+    Each term's postings are arrays of slots and term frequencies that writes
+    update in place (see Postings). BM25 weights are computed at query time from
+    the term frequencies and the per-slot document lengths, so they always use
+    the current average length and nothing needs re-weighting after a write. A
+    query costs a few vectorised operations per term plus a partial sort, however
+    many documents the terms match.
+
+    Like the response cache, the index follows the per-collection versions. Every
+    add()/remove() accounts for one local mark_changed(). A version that moves
+    without a matching change here comes from another worker, and refresh()
+    applies what changed since the last catch-up from the delta sync change log,
+    so its cost follows the number of writes rather than the collection size.
+    The full load() runs once at boot and indexes in a worker thread into a fresh
+    index that replaces this one when done, so it never blocks the event loop.
+    """
+
+    def __init__(self, k1: float = SEARCH_BM25_K1, b: float = SEARCH_BM25_B):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Postings] = {}
+        self.hits: List[Optional[dict]] = []
+        self.terms: List[Optional[Dict[str, int]]] = []
+        # Per-slot columns, viewed as numpy arrays without copying at query time
+        self.lengths = array("f")
+        self.kind_codes = array("b")
+        self.semester_codes = array("h")
+        self.semesters: Dict[str, int] = {}
+        self.slots: Dict[Tuple[str, str], int] = {}
+        self.free_slots: List[int] = []
+        self.total_length = 0
+        self.versions: Dict[str, int] = {}
+        # Change sequence the index is known to be complete up to; None until the first full load
+        self.since: Optional[int] = None
+        self.catch_ups = 0
+        self.queries = 0
+        self._refresh_lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    @property
+    def loaded(self) -> bool:
+        return self.since is not None
+
+    @property
+    def average_length(self) -> float:
+        return self.total_length / len(self.slots) if self.slots else 1.0
+
+    def _semester_code(self, semester: Optional[str]) -> int:
+        if not semester:
+            return 0
+        return self.semesters.setdefault(semester, len(self.semesters) + 1)
+
+    def _index(self, kind: str, document: dict) -> None:
+        key = (kind, document["id"])
+        if key in self.slots:
+            self._unindex(key)
+        counts = term_frequencies(kind, document)
+        length = sum(counts.values())
+        hit = {"type": kind, **{field: document.get(field) for field in HIT_FIELDS[kind]}}
+        semester_code = self._semester_code(document.get("semester"))
+        if self.free_slots:
+            slot = self.free_slots.pop()
+            self.hits[slot], self.terms[slot], self.lengths[slot] = hit, counts, length
+            self.kind_codes[slot], self.semester_codes[slot] = KIND_CODES[kind], semester_code
+        else:
+            slot = len(self.hits)
+            self.hits.append(hit)
+            self.terms.append(counts)
+            self.lengths.append(length)
+            self.kind_codes.append(KIND_CODES[kind])
+            self.semester_codes.append(semester_code)
+        self.slots[key] = slot
+        self.total_length += length
+        for term, tf in counts.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = Postings()
+            postings.add(slot, tf)
+
+    def _unindex(self, key: Tuple[str, str]) -> None:
+        slot = self.slots.pop(key)
+        for term in self.terms[slot]:
+            postings = self.postings[term]
+            postings.remove(slot)
+            if not postings:
+                del self.postings[term]
+        self.total_length -= int(self.lengths[slot])
+        self.hits[slot] = self.terms[slot] = None
+        self.lengths[slot] = 0
+        self.kind_codes[slot] = self.semester_codes[slot] = 0
+        self.free_slots.append(slot)
+
+    def _index_batch(self, kind: str, documents: List[dict]) -> None:
+        for document in documents:
+            if document.get("id"):
+                self._index(kind, document)
+
+    def add(self, kind: str, documents: Iterable[dict]) -> None:
+        """Index documents written by this worker; pair each call with one mark_changed(kind)."""
+        for document in documents:
+            self._index(kind, document)
+        self.versions[kind] = self.versions.get(kind, 0) + 1
+
+    def remove(self, kind: str, ids: Iterable[str]) -> None:
+        """Drop documents deleted by this worker; pair each call with one mark_changed(kind)."""
+        for document_id in ids:
+            if (kind, document_id) in self.slots:
+                self._unindex((kind, document_id))
+        self.versions[kind] = self.versions.get(kind, 0) + 1
+
+    def _projection(self, kind: str) -> dict:
+        return {"_id": 0, "seq": 1, "changed_at": 1, **{field: 1 for field in set(SEARCH_FIELDS[kind] + HIT_FIELDS[kind])}}
+
+    async def load(self, sources: Dict[str, object] = SEARCH_SOURCES) -> None:
+        """Index every collection from scratch; runs once, at boot.
+
+        Documents are indexed in a worker thread into a fresh index, which
+        nothing else can see, and swapped in at the end. Writes this worker makes
+        meanwhile land in the index being replaced, but they are in the change
+        log after `since`, so the next refresh() applies them again.
+        """
+        async with self._refresh_lock:
+            settled_before = datetime.utcnow() - timedelta(seconds=SYNC_SETTLE_SECONDS)
+            versions = {kind: response_cache.version(kind) for kind in sources}
+            fresh = SearchIndex(self.k1, self.b)
+            settled = 0
+            for kind, collection in sources.items():
+                async for batch in iter_batches(collection, {}, self._projection(kind)):
+                    await asyncio.to_thread(fresh._index_batch, kind, batch)
+                    for document in batch:
+                        if "seq" in document and document["changed_at"] <= settled_before:
+                            settled = max(settled, document["seq"])
+            for name in INDEX_STATE:
+                setattr(self, name, getattr(fresh, name))
+            self.versions = versions
+            self.since = settled
+
+    async def catch_up(self, sources: Dict[str, object] = SEARCH_SOURCES) -> int:
+        """Apply changes made since `since`, by any worker; re-applying one is harmless."""
+        read_from = settled = self.since
+        advancing = True
+        applied = 0
+        while True:
+            entries, truncated = await read_changes(read_from, projection={"_id": 0})
+            for _, kind, op, doc in entries:
+                if kind not in sources or not doc.get("id"):
+                    continue
+                if op == "upsert":
+                    self._index(kind, doc)
+                elif (kind, doc["id"]) in self.slots:
+                    self._unindex((kind, doc["id"]))
+                applied += 1
+            if advancing and entries:
+                settled = settled_through(entries, settled)
+                advancing = settled == entries[-1][0]
+            if not truncated:
+                break
+            read_from = entries[-1][0]
+        self.since = settled
+        self.catch_ups += 1
+        return applied
+
+    async def refresh(self, sources: Dict[str, object] = SEARCH_SOURCES) -> None:
+        """Bring the index up to date with changes made by other workers; a no-op until load() is done."""
+        if not self.loaded or self._refresh_lock.locked():
+            # Another request is already catching up; answer from the index as it is rather than wait
+            return
+        async with self._refresh_lock:
+            versions = {kind: response_cache.version(kind) for kind in sources}
+            if any(self.versions.get(kind) != version for kind, version in versions.items()):
+                await self.catch_up(sources)
+            self.versions.update(versions)
+
+    def search(
+        self,
+        query: str,
+        limit: int = SEARCH_LIMIT_DEFAULT,
+        kinds: Optional[Iterable[str]] = None,
+        semester: Optional[str] = None,
+    ) -> List[dict]:
+        """Top `limit` hits for a query; `semester` hides other semesters' SEMESTER_SCOPED documents."""
+        self.queries += 1
+        document_count = len(self.slots)
+        lengths = np.frombuffer(self.lengths, dtype=np.float32)
+        # BM25 length normalisation, k1 * (1 - b + b * length / average_length), as base + scale * length
+        norm_base = np.float32(self.k1 * (1 - self.b))
+        norm_scale = np.float32(self.k1 * self.b / self.average_length)
+        scores = None
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if postings is None:
+                continue
+            slots = np.frombuffer(postings.slots, dtype=np.intc)
+            tfs = np.frombuffer(postings.tfs, dtype=np.float32)
+            idf = math.log(1 + (document_count - len(slots) + 0.5) / (len(slots) + 0.5))
+            if scores is None:
+                scores = np.zeros(len(self.hits), dtype=np.float32)
+            scores[slots] += np.float32(idf * (self.k1 + 1)) * tfs / (tfs + norm_base + norm_scale * lengths[slots])
+        if scores is None:
+            return []
+
+        kind_codes = np.frombuffer(self.kind_codes, dtype=np.int8)
+        if kinds is not None:
+            wanted = np.zeros(len(SEARCH_KINDS) + 1, dtype=bool)
+            wanted[[KIND_CODES[kind] for kind in kinds]] = True
+            scores[~wanted[kind_codes]] = 0
+        if semester is not None:
+            semester_codes = np.frombuffer(self.semester_codes, dtype=np.int16)
+            other_semester = semester_codes != self.semesters.get(semester, -1)
+            for kind in SEMESTER_SCOPED:
+                scores[(kind_codes == KIND_CODES[kind]) & other_semester] = 0
+
+        # Partition only the matches: the zero scores are heavy ties that slow introselect down
+        top = np.flatnonzero(scores > 0)
+        if len(top) > limit:
+            top = top[np.argpartition(scores[top], -limit)[-limit:]]
+        ranked = top[np.argsort(-scores[top], kind="stable")]
+        return [{**self.hits[slot], "score": round(float(scores[slot]), 4)} for slot in ranked.tolist()]
+
+    def stats(self) -> dict:
+        return {
+            "documents": len(self.slots),
+            "terms": len(self.postings),
+            "queries": self.queries,
+            "catch_ups": self.catch_ups,
+            "since": self.since,
+            "versions": dict(self.versions),
+        }
+
+
+search_index = SearchIndex()
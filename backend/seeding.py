@@ -0,0 +1,148 @@
+from pymongo import UpdateOne
+from datetime import datetime as dt
+from typing import Dict, List
+import os
+import uuid
+
+from archival import archive_name
+from database import acquire_lock, db
+
+# Seeding settings
+SEED_BATCH_SIZE = int(os.environ.get("SEED_BATCH_SIZE", "1000"))
+SEED_LOCK_TTL_SECONDS = int(os.environ.get("SEED_LOCK_TTL_SECONDS", "60"))
+
+# Sample content; natural keys decide whether a record already exists
+SAMPLE_NOTICES = [
+    {
+        "title": "Mid-Term Examinations Schedule",
+        "description": "Mid-term examinations for AI Department will commence from March 15, 2024. All students are required to check their hall tickets online.",
+        "category": "Exams",
+        "date": dt(2024, 3, 1)
+    },
+    {
+        "title": "Guest Lecture on Machine Learning",
+        "description": "Distinguished guest lecture by Dr. Sarah Johnson on 'Advanced Machine Learning Techniques' scheduled for March 20, 2024.",
+        "category": "Events",
+        "date": dt(2024, 3, 5)
+    }
+]
+
+SAMPLE_EVENTS = [
+    {
+        "title": "AI Tech Fest 2024",
+        "description": "Annual technical festival showcasing AI projects and innovations by students",
+        "date": dt(2024, 3, 25),
+        "location": "AI Department Auditorium"
+    },
+    {
+        "title": "Industry Connect Session",
+        "description": "Interaction session with AI industry professionals and placement opportunities",
+        "date": dt(2024, 3, 30),
+        "location": "Conference Hall"
+    }
+]
+
+SAMPLE_TIMETABLE = [
+    {"day": "Monday", "time": "09:00-10:00", "subject": "Machine Learning", "faculty": "Dr. Smith", "semester": "3", "section": "A"},
+    {"day": "Monday", "time": "10:00-11:00", "subject": "Data Structures", "faculty": "Prof. Johnson", "semester": "3", "section": "A"},
+    {"day": "Tuesday", "time": "09:00-10:00", "subject": "AI Fundamentals", "faculty": "Dr. Brown", "semester": "3", "section": "A"},
+    {"day": "Wednesday", "time": "09:00-10:00", "subject": "Neural Networks", "faculty": "Prof. Davis", "semester": "3", "section": "A"},
+]
+
+SAMPLE_FACULTY = [
+    {
+        "name": "Dr. Sarah Smith",
+        "designation": "Professor & Head of Department",
+        "email": "sarah.smith@pbrvits.edu.in",
+        "photo_url": "https://images.unsplash.com/photo-1559839734-2b71ea197ec2?w=300&h=300&fit=crop&crop=face"
+    },
+    {
+        "name": "Prof. Michael Johnson",
+        "designation": "Associate Professor",
+        "email": "michael.johnson@pbrvits.edu.in",
+        "photo_url": "https://images.unsplash.com/photo-1507003211169-0a1dd7228f2d?w=300&h=300&fit=crop&crop=face"
+    }
+]
+
+# Collection -> fields that identify a seed record
+NATURAL_KEYS = {
+    "notices": ("title", "date"),
+    "events": ("title", "date"),
+    "timetables": ("semester", "section", "day", "time"),
+    "faculty": ("email",),
+}
+
+
+def student_document(roll_no: str, info: dict) -> dict:
+    return {
+        "roll_no": roll_no,
+        "name": info["name"],
+        "semester": info["semester"],
+        "section": info["section"],
+        "role": "student"
+    }
+
+
+def admin_document(roll_no: str, info: dict) -> dict:
+    return {
+        "roll_no": roll_no,
+        "name": info["name"],
+        "semester": info.get("semester", ""),
+        "section": info.get("section", ""),
+        "role": info.get("role", "admin")
+    }
+
+
+def insert_if_missing(key: dict, document: dict) -> UpdateOne:
+    # $setOnInsert never touches a record that already exists, so reseeding is a no-op
+    return UpdateOne(key, {"$setOnInsert": document}, upsert=True)
+
+
+def sample_upserts(collection_name: str, samples: List[dict]) -> List[UpdateOne]:
+    operations = []
+    for sample in samples:
+        key = {field: sample[field] for field in NATURAL_KEYS[collection_name]}
+        operations.append(insert_if_missing(key, {"id": str(uuid.uuid4()), **sample}))
+    return operations
+
+
+async def bulk_upsert(collection, operations: List[UpdateOne], batch_size: int = SEED_BATCH_SIZE) -> Dict[str, int]:
+    counts = {"inserted": 0, "matched": 0}
+    for start in range(0, len(operations), batch_size):
+        result = await collection.bulk_write(operations[start:start + batch_size], ordered=False)
+        counts["inserted"] += result.upserted_count
+        counts["matched"] += result.matched_count
+    return counts
+
+
+async def acquire_seed_lock(database=db, ttl_seconds: int = SEED_LOCK_TTL_SECONDS) -> bool:
+    """Let one worker seed per boot window; the others see the live lock and skip."""
+    return await acquire_lock("startup_seed", ttl_seconds, database)
+
+
+async def unarchived(collection_name: str, samples: List[dict], database=db) -> List[dict]:
+    """Leave out samples the archiver has already moved, so they are not seeded again."""
+    fields = NATURAL_KEYS[collection_name]
+    keys = [{field: sample[field] for field in fields} for sample in samples]
+    projection = {"_id": 0, **dict.fromkeys(fields, 1)}
+    archived = await database[archive_name(collection_name)].find({"$or": keys}, projection).to_list(None)
+    archived_keys = {tuple(doc.get(field) for field in fields) for doc in archived}
+    return [sample for sample in samples if tuple(sample[field] for field in fields) not in archived_keys]
+
+
+async def seed_database(student_data: dict, admin_data: dict, database=db) -> Dict[str, Dict[str, int]]:
+    user_operations = [
+        insert_if_missing({"roll_no": roll_no}, student_document(roll_no, info))
+        for roll_no, info in student_data.items()
+    ] + [
+        insert_if_missing({"roll_no": roll_no}, admin_document(roll_no, info))
+        for roll_no, info in admin_data.items()
+    ]
+
+    return {
+        "users": await bulk_upsert(database.users, user_operations),
+        "notices": await bulk_upsert(database.notices, sample_upserts("notices", await unarchived("notices", SAMPLE_NOTICES, database))),
+        "events": await bulk_upsert(database.events, sample_upserts("events", await unarchived("events", SAMPLE_EVENTS, database))),
+        "timetables": await bulk_upsert(database.timetables, sample_upserts("timetables", SAMPLE_TIMETABLE)),
+        "faculty": await bulk_upsert(database.faculty, sample_upserts("faculty", SAMPLE_FACULTY)),
+    }
@@ -0,0 +1,47 @@
+from datetime import datetime, timezone
+from fastapi.responses import JSONResponse
+from typing import Any, AsyncIterator, List
+import json
+import os
+
+# JSON backend: "orjson" when installed (default), or "stdlib" to force the json module
+JSON_SERIALIZER = os.environ.get("JSON_SERIALIZER", "orjson")
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+USE_ORJSON = orjson is not None and JSON_SERIALIZER == "orjson"
+
+
+def _default(value: Any):
+    # Dates as ISO 8601 with the offset, as orjson writes them; naive ones are UTC, as Mongo returns them
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.isoformat()
+    # ObjectId and other BSON types that survive a projection
+    return str(value)
+
+
+def dumps(data: Any) -> bytes:
+    """Encode plain Mongo documents (and lists/dicts of them) straight to compact UTF-8 JSON."""
+    if USE_ORJSON:
+        return orjson.dumps(data, default=_default, option=orjson.OPT_NAIVE_UTC)
+    return json.dumps(
+        data, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_default
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with dumps(); return it directly to also skip jsonable_encoder."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+async def ndjson_lines(batches: AsyncIterator[List[dict]]) -> AsyncIterator[bytes]:
+    """One JSON document per line; each driver batch goes out as a single chunk."""
+    async for batch in batches:
+        yield b"".join(dumps(document) + b"\n" for document in batch)
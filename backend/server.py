@@ -1,26 +1,88 @@
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, Body, Query, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from pydantic import BaseModel, Field
-from pymongo import MongoClient
-from typing import Optional, List
+from pydantic import BaseModel, Field, field_validator
+from pymongo.errors import PyMongoError
+from typing import Optional, List, Tuple
+from urllib.parse import quote
 import os
 import hashlib
 import jwt
 import datetime
 from datetime import datetime as dt, timedelta
 import uuid
+import asyncio
+import re
+import time
+
+from bulk_writes import BatchTooLarge, insert_items
+from compression import COMPRESSION_ENABLED, CompressionMiddleware
+from admission import (
+    ADMISSION_ENABLED, AdmissionMiddleware, db_gate, login_ip_limiter, login_limiter, login_wait, retry_after, user_limiter,
+)
+from archival import archiver, migrate_dates, naive_utc
+from change_log import (
+    SYNC_COLLECTIONS, InvalidSyncToken, backfill_sequence, changes_since, stamp, without_change_fields,
+)
+from database import (
+    MONGO_URL,
+    close_client,
+    ping,
+    pool_monitor,
+    users_collection,
+    notices_collection,
+    events_collection,
+    timetables_collection,
+    resources_collection,
+    faculty_collection,
+    find_one,
+    find_all,
+    insert_one,
+    iter_batches,
+)
+from indexes import TIMETABLE_SORT, RESOURCES_SORT, FACULTY_SORT, build_indexes
+from metrics import MetricsMiddleware, metrics
+from pagination import (
+    PAGE_SIZE_DEFAULT, KEYSET_SORT, InvalidCursor, date_range, fetch_capped, fetch_page,
+)
+from passwords import PasswordQueueTimeout, password_verifier
+from push_hub import push_hub
+from response_cache import response_cache
+from revocation import refresh_families, revocations
+from roster_import import ROSTER_FORMATS, RosterTooLarge, import_roster
+from search_index import SEARCH_KINDS, SEARCH_LIMIT_DEFAULT, SEARCH_LIMIT_MAX, search_index
+from serialization import FastJSONResponse, ndjson_lines
+from seeding import acquire_seed_lock, seed_database
+from storage import UploadTooLarge, blob_response, store_upload
+from timetable_grid import CALENDAR_MEDIA_TYPE, build_grid, feed_key, feed_key_matches, render_calendar
+from user_cache import user_cache
 
 # Environment variables
-MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
-DB_NAME = os.environ.get("DB_NAME", "test_database")
+STREAM_BATCH_SIZE = int(os.environ.get("STREAM_BATCH_SIZE", "500"))
+STARTUP_RETRY_SECONDS = float(os.environ.get("STARTUP_RETRY_SECONDS", "5"))
+READY_PING_TIMEOUT_SECONDS = float(os.environ.get("READY_PING_TIMEOUT_SECONDS", "2"))
 CORS_ORIGINS = os.environ.get("CORS_ORIGINS", "*").split(",")
 
 # JWT Secret
 JWT_SECRET = "pbr_vits_ai_dept_secret_key_2024"
 JWT_ALGORITHM = "HS256"
+ACCESS_TOKEN_MINUTES = int(os.environ.get("ACCESS_TOKEN_MINUTES", "15"))
+REFRESH_TOKEN_DAYS = int(os.environ.get("REFRESH_TOKEN_DAYS", "7"))
 
-app = FastAPI(title="Dept-AI Hub - PBR VITS API")
+# Student roll numbers that may log in: 2473A31XXX
+ROLL_NO_PATTERN = re.compile(r"^2473A31\d{3}$")
+
+# Opt-in: trust the role/semester/section claims in the token instead of looking the user up.
+# Roster changes then take effect only when the access token is refreshed (ACCESS_TOKEN_MINUTES), unless the
+# user's tokens are revoked through /api/admin/users/{roll_no}/revoke-tokens.
+TRUST_TOKEN_CLAIMS = os.environ.get("TRUST_TOKEN_CLAIMS", "false").lower() in ("1", "true", "yes")
+
+app = FastAPI(title="Dept-AI Hub - PBR VITS API", default_response_class=FastJSONResponse)
+
+# Admission control (inside CORS, so browsers can read a 503 and its Retry-After)
+if ADMISSION_ENABLED:
+    app.add_middleware(AdmissionMiddleware, gate=db_gate)
 
 # CORS middleware
 app.add_middleware(
@@ -31,31 +93,52 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# MongoDB connection
-try:
-    client = MongoClient(MONGO_URL)
-    db = client[DB_NAME]
-    
-    # Collections
-    users_collection = db.users
-    notices_collection = db.notices
-    events_collection = db.events
-    timetables_collection = db.timetables
-    resources_collection = db.resources
-    faculty_collection = db.faculty
-    
-    print(f"Connected to MongoDB: {MONGO_URL}")
-except Exception as e:
-    print(f"MongoDB connection error: {e}")
+# Compression of per-request responses; cached collection responses are precompressed by the response cache
+if COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Request metrics (outermost so that CORS handling is timed too, and sizes are bytes on the wire)
+if metrics.enabled:
+    app.add_middleware(MetricsMiddleware, registry=metrics)
+    metrics.add_collector("user_cache_events_total", "counter", "User cache lookups and evictions",
+                          lambda: {k: v for k, v in user_cache.stats().items() if k in ("hits", "misses", "evictions", "invalidations")})
+    metrics.add_collector("response_cache_events_total", "counter", "Response cache lookups",
+                          lambda: {k: v for k, v in response_cache.stats().items() if k in ("hits", "misses", "not_modified")})
+    metrics.add_collector("read_coalescing_total", "counter", "Cache-miss reads that ran (leaders) or joined one in flight (coalesced)",
+                          lambda: {k: v for k, v in response_cache.flights.stats().items() if k != "in_flight"})
+    metrics.add_collector("password_verifications_total", "counter", "Password checks by outcome",
+                          lambda: {k: v for k, v in password_verifier.stats().items() if k in ("verified", "rejected", "timeouts")})
+    metrics.add_collector("rate_limit_total", "counter", "Rate limit decisions and idle buckets evicted, per limiter",
+                          lambda: {f"{name}_{k}": v for name, limiter in (("user", user_limiter), ("login", login_limiter), ("login_ip", login_ip_limiter))
+                                   for k, v in limiter.stats().items() if k != "buckets"})
+    metrics.add_collector("rate_limit_buckets", "gauge", "Live rate limit buckets",
+                          lambda: {"user": user_limiter.stats()["buckets"], "login": login_limiter.stats()["buckets"],
+                                   "login_ip": login_ip_limiter.stats()["buckets"]})
+    metrics.add_collector("admission_total", "counter", "Database-bound requests admitted or turned away",
+                          lambda: {k: v for k, v in db_gate.stats().items() if k in ("admitted", "shed", "timeouts")})
+    metrics.add_collector("admission_requests", "gauge", "Database-bound requests running and queued",
+                          lambda: {k: v for k, v in db_gate.stats().items() if k in ("in_flight", "waiting")})
+    metrics.add_collector("archived_total", "counter", "Notices and events moved to the archive",
+                          lambda: archiver.stats()["archived"])
+    metrics.add_collector("push_channel", "gauge", "Push channel subscribers and totals", push_hub.stats)
+
+print(f"Using MongoDB: {MONGO_URL}")
 
 # Security
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 # Pydantic models
 class UserLogin(BaseModel):
     roll_no: str
     password: str
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+class LogoutRequest(BaseModel):
+    refresh_token: Optional[str] = None
+
 class UserCreate(BaseModel):
     roll_no: str
     name: str
@@ -68,17 +151,22 @@ class Notice(BaseModel):
     title: str
     description: str
     category: str
-    date: str
+    date: dt
     pdf_url: Optional[str] = None
 
+    # Stored, indexed and published as naive UTC, whatever offset the client sent
+    _utc_date = field_validator("date")(naive_utc)
+
 class Event(BaseModel):
     id: Optional[str] = None
     title: str
     description: str
-    date: str
+    date: dt
     location: str
     rsvp_link: Optional[str] = None
 
+    _utc_date = field_validator("date")(naive_utc)
+
 class TimetableEntry(BaseModel):
     id: Optional[str] = None
     day: str
@@ -88,6 +176,12 @@ class TimetableEntry(BaseModel):
     semester: str
     section: str
 
+class ResourceFile(BaseModel):
+    sha256: str
+    size: int
+    content_type: str
+    filename: str
+
 class Resource(BaseModel):
     id: Optional[str] = None
     title: str
@@ -96,6 +190,7 @@ class Resource(BaseModel):
     file_url: str
     uploaded_by: str
     upload_date: str
+    file: Optional[ResourceFile] = None
 
 class Faculty(BaseModel):
     id: Optional[str] = None
@@ -106,174 +201,226 @@ class Faculty(BaseModel):
     linkedin: Optional[str] = None
 
 # Helper functions
-def create_jwt_token(roll_no: str, role: str) -> str:
+def create_jwt_token(roll_no: str, role: str, name: str = "", semester: str = "", section: str = "") -> str:
     payload = {
         "roll_no": roll_no,
         "role": role,
-        "exp": datetime.datetime.utcnow() + timedelta(days=7)
+        "name": name,
+        "semester": semester,
+        "section": section,
+        "type": "access",
+        "jti": uuid.uuid4().hex,
+        "iat": time.time(),
+        "exp": datetime.datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_MINUTES)
+    }
+    return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
+
+def refresh_expiry() -> datetime.datetime:
+    return datetime.datetime.utcnow() + timedelta(days=REFRESH_TOKEN_DAYS)
+
+def create_refresh_token(roll_no: str, family: str, generation: int, expires_at: datetime.datetime) -> str:
+    payload = {
+        "roll_no": roll_no,
+        "type": "refresh",
+        "jti": uuid.uuid4().hex,
+        "fam": family,
+        "gen": generation,
+        "iat": time.time(),
+        "exp": expires_at
     }
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
-def verify_jwt_token(token: str) -> dict:
+async def issue_tokens(
+    user: dict, family: Optional[Tuple[str, int]] = None, expires_at: Optional[datetime.datetime] = None
+) -> dict:
+    # A login starts a new refresh token family; a refresh passes the family's next generation
+    expires_at = expires_at or refresh_expiry()
+    if family is None:
+        family = await refresh_families.start(user["roll_no"], expires_at)
+    return {
+        "access_token": create_jwt_token(
+            user["roll_no"],
+            user["role"],
+            name=user["name"],
+            semester=user.get("semester", ""),
+            section=user.get("section", ""),
+        ),
+        "refresh_token": create_refresh_token(user["roll_no"], *family, expires_at),
+        "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_MINUTES * 60,
+    }
+
+async def revoke_refresh_token(payload: dict) -> None:
+    if "fam" in payload:
+        await refresh_families.end(payload["fam"], payload["roll_no"])
+    else:
+        # Refresh tokens from before families were added
+        await revocations.revoke_token(payload["jti"], payload["exp"])
+
+def verify_jwt_token(token: str, token_type: str = "access") -> dict:
     try:
         payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        return payload
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
+    # Tokens issued before refresh tokens existed carry no type and act as access tokens
+    if payload.get("type", "access") != token_type:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    # In-memory check, no database read
+    if revocations.is_revoked(payload):
+        raise HTTPException(status_code=401, detail="Token revoked")
+    return payload
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    token_data = verify_jwt_token(credentials.credentials)
-    user = users_collection.find_one({"roll_no": token_data["roll_no"]})
+def user_from_claims(token_data: dict) -> Optional[dict]:
+    # Tokens issued before the profile claims were added still need a lookup
+    if "semester" not in token_data or "section" not in token_data:
+        return None
+    return {
+        "roll_no": token_data["roll_no"],
+        "name": token_data.get("name", ""),
+        "role": token_data["role"],
+        "semester": token_data["semester"],
+        "section": token_data["section"],
+    }
+
+async def resolve_user(token: str) -> dict:
+    token_data = verify_jwt_token(token)
+    if ADMISSION_ENABLED:
+        wait = user_limiter.acquire(token_data["roll_no"])
+        if wait:
+            raise HTTPException(status_code=429, detail="Too many requests", headers={"Retry-After": retry_after(wait)})
+    if TRUST_TOKEN_CLAIMS:
+        user = user_from_claims(token_data)
+        if user:
+            return user
+
+    roll_no = token_data["roll_no"]
+    user = user_cache.get(roll_no)
+    if user:
+        return user
+    version = user_cache.version()
+    user = await find_one(users_collection, {"roll_no": roll_no}, {"password_hash": 0})
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
+    user_cache.set(roll_no, user, version)
     return user
 
-# Initialize with sample data
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    return await resolve_user(credentials.credentials)
+
+async def get_current_user_or_token(
+    token: Optional[str] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+):
+    # EventSource and plain download links cannot send headers, so browsers pass ?token=
+    raw_token = credentials.credentials if credentials else token
+    if not raw_token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return await resolve_user(raw_token)
+
+# Startup: indexes, cache and revocation sync, sample data and the search index, in the background
+boot_task: Optional[asyncio.Task] = None
+
 @app.on_event("startup")
 async def startup_event():
-    # Import student data
+    # Nothing here waits on Mongo, so the worker serves liveness checks at once
+    global boot_task
+    push_hub.start()
+    metrics.start()
+    boot_task = asyncio.create_task(prepare_database())
+
+async def prepare_database():
+    """Boot work that needs Mongo, retried until it succeeds; /api/health/ready answers 503 until then."""
+    while True:
+        try:
+            await build_indexes()
+            await response_cache.start()
+            await revocations.start()
+
+            # Only one worker seeds when uvicorn runs several
+            if await acquire_seed_lock():
+                await seed_sample_data()
+            else:
+                print("Seeding skipped: another worker holds the seed lock")
+
+            await search_index.load()
+            break
+        except Exception as e:
+            print(f"Database preparation failed, retrying in {STARTUP_RETRY_SECONDS}s: {e}")
+            await asyncio.sleep(STARTUP_RETRY_SECONDS)
+    archiver.start()
+
+async def seed_sample_data():
+    # Import student data (student_data.py lives at the repository root)
     import sys
-    sys.path.append('/app')
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
     from student_data import STUDENT_DATA, ADMIN_DATA
-    
-    # Clear existing users (optional - remove this line if you want to keep existing data)
-    # users_collection.delete_many({})
-    
-    # Create students from STUDENT_DATA
-    for roll_no, student_info in STUDENT_DATA.items():
-        existing = users_collection.find_one({"roll_no": roll_no})
-        if not existing:
-            student_data = {
-                "roll_no": roll_no,
-                "name": student_info["name"],
-                "semester": student_info["semester"],
-                "section": student_info["section"],
-                "role": "student"
-            }
-            users_collection.insert_one(student_data)
-    
-    # Create admin from ADMIN_DATA
-    for roll_no, admin_info in ADMIN_DATA.items():
-        existing = users_collection.find_one({"roll_no": roll_no})
-        if not existing:
-            admin_data = {
-                "roll_no": roll_no,
-                "name": admin_info["name"],
-                "semester": admin_info.get("semester", ""),
-                "section": admin_info.get("section", ""),
-                "role": admin_info.get("role", "admin")
-            }
-            users_collection.insert_one(admin_data)
-    
-    # Sample notices
-    sample_notices = [
-        {
-            "id": str(uuid.uuid4()),
-            "title": "Mid-Term Examinations Schedule",
-            "description": "Mid-term examinations for AI Department will commence from March 15, 2024. All students are required to check their hall tickets online.",
-            "category": "Exams",
-            "date": "2024-03-01"
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "title": "Guest Lecture on Machine Learning",
-            "description": "Distinguished guest lecture by Dr. Sarah Johnson on 'Advanced Machine Learning Techniques' scheduled for March 20, 2024.",
-            "category": "Events",
-            "date": "2024-03-05"
-        }
-    ]
-    
-    for notice in sample_notices:
-        existing = notices_collection.find_one({"id": notice["id"]})
-        if not existing:
-            notices_collection.insert_one(notice)
-    
-    # Sample events
-    sample_events = [
-        {
-            "id": str(uuid.uuid4()),
-            "title": "AI Tech Fest 2024",
-            "description": "Annual technical festival showcasing AI projects and innovations by students",
-            "date": "2024-03-25",
-            "location": "AI Department Auditorium"
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "title": "Industry Connect Session",
-            "description": "Interaction session with AI industry professionals and placement opportunities",
-            "date": "2024-03-30",
-            "location": "Conference Hall"
-        }
-    ]
-    
-    for event in sample_events:
-        existing = events_collection.find_one({"id": event["id"]})
-        if not existing:
-            events_collection.insert_one(event)
-    
-    # Sample timetable
-    sample_timetable = [
-        {"id": str(uuid.uuid4()), "day": "Monday", "time": "09:00-10:00", "subject": "Machine Learning", "faculty": "Dr. Smith", "semester": "3", "section": "A"},
-        {"id": str(uuid.uuid4()), "day": "Monday", "time": "10:00-11:00", "subject": "Data Structures", "faculty": "Prof. Johnson", "semester": "3", "section": "A"},
-        {"id": str(uuid.uuid4()), "day": "Tuesday", "time": "09:00-10:00", "subject": "AI Fundamentals", "faculty": "Dr. Brown", "semester": "3", "section": "A"},
-        {"id": str(uuid.uuid4()), "day": "Wednesday", "time": "09:00-10:00", "subject": "Neural Networks", "faculty": "Prof. Davis", "semester": "3", "section": "A"},
-    ]
-    
-    for entry in sample_timetable:
-        existing = timetables_collection.find_one({"id": entry["id"]})
-        if not existing:
-            timetables_collection.insert_one(entry)
-    
-    # Sample faculty
-    sample_faculty = [
-        {
-            "id": str(uuid.uuid4()),
-            "name": "Dr. Sarah Smith",
-            "designation": "Professor & Head of Department",
-            "email": "sarah.smith@pbrvits.edu.in",
-            "photo_url": "https://images.unsplash.com/photo-1559839734-2b71ea197ec2?w=300&h=300&fit=crop&crop=face"
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "name": "Prof. Michael Johnson",
-            "designation": "Associate Professor",
-            "email": "michael.johnson@pbrvits.edu.in",
-            "photo_url": "https://images.unsplash.com/photo-1507003211169-0a1dd7228f2d?w=300&h=300&fit=crop&crop=face"
-        }
-    ]
-    
-    for faculty in sample_faculty:
-        existing = faculty_collection.find_one({"id": faculty["id"]})
-        if not existing:
-            faculty_collection.insert_one(faculty)
+
+    # Notices and events stored before dates were typed; runs before seeding so natural keys match
+    migrated = await migrate_dates()
+    for name, result in migrated.items():
+        if result["migrated"]:
+            print(f"Migrated {result['migrated']} {name} dates")
+        if result["quarantined"]:
+            print(f"Moved {name} with unparseable dates to {name}_archive: {result['quarantined']}")
+    counts = await seed_database(STUDENT_DATA, ADMIN_DATA)
+    print(f"Seeded database: {counts}")
+    # Sample data and documents from before delta sync get their change sequence here
+    stamped = await backfill_sequence()
+    if stamped:
+        print(f"Stamped {stamped} documents for delta sync")
+    changed = [name for name, result in counts.items() if result["inserted"] and name != "users"]
+    changed += [name for name, result in migrated.items() if result["migrated"] and name not in changed]
+    if changed:
+        await response_cache.mark_changed(*changed)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if boot_task and not boot_task.done():
+        boot_task.cancel()
+    await response_cache.stop()
+    await revocations.stop()
+    await push_hub.stop()
+    await metrics.stop()
+    await archiver.stop()
+    close_client()
 
 # Auth endpoints
 @app.post("/api/auth/login")
-async def login(user_data: UserLogin):
-    import re
-    
-    # Check if password matches roll number
-    if user_data.password != user_data.roll_no:
-        raise HTTPException(status_code=401, detail="Invalid password")
-    
+async def login(user_data: UserLogin, request: Request):
+    # Per client IP, and per client IP and roll number, before any lookup or password work
+    if ADMISSION_ENABLED:
+        wait = login_wait(request.headers, request.client, user_data.roll_no)
+        if wait:
+            raise HTTPException(
+                status_code=429, detail="Too many login attempts", headers={"Retry-After": retry_after(wait)}
+            )
+
     # Check if roll number matches the pattern 2473A31XXX (where XXX is any 3 digits)
-    roll_pattern = r"^2473A31\d{3}$"
-    if not re.match(roll_pattern, user_data.roll_no):
+    if not ROLL_NO_PATTERN.match(user_data.roll_no):
         raise HTTPException(status_code=401, detail="Invalid roll number format")
     
     # Check if user exists in database
-    user = users_collection.find_one({"roll_no": user_data.roll_no})
+    user = await find_one(users_collection, {"roll_no": user_data.roll_no})
     if not user:
         raise HTTPException(status_code=401, detail="Roll number not found. Contact admin.")
     
-    # Generate JWT token
-    token = create_jwt_token(user["roll_no"], user["role"])
+    # Verify the password off the event loop; the initial password is the roll number
+    try:
+        valid, new_hash = await password_verifier.verify(
+            user_data.password, user.get("password_hash"), user["roll_no"]
+        )
+    except PasswordQueueTimeout as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    if not valid:
+        raise HTTPException(status_code=401, detail="Invalid password")
+    if new_hash:
+        await users_collection.update_one({"roll_no": user["roll_no"]}, {"$set": {"password_hash": new_hash}})
     
+    # Generate JWT tokens
     return {
-        "access_token": token,
-        "token_type": "bearer",
+        **(await issue_tokens(user)),
         "user": {
             "roll_no": user["roll_no"],
             "name": user["name"],
@@ -283,6 +430,48 @@ async def login(user_data: UserLogin):
         }
     }
 
+@app.post("/api/auth/refresh")
+async def refresh_tokens(request: RefreshRequest):
+    payload = verify_jwt_token(request.refresh_token, token_type="refresh")
+    # Refreshing re-reads the user, so deleted users and profile changes are picked up here
+    user = await find_one(users_collection, {"roll_no": payload["roll_no"]}, {"password_hash": 0})
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found")
+    # Refresh tokens are single-use: each refresh rotates the pair
+    expires_at = refresh_expiry()
+    if "fam" not in payload:
+        await revoke_refresh_token(payload)
+        return await issue_tokens(user, expires_at=expires_at)
+    generation = await refresh_families.rotate(payload["fam"], payload["gen"], expires_at)
+    if generation is None:
+        raise HTTPException(status_code=401, detail="Token revoked")
+    return await issue_tokens(user, (payload["fam"], generation), expires_at)
+
+@app.post("/api/auth/logout")
+async def logout(
+    request: LogoutRequest,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+):
+    # The refresh token is enough on its own: after ACCESS_TOKEN_MINUTES idle the access token has expired
+    if not credentials and not request.refresh_token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    roll_no = None
+    if credentials:
+        try:
+            payload = verify_jwt_token(credentials.credentials)
+        except HTTPException:
+            if not request.refresh_token:
+                raise
+        else:
+            roll_no = payload["roll_no"]
+            if "jti" in payload:
+                await revocations.revoke_token(payload["jti"], payload["exp"])
+    if request.refresh_token:
+        refresh = verify_jwt_token(request.refresh_token, token_type="refresh")
+        if roll_no is None or refresh["roll_no"] == roll_no:
+            await revoke_refresh_token(refresh)
+    return {"message": "Logged out"}
+
 @app.get("/api/auth/me")
 async def get_current_user_info(current_user: dict = Depends(get_current_user)):
     return {
@@ -294,10 +483,30 @@ async def get_current_user_info(current_user: dict = Depends(get_current_user)):
     }
 
 # Notices endpoints
+async def paginated(collection, cursor: Optional[str], limit: int, legacy: bool, query: dict):
+    # legacy=true keeps the old unpaginated list response for older clients
+    if legacy:
+        return await find_all(collection, query, sort=KEYSET_SORT)
+    try:
+        return await fetch_page(collection, cursor, limit, query)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @app.get("/api/notices")
-async def get_notices(current_user: dict = Depends(get_current_user)):
-    notices = list(notices_collection.find({}, {"_id": 0}))
-    return notices
+async def get_notices(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1),
+    legacy: bool = False,
+    date_from: Optional[dt] = Query(None, alias="from"),
+    date_to: Optional[dt] = Query(None, alias="to"),
+    current_user: dict = Depends(get_current_user),
+):
+    query = date_range(date_from, date_to)
+    return await response_cache.cached_json(
+        request, "notices", (cursor, limit, legacy, date_from, date_to),
+        lambda: paginated(notices_collection, cursor, limit, legacy, query),
+    )
 
 @app.post("/api/notices")
 async def create_notice(notice: Notice, current_user: dict = Depends(get_current_user)):
@@ -306,14 +515,48 @@ async def create_notice(notice: Notice, current_user: dict = Depends(get_current
     
     notice_dict = notice.dict()
     notice_dict["id"] = str(uuid.uuid4())
-    notices_collection.insert_one(notice_dict)
+    await stamp([notice_dict])
+    await insert_one(notices_collection, dict(notice_dict))
+    await response_cache.mark_changed("notices")
+    search_index.add("notices", [notice_dict])
+    push_hub.publish("notice.created", without_change_fields(notice_dict))
     return {"message": "Notice created successfully", "id": notice_dict["id"]}
 
+async def bulk_create(collection, collection_name: str, event: str, items: List[dict], model):
+    try:
+        report, created = await insert_items(collection, items, model, sequenced=collection_name in SYNC_COLLECTIONS)
+    except BatchTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    # Caches, the search index and subscribers hear about the batch once
+    if created:
+        await response_cache.mark_changed(collection_name)
+        if collection_name in SEARCH_KINDS:
+            search_index.add(collection_name, created)
+        push_hub.publish(event, {"count": len(created), "ids": [doc["id"] for doc in created]})
+    return report
+
+@app.post("/api/notices/bulk")
+async def create_notices_bulk(items: List[dict] = Body(...), current_user: dict = Depends(get_current_user)):
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return await bulk_create(notices_collection, "notices", "notices.created", items, Notice)
+
 # Events endpoints
 @app.get("/api/events")
-async def get_events(current_user: dict = Depends(get_current_user)):
-    events = list(events_collection.find({}, {"_id": 0}))
-    return events
+async def get_events(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1),
+    legacy: bool = False,
+    date_from: Optional[dt] = Query(None, alias="from"),
+    date_to: Optional[dt] = Query(None, alias="to"),
+    current_user: dict = Depends(get_current_user),
+):
+    query = date_range(date_from, date_to)
+    return await response_cache.cached_json(
+        request, "events", (cursor, limit, legacy, date_from, date_to),
+        lambda: paginated(events_collection, cursor, limit, legacy, query),
+    )
 
 @app.post("/api/events")
 async def create_event(event: Event, current_user: dict = Depends(get_current_user)):
@@ -322,46 +565,354 @@ async def create_event(event: Event, current_user: dict = Depends(get_current_us
     
     event_dict = event.dict()
     event_dict["id"] = str(uuid.uuid4())
-    events_collection.insert_one(event_dict)
+    await stamp([event_dict])
+    await insert_one(events_collection, dict(event_dict))
+    await response_cache.mark_changed("events")
+    search_index.add("events", [event_dict])
+    push_hub.publish("event.created", without_change_fields(event_dict))
     return {"message": "Event created successfully", "id": event_dict["id"]}
 
+@app.post("/api/events/bulk")
+async def create_events_bulk(items: List[dict] = Body(...), current_user: dict = Depends(get_current_user)):
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return await bulk_create(events_collection, "events", "events.created", items, Event)
+
 # Timetable endpoints
-@app.get("/api/timetable")
-async def get_timetable(current_user: dict = Depends(get_current_user)):
+def timetable_query(current_user: dict) -> dict:
     if current_user["role"] == "student":
         # Filter by student's semester and section
-        timetable = list(timetables_collection.find({
+        return {
             "semester": current_user.get("semester", ""),
             "section": current_user.get("section", "")
-        }, {"_id": 0}))
-    else:
-        # Admin can see all timetables
-        timetable = list(timetables_collection.find({}, {"_id": 0}))
-    return timetable
+        }
+    # Admin can see all timetables
+    return {}
+
+def wants_ndjson(request: Request, stream: bool) -> bool:
+    return stream or "application/x-ndjson" in request.headers.get("accept", "")
+
+def ndjson_response(collection, query: dict, sort: list) -> StreamingResponse:
+    # Exports stream the cursor batch by batch, so memory stays flat and the first line goes out at once
+    batches = iter_batches(collection, query, sort=sort, batch_size=STREAM_BATCH_SIZE)
+    return StreamingResponse(ndjson_lines(batches), media_type="application/x-ndjson")
+
+@app.get("/api/timetable")
+async def get_timetable(request: Request, stream: bool = False, current_user: dict = Depends(get_current_user)):
+    query = timetable_query(current_user)
+    if wants_ndjson(request, stream):
+        return ndjson_response(timetables_collection, query, TIMETABLE_SORT)
+    return await response_cache.cached_json(
+        request, "timetables", tuple(query.values()),
+        lambda: find_all(timetables_collection, query, sort=TIMETABLE_SORT),
+    )
+
+@app.get("/api/timetable/grid")
+async def get_timetable_grid(
+    request: Request,
+    semester: Optional[str] = None,
+    section: Optional[str] = None,
+    current_user: dict = Depends(get_current_user),
+):
+    # Students get their own section; admins pick one
+    if current_user["role"] == "student":
+        semester, section = current_user.get("semester", ""), current_user.get("section", "")
+    elif not semester or not section:
+        raise HTTPException(status_code=400, detail="semester and section are required")
+
+    async def load():
+        entries = await find_all(timetables_collection, {"semester": semester, "section": section}, sort=TIMETABLE_SORT)
+        grid = build_grid(semester, section, entries)
+        key = feed_key(JWT_SECRET, semester, section)
+        grid["calendar_url"] = f"/api/timetable/calendar/{quote(semester)}/{quote(section)}.ics?key={key}"
+        return grid
+
+    # Built once per timetables version per section, like the list responses
+    return await response_cache.cached_json(request, "timetables", ("grid", semester, section), load)
+
+@app.get("/api/timetable/calendar/{semester}/{section}.ics")
+async def get_timetable_calendar(request: Request, semester: str, section: str, key: str = ""):
+    # Subscriptions poll with the key from the grid's calendar_url, no login; unchanged feeds cost a cache lookup
+    if not feed_key_matches(JWT_SECRET, semester, section, key):
+        raise HTTPException(status_code=404, detail="Calendar not found")
+
+    async def load():
+        entries = await find_all(timetables_collection, {"semester": semester, "section": section}, sort=TIMETABLE_SORT)
+        return build_grid(semester, section, entries)
+
+    return await response_cache.cached_json(
+        request, "timetables", ("ics", semester, section), load,
+        render=render_calendar, media_type=CALENDAR_MEDIA_TYPE,
+    )
+
+@app.post("/api/timetable/bulk")
+async def create_timetable_bulk(items: List[dict] = Body(...), current_user: dict = Depends(get_current_user)):
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return await bulk_create(timetables_collection, "timetables", "timetable.created", items, TimetableEntry)
 
 # Faculty endpoints
 @app.get("/api/faculty")
-async def get_faculty(current_user: dict = Depends(get_current_user)):
-    faculty = list(faculty_collection.find({}, {"_id": 0}))
-    return faculty
+async def get_faculty(request: Request, current_user: dict = Depends(get_current_user)):
+    return await response_cache.cached_json(
+        request, "faculty", None,
+        lambda: find_all(faculty_collection, sort=FACULTY_SORT),
+    )
 
 # Resources endpoints
-@app.get("/api/resources")
-async def get_resources(current_user: dict = Depends(get_current_user)):
+def resources_query(current_user: dict) -> dict:
     if current_user["role"] == "student":
         # Filter by student's semester
-        resources = list(resources_collection.find({
-            "semester": current_user.get("semester", "")
-        }, {"_id": 0}))
-    else:
-        # Admin can see all resources
-        resources = list(resources_collection.find({}, {"_id": 0}))
-    return resources
+        return {"semester": current_user.get("semester", "")}
+    # Admin can see all resources
+    return {}
+
+@app.get("/api/resources")
+async def get_resources(request: Request, stream: bool = False, current_user: dict = Depends(get_current_user)):
+    query = resources_query(current_user)
+    if wants_ndjson(request, stream):
+        return ndjson_response(resources_collection, query, RESOURCES_SORT)
+    return await response_cache.cached_json(
+        request, "resources", tuple(query.values()),
+        lambda: find_all(resources_collection, query, sort=RESOURCES_SORT),
+    )
+
+@app.post("/api/resources/upload")
+async def upload_resource(
+    request: Request,
+    title: str,
+    subject: str,
+    semester: str,
+    filename: str = "resource.pdf",
+    current_user: dict = Depends(get_current_user),
+):
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    # Raw request body, e.g. curl --data-binary @notes.pdf -H "Content-Type: application/pdf"
+    try:
+        stored = await store_upload(request.stream())
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    resource_id = str(uuid.uuid4())
+    resource = Resource(
+        id=resource_id,
+        title=title,
+        subject=subject,
+        semester=semester,
+        file_url=f"/api/resources/{resource_id}/download",
+        uploaded_by=current_user["roll_no"],
+        upload_date=dt.utcnow().strftime("%Y-%m-%d"),
+        file=ResourceFile(
+            sha256=stored["sha256"],
+            size=stored["size"],
+            content_type=request.headers.get("content-type", "application/octet-stream"),
+            filename=os.path.basename(filename),
+        ),
+    )
+    resource_dict = resource.model_dump()
+    await stamp([resource_dict])
+    await insert_one(resources_collection, dict(resource_dict))
+    await response_cache.mark_changed("resources")
+    search_index.add("resources", [resource_dict])
+    return {
+        "message": "Resource uploaded successfully",
+        "id": resource_id,
+        "sha256": stored["sha256"],
+        "size": stored["size"],
+        "deduplicated": stored["deduplicated"],
+    }
+
+@app.api_route("/api/resources/{resource_id}/download", methods=["GET", "HEAD"])
+async def download_resource(
+    resource_id: str,
+    request: Request,
+    current_user: dict = Depends(get_current_user_or_token),
+):
+    resource = await find_one(resources_collection, {"id": resource_id, **resources_query(current_user)})
+    if not resource or not resource.get("file"):
+        raise HTTPException(status_code=404, detail="Resource file not found")
+    stored = resource["file"]
+    try:
+        return blob_response(request, stored["sha256"], stored["content_type"], stored["filename"])
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Resource file not found")
+
+# Search endpoint
+@app.get("/api/search")
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    types: Optional[str] = None,
+    limit: int = Query(SEARCH_LIMIT_DEFAULT, ge=1, le=SEARCH_LIMIT_MAX),
+    current_user: dict = Depends(get_current_user),
+):
+    kinds = types.split(",") if types else None
+    if kinds and not set(kinds) <= set(SEARCH_KINDS):
+        raise HTTPException(status_code=400, detail=f"types must be a comma-separated subset of {', '.join(SEARCH_KINDS)}")
+
+    if not search_index.loaded:
+        raise HTTPException(status_code=503, detail="Search index is still loading", headers={"Retry-After": "5"})
+    # Picks up writes made by other workers
+    await search_index.refresh()
+
+    # Students only see resources for their own semester, as in get_resources
+    semester = current_user.get("semester", "") if current_user["role"] == "student" else None
+    return FastJSONResponse({"query": q, "results": search_index.search(q, limit, kinds, semester)})
+
+# Delta sync
+@app.get("/api/sync")
+async def sync_changes(since: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+    # Without `since` (or with an expired token) the response is a full snapshot with reset=true
+    try:
+        result = await changes_since(since)
+    except InvalidSyncToken as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Students only receive resources for their own semester, as in get_resources
+    if current_user["role"] == "student":
+        semester = current_user.get("semester", "")
+        resources = result["changes"]["resources"]
+        resources["upserted"] = [doc for doc in resources["upserted"] if doc.get("semester") == semester]
+    return FastJSONResponse(result)
+
+# Dashboard endpoint
+DASHBOARD_COLLECTIONS = ("notices", "events", "timetables", "resources", "faculty")
+
+@app.get("/api/dashboard")
+async def get_dashboard(
+    request: Request,
+    notices_limit: int = Query(PAGE_SIZE_DEFAULT, ge=1),
+    events_limit: int = Query(PAGE_SIZE_DEFAULT, ge=1),
+    timetable_limit: int = Query(PAGE_SIZE_DEFAULT, ge=1),
+    resources_limit: int = Query(PAGE_SIZE_DEFAULT, ge=1),
+    faculty_limit: int = Query(PAGE_SIZE_DEFAULT, ge=1),
+    current_user: dict = Depends(get_current_user),
+):
+    # One authentication and one response for everything the frontend shows after login
+    timetable_filter = timetable_query(current_user)
+    resources_filter = resources_query(current_user)
+    limits = (notices_limit, events_limit, timetable_limit, resources_limit, faculty_limit)
+
+    async def load():
+        notices, events, (timetable, timetable_more), (resources, resources_more), (faculty, faculty_more) = (
+            await asyncio.gather(
+                fetch_page(notices_collection, limit=notices_limit),
+                fetch_page(events_collection, limit=events_limit),
+                fetch_capped(timetables_collection, timetable_filter, TIMETABLE_SORT, timetable_limit),
+                fetch_capped(resources_collection, resources_filter, RESOURCES_SORT, resources_limit),
+                fetch_capped(faculty_collection, {}, FACULTY_SORT, faculty_limit),
+            )
+        )
+        more = {"timetable": timetable_more, "resources": resources_more, "faculty": faculty_more}
+        return {
+            "notices": notices,
+            "events": events,
+            "timetable": timetable,
+            "resources": resources,
+            "faculty": faculty,
+            # Lists cut at their limit; fetch them in full from their own routes. Notices and events page by next_cursor.
+            "truncated": [name for name, cut in more.items() if cut],
+        }
+
+    variant = (tuple(timetable_filter.values()), tuple(resources_filter.values()), limits)
+    return await response_cache.cached_json(request, DASHBOARD_COLLECTIONS, variant, load)
+
+# Push channel
+@app.get("/api/stream")
+async def stream_updates(request: Request, current_user: dict = Depends(get_current_user_or_token)):
+    last_event_id = request.headers.get("last-event-id")
+    subscriber = push_hub.subscribe(int(last_event_id) if last_event_id and last_event_id.isdigit() else None)
+    return StreamingResponse(
+        push_hub.stream(subscriber),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# Admin endpoints
+@app.post("/api/admin/students/import")
+async def import_students(
+    request: Request,
+    format: Optional[str] = None,
+    current_user: dict = Depends(get_current_user),
+):
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    # Raw CSV or NDJSON body, e.g. curl --data-binary @roster.csv -H "Content-Type: text/csv"
+    if not format:
+        content_type = request.headers.get("content-type", "")
+        format = "ndjson" if "ndjson" in content_type or "jsonl" in content_type else "csv"
+    if format not in ROSTER_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported roster format: {format}")
+
+    try:
+        return await import_roster(request.stream(), format, UserCreate)
+    except RosterTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Roster must be UTF-8 encoded")
+
+@app.post("/api/admin/users/{roll_no}/revoke-tokens")
+async def revoke_user_tokens(roll_no: str, current_user: dict = Depends(get_current_user)):
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    # Every access and refresh token issued to the user so far stops working on all workers
+    await revocations.revoke_user(roll_no, REFRESH_TOKEN_DAYS * 86400)
+    user_cache.invalidate(roll_no)
+    return {"message": f"Tokens revoked for {roll_no}"}
 
 # Health check
 @app.get("/api/health")
 async def health_check():
-    return {"status": "healthy", "service": "Dept-AI Hub - PBR VITS API"}
+    return {
+        "status": "healthy",
+        "service": "Dept-AI Hub - PBR VITS API",
+        "user_cache": user_cache.stats(),
+        "response_cache": response_cache.stats(),
+        "push": push_hub.stats(),
+        "search": search_index.stats(),
+        "passwords": password_verifier.stats(),
+        "revocations": revocations.stats(),
+        "refresh_families": refresh_families.stats(),
+        "archive": archiver.stats(),
+        "admission": {
+            "enabled": ADMISSION_ENABLED,
+            "database": db_gate.stats(),
+            "user_rate_limit": user_limiter.stats(),
+            "login_rate_limit": login_limiter.stats(),
+            "login_ip_rate_limit": login_ip_limiter.stats(),
+        },
+    }
+
+@app.get("/api/health/live")
+async def liveness_check():
+    # No I/O: answers as long as the event loop does
+    return {"status": "alive"}
+
+@app.get("/api/health/ready")
+async def readiness_check():
+    booted = boot_task is not None and boot_task.done() and not boot_task.cancelled()
+    try:
+        latency = await asyncio.wait_for(ping(), READY_PING_TIMEOUT_SECONDS)
+        mongo = {"reachable": True, "ping_ms": round(latency * 1000, 3)}
+    except asyncio.TimeoutError:
+        mongo = {"reachable": False, "error": f"ping took over {READY_PING_TIMEOUT_SECONDS}s"}
+    except PyMongoError as e:
+        mongo = {"reachable": False, "error": str(e)}
+    ready = booted and mongo["reachable"]
+    return FastJSONResponse(
+        {"status": "ready" if ready else "not_ready", "booted": booted, "mongo": {**mongo, "pool": pool_monitor.stats()}},
+        status_code=200 if ready else 503,
+    )
+
+# Prometheus metrics
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    if not metrics.enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 if __name__ == "__main__":
     import uvicorn
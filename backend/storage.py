@@ -0,0 +1,193 @@
+from email.utils import formatdate, parsedate_to_datetime
+from fastapi import Request, Response
+from typing import AsyncIterator, Optional, Tuple
+from urllib.parse import quote
+import asyncio
+import hashlib
+import mmap
+import os
+import tempfile
+
+from response_cache import etag_matches
+
+# Resource storage settings
+RESOURCE_STORAGE_DIR = os.environ.get(
+    "RESOURCE_STORAGE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "resource_files")
+)
+RESOURCE_MAX_UPLOAD_BYTES = int(os.environ.get("RESOURCE_MAX_UPLOAD_BYTES", str(100 * 1024 * 1024)))
+RESOURCE_WRITE_BUFFER_BYTES = int(os.environ.get("RESOURCE_WRITE_BUFFER_BYTES", str(1024 * 1024)))
+RESOURCE_CHUNK_BYTES = int(os.environ.get("RESOURCE_CHUNK_BYTES", str(256 * 1024)))
+# Types the browser may render in place; anything else (HTML, SVG, scripts) is served as a download
+INLINE_CONTENT_TYPES = frozenset(("application/pdf", "image/png", "image/jpeg", "image/gif", "image/webp"))
+# When nginx fronts the API, e.g. "/protected-resources/", downloads are handed to it via X-Accel-Redirect
+RESOURCE_ACCEL_REDIRECT_PREFIX = os.environ.get("RESOURCE_ACCEL_REDIRECT_PREFIX", "")
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+def blob_path(sha256: str) -> str:
+    # Content-addressed: identical uploads share one file
+    return os.path.join(RESOURCE_STORAGE_DIR, sha256[:2], sha256)
+
+
+async def store_upload(chunks: AsyncIterator[bytes], max_bytes: int = RESOURCE_MAX_UPLOAD_BYTES) -> dict:
+    """Stream an upload to disk while hashing it; memory use is bounded by the write buffer."""
+    tmp_dir = os.path.join(RESOURCE_STORAGE_DIR, "tmp")
+    os.makedirs(tmp_dir, exist_ok=True)
+    tmp = tempfile.NamedTemporaryFile(dir=tmp_dir, delete=False)
+    hasher = hashlib.sha256()
+    buffer = bytearray()
+    size = 0
+    try:
+        async for chunk in chunks:
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLarge(f"File exceeds {max_bytes} bytes")
+            hasher.update(chunk)
+            buffer += chunk
+            if len(buffer) >= RESOURCE_WRITE_BUFFER_BYTES:
+                await asyncio.to_thread(tmp.write, bytes(buffer))
+                buffer.clear()
+        if buffer:
+            await asyncio.to_thread(tmp.write, bytes(buffer))
+        await asyncio.to_thread(tmp.close)
+    except BaseException:
+        tmp.close()
+        os.remove(tmp.name)
+        raise
+
+    sha256 = hasher.hexdigest()
+    path = blob_path(sha256)
+    deduplicated = os.path.exists(path)
+    if deduplicated:
+        os.remove(tmp.name)
+    else:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp.name, path)
+    return {"sha256": sha256, "size": size, "deduplicated": deduplicated}
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Return (start, end) inclusive for a single byte range, None for no/ignored range.
+
+    Raises ValueError when the range cannot be satisfied. Multi-range requests are
+    answered with the full body, which RFC 9110 allows.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start_text, _, end_text = header[6:].strip().partition("-")
+    if not all(text.isascii() and text.isdigit() for text in (start_text, end_text) if text):
+        return None
+    start = int(start_text) if start_text else None
+    end = int(end_text) if end_text else None
+    if start is None:
+        if end is None:
+            return None
+        # Suffix range: the last `end` bytes; a zero-length suffix selects nothing
+        if end == 0 or size == 0:
+            raise ValueError("range not satisfiable")
+        return max(size - end, 0), size - 1
+    if end is not None and end < start:
+        # Not a valid byte-range-spec, so the header is ignored (RFC 9110 14.1.1)
+        return None
+    if start >= size:
+        raise ValueError("range not satisfiable")
+    return start, size - 1 if end is None else min(end, size - 1)
+
+
+class BlobResponse(Response):
+    """Sends a byte range of a stored file without reading it into Python where the server allows.
+
+    Preference order: the ASGI zero-copy extension (sendfile), the pathsend
+    extension for whole files, then memory-mapped chunks.
+    """
+
+    def __init__(self, path: str, start: int, end: int, status_code: int, headers: dict):
+        super().__init__(status_code=status_code, headers=headers)
+        self.path = path
+        self.start = start
+        self.count = end - start + 1
+
+    async def __call__(self, scope, receive, send):
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        extensions = scope.get("extensions") or {}
+        if scope["method"] == "HEAD" or self.count <= 0:
+            await send({"type": "http.response.body", "body": b""})
+        elif "http.response.zerocopysend" in extensions:
+            with open(self.path, "rb") as f:
+                await send({"type": "http.response.zerocopysend", "file": f,
+                            "offset": self.start, "count": self.count})
+        elif "http.response.pathsend" in extensions and self.status_code == 200:
+            await send({"type": "http.response.pathsend", "path": self.path})
+        else:
+            with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                position = self.start
+                end = self.start + self.count
+                while position < end:
+                    chunk_end = min(position + RESOURCE_CHUNK_BYTES, end)
+                    await send({"type": "http.response.body", "body": mapped[position:chunk_end],
+                                "more_body": chunk_end < end})
+                    position = chunk_end
+
+
+def not_modified(request: Request, etag: str, mtime: float) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def content_disposition(filename: str, content_type: str) -> str:
+    # Uploads come back from the API origin, so only types that cannot carry script open inline
+    disposition = "inline" if content_type.split(";")[0].strip().lower() in INLINE_CONTENT_TYPES else "attachment"
+    # RFC 5987 form, as Starlette's FileResponse does: header values must be Latin-1 and the name may not be
+    return f"{disposition}; filename*=UTF-8''{quote(filename)}"
+
+
+def blob_response(request: Request, sha256: str, content_type: str, filename: str) -> Response:
+    """Serve a stored upload; raises FileNotFoundError when this host has no copy of the blob."""
+    path = blob_path(sha256)
+    stat = os.stat(path)
+    size = stat.st_size
+    etag = f'"{sha256}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, max-age=86400",
+        "Content-Disposition": content_disposition(filename, content_type),
+        # Browsers must not second-guess the stored type and render an upload as HTML
+        "X-Content-Type-Options": "nosniff",
+    }
+    if not_modified(request, etag, stat.st_mtime):
+        return Response(status_code=304, headers=headers)
+
+    if RESOURCE_ACCEL_REDIRECT_PREFIX:
+        # nginx serves the bytes (with its own Range handling) straight from disk
+        headers["X-Accel-Redirect"] = f"{RESOURCE_ACCEL_REDIRECT_PREFIX.rstrip('/')}/{sha256[:2]}/{sha256}"
+        return Response(headers=headers, media_type=content_type)
+
+    byte_range = None
+    if_range = request.headers.get("if-range")
+    if not if_range or if_range == etag:
+        try:
+            byte_range = parse_range(request.headers.get("range"), size)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+
+    headers["Content-Type"] = content_type
+    if byte_range:
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(end - start + 1)
+        return BlobResponse(path, start, end, 206, headers)
+    headers["Content-Length"] = str(size)
+    return BlobResponse(path, 0, size - 1, 200, headers)
@@ -0,0 +1,202 @@
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+import hashlib
+import hmac
+import os
+import re
+
+# Calendar export settings
+# Monday of the first teaching week; weekly classes repeat from here (and until TIMETABLE_TERM_END, if set)
+TIMETABLE_TERM_START = date.fromisoformat(os.environ.get("TIMETABLE_TERM_START", "2024-01-01"))
+TIMETABLE_TERM_END = os.environ.get("TIMETABLE_TERM_END", "")
+TIMETABLE_TIMEZONE = os.environ.get("TIMETABLE_TIMEZONE", "Asia/Kolkata")
+CALENDAR_NAME = os.environ.get("CALENDAR_NAME", "AI Department Timetable")
+
+DAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday")
+DAY_INDEX = {day: index for index, day in enumerate(DAYS)}
+SLOT_PATTERN = re.compile(r"^\s*(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})\s*$")
+CALENDAR_MEDIA_TYPE = "text/calendar; charset=utf-8"
+# Without TIMETABLE_TERM_END, the time zone definition covers this many years from the term start
+TIMEZONE_YEARS = 5
+
+
+def parse_slot(value: str) -> Optional[Tuple[int, int]]:
+    """Read a slot such as 09:00-10:00 as (start, end) minutes since midnight; None if it is not valid."""
+    match = SLOT_PATTERN.match(value or "")
+    if not match:
+        return None
+    start_hour, start_minute, end_hour, end_minute = (int(part) for part in match.groups())
+    start, end = start_hour * 60 + start_minute, end_hour * 60 + end_minute
+    if start_minute > 59 or end_minute > 59 or end > 24 * 60 or start >= end:
+        return None
+    return start, end
+
+
+def build_grid(semester: str, section: str, entries: List[dict]) -> dict:
+    """Group one section's entries into a Monday to Saturday grid, ordered by slot, and flag clashes.
+
+    Clashes are found with one sweep per day over the start-ordered slots:
+    an entry clashes with the one that ends latest among those before it.
+    Entries with an unknown day or an unreadable time are listed as unscheduled.
+    """
+    by_day: Dict[str, List[Tuple[Tuple[int, int], dict]]] = {day: [] for day in DAYS}
+    unscheduled = []
+    for entry in entries:
+        slot = parse_slot(entry.get("time", ""))
+        if slot is None or entry.get("day") not in DAY_INDEX:
+            unscheduled.append(entry)
+            continue
+        by_day[entry["day"]].append((slot, entry))
+
+    days, clashes = [], []
+    for day in DAYS:
+        slots = sorted(by_day[day], key=lambda item: (item[0], item[1].get("id", "")))
+        latest = None
+        for slot, entry in slots:
+            if latest is not None and slot[0] < latest[0][1]:
+                clashes.append({
+                    "day": day,
+                    "entries": [latest[1].get("id"), entry.get("id")],
+                    "times": [latest[1]["time"], entry["time"]],
+                    "subjects": [latest[1].get("subject"), entry.get("subject")],
+                })
+            if latest is None or slot[1] > latest[0][1]:
+                latest = (slot, entry)
+        days.append({"day": day, "classes": [entry for _, entry in slots]})
+
+    return {
+        "semester": semester,
+        "section": section,
+        "days": days,
+        "clashes": clashes,
+        "unscheduled": unscheduled,
+    }
+
+
+def feed_key(secret: str, semester: str, section: str) -> str:
+    """Key for a section's calendar feed URL; calendar apps cannot send a bearer token or refresh one."""
+    message = f"calendar:{semester}:{section}".encode()
+    return hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()[:32]
+
+
+def feed_key_matches(secret: str, semester: str, section: str, key: str) -> bool:
+    return hmac.compare_digest(feed_key(secret, semester, section), key or "")
+
+
+def _escape(text: str) -> str:
+    return (
+        str(text).replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\r\n", "\\n").replace("\n", "\\n")
+    )
+
+
+def _fold(line: str) -> str:
+    # RFC 5545 lines are at most 75 octets; continuation lines start with a space
+    raw = line.encode()
+    if len(raw) <= 75:
+        return line
+    parts, start, limit = [], 0, 75
+    while start < len(raw):
+        end = min(start + limit, len(raw))
+        # Do not split a multi-byte character
+        while end < len(raw) and (raw[end] & 0xC0) == 0x80:
+            end -= 1
+        parts.append(raw[start:end].decode())
+        start, limit = end, 74
+    return "\r\n ".join(parts)
+
+
+def _local_time(day: str, minutes: int) -> str:
+    moment = datetime.combine(TIMETABLE_TERM_START + timedelta(days=DAY_INDEX[day]), datetime.min.time())
+    return (moment + timedelta(minutes=minutes)).strftime("%Y%m%dT%H%M%S")
+
+
+def _utc_offset(offset: timedelta) -> str:
+    minutes = int(offset.total_seconds()) // 60
+    sign = "-" if minutes < 0 else "+"
+    return f"{sign}{abs(minutes) // 60:02d}{abs(minutes) % 60:02d}"
+
+
+def _zone_at(zone: ZoneInfo, instant: int) -> Tuple[timedelta, str, bool]:
+    moment = datetime.fromtimestamp(instant, zone)
+    return moment.utcoffset(), moment.tzname(), bool(moment.dst())
+
+
+@lru_cache(maxsize=4)
+def timezone_lines(name: str, start: date, end: date) -> Tuple[str, ...]:
+    """A VTIMEZONE for `name`, which RFC 5545 requires for every TZID a calendar uses.
+
+    Lists the observance in force at `start` and every change of offset up to
+    `end`, each as a one-off observance, so it needs no recurrence rules of its own.
+    """
+    zone = ZoneInfo(name)
+    instant = int(datetime.combine(start, datetime.min.time(), timezone.utc).timestamp()) - 86400
+    last = int(datetime.combine(end, datetime.min.time(), timezone.utc).timestamp()) + 86400
+    current = _zone_at(zone, instant)
+    # (first instant, previous offset, offset, name, daylight)
+    observances = [(instant, current[0], *current)]
+    while instant < last:
+        following = instant + 86400
+        if _zone_at(zone, following)[0] != current[0]:
+            # Narrow the change down to the second
+            low, high = instant, following
+            while high - low > 1:
+                middle = (low + high) // 2
+                low, high = (middle, high) if _zone_at(zone, middle)[0] == current[0] else (low, middle)
+            changed = _zone_at(zone, high)
+            observances.append((high, current[0], *changed))
+            current = changed
+        instant = following
+
+    lines = ["BEGIN:VTIMEZONE", f"TZID:{name}"]
+    for instant, offset_from, offset_to, abbreviation, daylight in observances:
+        kind = "DAYLIGHT" if daylight else "STANDARD"
+        # DTSTART is local time as it was just before the change
+        local_start = datetime.fromtimestamp(instant, timezone.utc).replace(tzinfo=None) + offset_from
+        lines += [
+            f"BEGIN:{kind}",
+            f"DTSTART:{local_start.strftime('%Y%m%dT%H%M%S')}",
+            f"TZOFFSETFROM:{_utc_offset(offset_from)}",
+            f"TZOFFSETTO:{_utc_offset(offset_to)}",
+            f"TZNAME:{_escape(abbreviation)}",
+            f"END:{kind}",
+        ]
+    lines.append("END:VTIMEZONE")
+    return tuple(lines)
+
+
+def render_calendar(grid: dict) -> bytes:
+    """The grid as an iCalendar feed with one weekly recurring event per class."""
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+    recurrence = "RRULE:FREQ=WEEKLY"
+    term_end = TIMETABLE_TERM_START + timedelta(days=365 * TIMEZONE_YEARS)
+    if TIMETABLE_TERM_END:
+        term_end = date.fromisoformat(TIMETABLE_TERM_END)
+        recurrence += ";UNTIL=" + term_end.strftime("%Y%m%dT235959Z")
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//PBR VITS//Dept-AI Hub//EN",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_escape(CALENDAR_NAME)} - Semester {_escape(grid['semester'])}, Section {_escape(grid['section'])}",
+        f"X-WR-TIMEZONE:{TIMETABLE_TIMEZONE}",
+        *timezone_lines(TIMETABLE_TIMEZONE, TIMETABLE_TERM_START, term_end),
+    ]
+    for day in grid["days"]:
+        for entry in day["classes"]:
+            start, end = parse_slot(entry["time"])
+            lines += [
+                "BEGIN:VEVENT",
+                f"UID:{entry.get('id')}@dept-ai-hub",
+                f"DTSTAMP:{stamp}",
+                f"DTSTART;TZID={TIMETABLE_TIMEZONE}:{_local_time(day['day'], start)}",
+                f"DTEND;TZID={TIMETABLE_TIMEZONE}:{_local_time(day['day'], end)}",
+                recurrence,
+                f"SUMMARY:{_escape(entry.get('subject', ''))}",
+                f"DESCRIPTION:{_escape(entry.get('faculty', ''))}",
+                "END:VEVENT",
+            ]
+    lines.append("END:VCALENDAR")
+    return ("\r\n".join(_fold(line) for line in lines) + "\r\n").encode()
@@ -0,0 +1,86 @@
+from collections import OrderedDict
+from typing import Optional
+import os
+import time
+
+from response_cache import response_cache
+
+# User cache settings
+USER_CACHE_SIZE = int(os.environ.get("USER_CACHE_SIZE", "10000"))
+USER_CACHE_TTL_SECONDS = float(os.environ.get("USER_CACHE_TTL_SECONDS", "300"))
+
+
+# Version key in the response cache's cache_versions; writes to users documents call mark_changed(USERS_VERSION)
+USERS_VERSION = "users"
+
+
+class UserCache:
+    """In-process LRU cache of user documents keyed by roll_no, with a TTL.
+
+    Entries remember the users version they were read at, and an entry from an
+    older version is a miss. Like the response cache, a change made by any worker
+    bumps that version through mark_changed(USERS_VERSION), and the other workers
+    pick the bump up on their next version sync. A role or section change is thus
+    seen everywhere within RESPONSE_CACHE_SYNC_SECONDS; the TTL only backs that up.
+    """
+
+    def __init__(self, max_size: int = USER_CACHE_SIZE, ttl_seconds: float = USER_CACHE_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def version(self) -> int:
+        return response_cache.version(USERS_VERSION)
+
+    def get(self, roll_no: str) -> Optional[dict]:
+        entry = self._entries.get(roll_no)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, version, user = entry
+        if expires_at < time.monotonic() or version != self.version():
+            del self._entries[roll_no]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(roll_no)
+        self.hits += 1
+        return user
+
+    def set(self, roll_no: str, user: dict, version: Optional[int] = None) -> None:
+        """Cache a user read at `version`, taken before the read so that a change landing meanwhile leaves it stale."""
+        if self.max_size <= 0:
+            return
+        version = self.version() if version is None else version
+        self._entries[roll_no] = (time.monotonic() + self.ttl_seconds, version, user)
+        self._entries.move_to_end(roll_no)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, roll_no: str) -> None:
+        if self._entries.pop(roll_no, None) is not None:
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+user_cache = UserCache()
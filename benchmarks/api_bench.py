@@ -0,0 +1,118 @@
+"""In-process benchmark suite for the FastAPI app.
+
+Drives server.app through httpx's ASGI transport (no network, no uvicorn) against
+mongomock or a throwaway database on a local mongod, and reports requests/s and
+p50/p95/p99 latency per route. Results can be saved as a baseline and diffed
+against a later commit:
+
+    python benchmarks/api_bench.py --size 10000 --output baseline.json
+    python benchmarks/api_bench.py --size 10000 --compare baseline.json
+    python benchmarks/api_bench.py --store mongod --mongo-url mongodb://localhost:27017 --no-cache
+"""
+import argparse
+import asyncio
+import json
+import platform
+import sys
+
+import httpx
+
+from harness import git_commit, load_app, login_roll_no, run_route, seed, teardown
+
+STUDENT = login_roll_no(7)
+
+
+def routes(student_headers, admin_headers):
+    return {
+        "login": ("POST", "/api/auth/login", None, {"roll_no": STUDENT, "password": STUDENT}),
+        "auth_me": ("GET", "/api/auth/me", student_headers, None),
+        "notices": ("GET", "/api/notices", student_headers, None),
+        "notices_legacy": ("GET", "/api/notices?legacy=true", student_headers, None),
+        "events": ("GET", "/api/events", student_headers, None),
+        "timetable": ("GET", "/api/timetable", student_headers, None),
+        "timetable_admin": ("GET", "/api/timetable", admin_headers, None),
+        "resources": ("GET", "/api/resources", student_headers, None),
+        "resources_admin": ("GET", "/api/resources", admin_headers, None),
+        "faculty": ("GET", "/api/faculty", student_headers, None),
+        "dashboard": ("GET", "/api/dashboard", student_headers, None),
+        "health": ("GET", "/api/health", None, None),
+    }
+
+
+async def run(args):
+    env = {"RESPONSE_CACHE_ENABLED": "false"} if args.no_cache else {}
+    server = load_app(args.store, args.mongo_url, env)
+    await seed(server, args.size)
+
+    results = {}
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        login = await client.post("/api/auth/login", json={"roll_no": STUDENT, "password": STUDENT})
+        login.raise_for_status()
+        student_headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        admin_headers = {"Authorization": f"Bearer {server.create_jwt_token('admin', 'admin')}"}
+
+        selected = routes(student_headers, admin_headers)
+        for name, (method, path, headers, body) in selected.items():
+            if args.routes and name not in args.routes:
+                continue
+            await run_route(client, method, path, min(args.requests, 20), args.concurrency, headers, body)
+            results[name] = await run_route(client, method, path, args.requests, args.concurrency, headers, body)
+            stats = results[name]
+            print(f"   {name:<16} {stats['requests_per_s']:>10} req/s   p50 {stats['p50_ms']:>8} ms   "
+                  f"p95 {stats['p95_ms']:>8} ms   p99 {stats['p99_ms']:>8} ms   errors {stats['errors']}")
+
+    await teardown(server, args.store)
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "store": args.store,
+            "size": args.size,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "response_cache": not args.no_cache,
+            "python": platform.python_version(),
+        },
+        "routes": results,
+    }
+
+
+def compare(baseline, current):
+    print(f"\n📊 {baseline['meta'].get('commit')} → {current['meta'].get('commit')}")
+    for name, stats in current["routes"].items():
+        before = baseline["routes"].get(name)
+        if not before:
+            print(f"   {name:<16} (new)")
+            continue
+        rps_change = (stats["requests_per_s"] / before["requests_per_s"] - 1) * 100 if before["requests_per_s"] else 0
+        p99_change = (stats["p99_ms"] / before["p99_ms"] - 1) * 100 if before["p99_ms"] else 0
+        print(f"   {name:<16} req/s {before['requests_per_s']:>10} → {stats['requests_per_s']:<10} ({rps_change:+.1f}%)   "
+              f"p99 {before['p99_ms']} → {stats['p99_ms']} ms ({p99_change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--store", choices=("mongomock", "mongod"), default="mongomock")
+    parser.add_argument("--mongo-url", help="mongod to use with --store mongod")
+    parser.add_argument("--size", type=int, default=1000, help="number of seeded users; content scales with it")
+    parser.add_argument("--requests", type=int, default=500, help="requests per route")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--routes", nargs="*", help="only run these routes")
+    parser.add_argument("--no-cache", action="store_true", help="disable the response cache")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--compare", help="baseline results JSON to diff against")
+    args = parser.parse_args()
+
+    print(f"🚀 {args.store}, {args.size} users, {args.requests} requests/route at concurrency {args.concurrency}")
+    result = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), result)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
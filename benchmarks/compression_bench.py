@@ -0,0 +1,103 @@
+"""CPU time per request and bytes on the wire, by Accept-Encoding.
+
+Runs each route with identity, gzip and br, first with the response cache on
+(collection responses are compressed once per version and then served from the
+precompressed copy) and then with it off (every request is serialised and
+compressed again). CPU time is process time for the whole in-process run, client
+included, so compare rows against each other rather than reading them as
+absolute server cost:
+
+    python benchmarks/compression_bench.py --size 2000 --requests 300
+    python benchmarks/compression_bench.py --routes notices_legacy dashboard
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+import httpx
+
+from harness import load_app, seed, teardown
+
+ENCODINGS = ("identity", "gzip", "br")
+
+
+def routes():
+    return {
+        "notices_legacy": "/api/notices?legacy=true",
+        "events_legacy": "/api/events?legacy=true",
+        "timetable_admin": "/api/timetable",
+        "resources_admin": "/api/resources",
+        "dashboard": "/api/dashboard",
+    }
+
+
+async def measure(client, path, headers, requests):
+    wire_bytes = 0
+    encodings = set()
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    for _ in range(requests):
+        # Raw bytes, before httpx decodes them, are what was sent
+        async with client.stream("GET", path, headers=headers) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_raw():
+                wire_bytes += len(chunk)
+            encodings.add(response.headers.get("content-encoding", "identity"))
+    cpu, wall = time.process_time() - cpu_start, time.perf_counter() - wall_start
+    return {
+        "cpu_ms_per_request": round(cpu / requests * 1000, 3),
+        "wall_ms_per_request": round(wall / requests * 1000, 3),
+        "bytes_per_response": wire_bytes // requests,
+        "served_as": ",".join(sorted(encodings)),
+    }
+
+
+async def run(args):
+    server = load_app(args.store, args.mongo_url)
+    await seed(server, args.size)
+
+    results = {}
+    transport = httpx.ASGITransport(app=server.app)
+    admin = f"Bearer {server.create_jwt_token('admin', 'admin')}"
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for cached in (True, False):
+            server.response_cache.enabled = cached
+            mode = "precompressed" if cached else "per_request"
+            print(f"\n🔍 response cache {'on' if cached else 'off'} ({mode})")
+            for name, path in routes().items():
+                if args.routes and name not in args.routes:
+                    continue
+                for encoding in ENCODINGS:
+                    headers = {"Authorization": admin, "Accept-Encoding": encoding}
+                    await measure(client, path, headers, min(args.requests, 10))
+                    result = await measure(client, path, headers, args.requests)
+                    results[f"{mode}/{name}/{encoding}"] = result
+                    print(f"   {name:<16} {encoding:<9} {result['cpu_ms_per_request']:>8} ms cpu   "
+                          f"{result['bytes_per_response']:>9} bytes   served as {result['served_as']}")
+
+    await teardown(server, args.store)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--store", choices=("mongomock", "mongod"), default="mongomock")
+    parser.add_argument("--mongo-url", help="mongod to use with --store mongod")
+    parser.add_argument("--size", type=int, default=1000, help="users to seed; content scales with it")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--routes", nargs="+", help="subset of route names to run")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    print(f"🚀 {args.store}, {args.size} users, {args.requests} requests per route and encoding")
+    results = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n📄 Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""Concurrency benchmark for the Dept-AI Hub API.
+
+Fires many concurrent clients at a running server and reports throughput and
+latency percentiles. Run it once against the old synchronous build and once
+against the current build, then compare the two result files:
+
+    python benchmarks/concurrency_bench.py --label before --output before.json
+    python benchmarks/concurrency_bench.py --label after --output after.json --compare before.json
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+
+import httpx
+
+DEFAULT_ROUTES = [
+    "api/notices",
+    "api/events",
+    "api/timetable",
+    "api/resources",
+    "api/faculty",
+    "api/auth/me",
+]
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class ConcurrencyBenchmark:
+    def __init__(self, base_url, roll_no, clients, requests_per_client, routes):
+        self.base_url = base_url.rstrip("/")
+        self.roll_no = roll_no
+        self.clients = clients
+        self.requests_per_client = requests_per_client
+        self.routes = routes
+        self.latencies = []
+        self.errors = 0
+
+    async def login(self, client):
+        response = await client.post(
+            f"{self.base_url}/api/auth/login",
+            json={"roll_no": self.roll_no, "password": self.roll_no},
+        )
+        response.raise_for_status()
+        return response.json()["access_token"]
+
+    async def run_client(self, client, headers, offset):
+        for i in range(self.requests_per_client):
+            route = self.routes[(offset + i) % len(self.routes)]
+            start = time.perf_counter()
+            try:
+                response = await client.get(f"{self.base_url}/{route}", headers=headers)
+                if response.status_code != 200:
+                    self.errors += 1
+            except httpx.HTTPError:
+                self.errors += 1
+            self.latencies.append(time.perf_counter() - start)
+
+    async def run(self):
+        limits = httpx.Limits(max_connections=self.clients, max_keepalive_connections=self.clients)
+        async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+            token = await self.login(client)
+            headers = {"Authorization": f"Bearer {token}"}
+            start = time.perf_counter()
+            await asyncio.gather(*(self.run_client(client, headers, n) for n in range(self.clients)))
+            elapsed = time.perf_counter() - start
+
+        total = len(self.latencies)
+        return {
+            "clients": self.clients,
+            "requests": total,
+            "errors": self.errors,
+            "elapsed_s": round(elapsed, 3),
+            "requests_per_s": round(total / elapsed, 1) if elapsed else 0.0,
+            "latency_ms": {
+                "mean": round(statistics.mean(self.latencies) * 1000, 2) if total else 0.0,
+                "p50": round(percentile(self.latencies, 50) * 1000, 2),
+                "p95": round(percentile(self.latencies, 95) * 1000, 2),
+                "p99": round(percentile(self.latencies, 99) * 1000, 2),
+            },
+        }
+
+
+def print_comparison(before, after):
+    print(f"\n📊 {before.get('label', 'before')} → {after.get('label', 'after')}")
+    rps_before, rps_after = before["requests_per_s"], after["requests_per_s"]
+    speedup = rps_after / rps_before if rps_before else float("inf")
+    print(f"   Throughput: {rps_before} → {rps_after} req/s ({speedup:.2f}x)")
+    for key in ("p50", "p95", "p99"):
+        print(f"   {key}: {before['latency_ms'][key]} → {after['latency_ms'][key]} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--roll-no", default="2473A31139")
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=20, help="requests per client")
+    parser.add_argument("--routes", nargs="*", default=DEFAULT_ROUTES)
+    parser.add_argument("--label", default="run")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--compare", help="previous results JSON to compare against")
+    args = parser.parse_args()
+
+    print(f"🚀 {args.clients} concurrent clients x {args.requests} requests against {args.base_url}")
+    bench = ConcurrencyBenchmark(args.base_url, args.roll_no, args.clients, args.requests, args.routes)
+    result = asyncio.run(bench.run())
+    result["label"] = args.label
+    print(json.dumps(result, indent=2))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(json.load(f), result)
+
+    return 0 if result["errors"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
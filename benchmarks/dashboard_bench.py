@@ -0,0 +1,93 @@
+"""Page-load benchmark: five per-collection requests vs one /api/dashboard request.
+
+Replays the frontend's post-login data load against a running server. It reports
+time-to-all-data (what gates the first full render) and, when --server-pid is
+given, the server's CPU time per page load read from /proc:
+
+    RESPONSE_CACHE_ENABLED=false uvicorn server:app --port 8001   # measure uncached work
+    python benchmarks/dashboard_bench.py --server-pid $(pgrep -f "uvicorn server:app")
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import httpx
+
+SEPARATE_ROUTES = ["api/notices", "api/events", "api/timetable", "api/faculty", "api/resources"]
+
+
+def server_cpu_seconds(pid):
+    if not pid:
+        return 0.0
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    # utime and stime are fields 14 and 15 of /proc/<pid>/stat
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+async def load_separately(client, base_url, headers):
+    responses = await asyncio.gather(*(client.get(f"{base_url}/{route}", headers=headers) for route in SEPARATE_ROUTES))
+    for response in responses:
+        response.raise_for_status()
+
+
+async def load_dashboard(client, base_url, headers):
+    response = await client.get(f"{base_url}/api/dashboard", headers=headers)
+    response.raise_for_status()
+
+
+async def measure(label, loader, client, base_url, headers, page_loads, pid):
+    timings = []
+    cpu_before = server_cpu_seconds(pid)
+    for _ in range(page_loads):
+        start = time.perf_counter()
+        await loader(client, base_url, headers)
+        timings.append(time.perf_counter() - start)
+    cpu = server_cpu_seconds(pid) - cpu_before
+
+    result = {
+        "time_to_data_ms_p50": round(statistics.median(timings) * 1000, 2),
+        "time_to_data_ms_mean": round(statistics.mean(timings) * 1000, 2),
+    }
+    if pid:
+        result["server_cpu_ms_per_load"] = round(cpu / page_loads * 1000, 3)
+    print(f"\n🔍 {label}")
+    for key, value in result.items():
+        print(f"   {key}: {value}")
+    return result
+
+
+async def run(base_url, roll_no, page_loads, pid):
+    async with httpx.AsyncClient(timeout=30) as client:
+        login = await client.post(f"{base_url}/api/auth/login", json={"roll_no": roll_no, "password": roll_no})
+        login.raise_for_status()
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        # Warm up connections and caches equally for both styles
+        await load_separately(client, base_url, headers)
+        await load_dashboard(client, base_url, headers)
+        before = await measure("5 separate requests", load_separately, client, base_url, headers, page_loads, pid)
+        after = await measure("1 dashboard request", load_dashboard, client, base_url, headers, page_loads, pid)
+    return before, after
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--roll-no", default="2473A31139")
+    parser.add_argument("--page-loads", type=int, default=200)
+    parser.add_argument("--server-pid", type=int, help="uvicorn worker pid to sample CPU time from")
+    args = parser.parse_args()
+
+    before, after = asyncio.run(run(args.base_url.rstrip("/"), args.roll_no, args.page_loads, args.server_pid))
+    print("\n📊 Reduction")
+    for key in before:
+        if before[key]:
+            print(f"   {key}: {before[key]} → {after[key]} ({(1 - after[key] / before[key]) * 100:.0f}% less)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
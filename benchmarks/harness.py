@@ -0,0 +1,137 @@
+"""Shared helpers for the in-process benchmarks.
+
+load_app() imports backend/server.py against either mongomock (no server needed)
+or a throwaway database on a real mongod, seed() fills it with a dataset of a
+given size, and run_route() drives one route through an ASGI transport.
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+sys.path.append(BACKEND_DIR)
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def summarize(latencies, elapsed, errors=0):
+    total = len(latencies)
+    return {
+        "requests": total,
+        "errors": errors,
+        "requests_per_s": round(total / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_app(store="mongomock", mongo_url=None, env=None):
+    """Import the server module against the chosen Mongo store and return it.
+
+    Environment overrides (e.g. RESPONSE_CACHE_ENABLED) must be applied before the
+    import because the backend reads its settings at import time.
+    """
+    for key, value in (env or {}).items():
+        os.environ[key] = value
+    # Every benchmark request comes from one client and usually one user, so rate limits would skew the numbers
+    os.environ.setdefault("ADMISSION_ENABLED", "false")
+    if store == "mongomock":
+        import motor.motor_asyncio
+        from mongomock_motor import AsyncMongoMockClient
+        motor.motor_asyncio.AsyncIOMotorClient = AsyncMongoMockClient
+    else:
+        os.environ["MONGO_URL"] = mongo_url or os.environ.get("MONGO_URL", "mongodb://localhost:27017")
+        os.environ["DB_NAME"] = f"bench_{uuid.uuid4().hex[:8]}"
+    import server
+    return server
+
+
+def login_roll_no(i):
+    # Only 2473A31XXX roll numbers may log in
+    return f"2473A31{i:03d}" if i < 1000 else f"2473A32{i:06d}"
+
+
+async def seed(server, size):
+    """Start the app and add `size` users plus proportional content to every collection."""
+    from seeding import seed_database
+
+    await server.startup_event()
+    await server.boot_task
+    students = {
+        login_roll_no(i): {"name": f"Student {i}", "semester": f"SEM-{i % 8 + 1}", "section": f"S{i % 6}"}
+        for i in range(size)
+    }
+    await seed_database(students, {})
+
+    content = max(size // 10, 1)
+    await server.notices_collection.insert_many([
+        {"id": str(uuid.uuid4()), "title": f"Notice {i}", "description": "Benchmark notice " * 8,
+         "category": "General", "date": datetime(2024, i % 12 + 1, i % 28 + 1)}
+        for i in range(content)
+    ])
+    await server.events_collection.insert_many([
+        {"id": str(uuid.uuid4()), "title": f"Event {i}", "description": "Benchmark event " * 8,
+         "location": "Auditorium", "date": datetime(2024, i % 12 + 1, i % 28 + 1)}
+        for i in range(content)
+    ])
+    await server.timetables_collection.insert_many([
+        {"id": str(uuid.uuid4()), "day": ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"][i % 6],
+         "time": f"{9 + i % 7:02d}:00-{10 + i % 7:02d}:00", "subject": f"Subject {i % 40}", "faculty": f"Prof. {i % 30}",
+         "semester": f"SEM-{i % 8 + 1}", "section": f"S{i % 6}"}
+        for i in range(content)
+    ])
+    await server.resources_collection.insert_many([
+        {"id": str(uuid.uuid4()), "title": f"Resource {i}", "subject": f"Subject {i % 40}",
+         "semester": f"SEM-{i % 8 + 1}", "file_url": f"https://example.com/{i}.pdf",
+         "uploaded_by": "admin", "upload_date": "2024-03-01"}
+        for i in range(content)
+    ])
+    await server.faculty_collection.insert_many([
+        {"id": str(uuid.uuid4()), "name": f"Prof. {i}", "designation": "Professor", "email": f"prof{i}@pbrvits.edu.in"}
+        for i in range(max(content // 10, 1))
+    ])
+    await server.response_cache.mark_changed("notices", "events", "timetables", "resources", "faculty")
+
+
+async def teardown(server, store):
+    if store != "mongomock":
+        from database import DB_NAME, get_client
+        await get_client().drop_database(DB_NAME)
+    await server.shutdown_event()
+
+
+async def run_route(client, method, path, requests, concurrency, headers=None, json=None):
+    """Issue `requests` calls to one route from `concurrency` concurrent workers."""
+    latencies = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await client.request(method, path, headers=headers, json=json)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - start, errors)
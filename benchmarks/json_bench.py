@@ -0,0 +1,74 @@
+"""JSON encoding micro-benchmark for large list responses.
+
+Compares FastAPI's default path for a returned list (jsonable_encoder + stdlib
+JSONResponse) with the serialization.dumps fast path (orjson and stdlib fallback)
+on a payload of projected timetable documents:
+
+    python benchmarks/json_bench.py --documents 10000
+"""
+import argparse
+import json
+import sys
+import time
+
+import harness  # noqa: F401  (puts backend/ on sys.path)
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+import serialization
+
+
+def make_documents(count):
+    days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+    return [
+        {"id": f"{i:08d}-5c1e-4d0b-9a52-3f6f1c2e8a90", "day": days[i % 6],
+         "time": f"{9 + i % 7:02d}:00-{10 + i % 7:02d}:00", "subject": f"Subject {i % 40} — Machine Learning",
+         "faculty": f"Prof. {i % 30}", "semester": f"SEM-{i % 8 + 1}", "section": f"S{i % 6}"}
+        for i in range(count)
+    ]
+
+
+def fastapi_default(documents):
+    return JSONResponse(content=jsonable_encoder(documents)).body
+
+
+def stdlib_dumps(documents):
+    return json.dumps(documents, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def orjson_dumps(documents):
+    return serialization.orjson.dumps(documents, default=serialization._default)
+
+
+def measure(encode, documents, rounds):
+    encode(documents)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        body = encode(documents)
+    elapsed = (time.perf_counter() - start) / rounds
+    return elapsed, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    documents = make_documents(args.documents)
+    encoders = {"fastapi jsonable_encoder + json": fastapi_default, "stdlib json.dumps": stdlib_dumps}
+    if serialization.orjson is not None:
+        encoders["orjson"] = orjson_dumps
+
+    print(f"🚀 Encoding {args.documents} documents, {args.rounds} rounds")
+    baseline = None
+    for name, encode in encoders.items():
+        elapsed, size = measure(encode, documents, args.rounds)
+        baseline = baseline or elapsed
+        print(f"   {name:<32} {elapsed * 1000:8.2f} ms/response   {size / elapsed / 1e6:8.1f} MB/s   "
+              f"{baseline / elapsed:5.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""Login throughput against the password KDF cost factor.
+
+Simulates the morning login surge: every seeded student logs in with a hashed
+password at the given concurrency. Each run reports logins/s, latency, 503s
+from the verification queue timeout, and the latency of /api/health probed
+during the surge, which shows whether hashing is stalling the event loop:
+
+    python benchmarks/login_bench.py --users 300 --concurrency 50 --rounds 10000 29000 100000
+    python benchmarks/login_bench.py --workers 8 --queue-timeout 0.5
+
+--rounds is the cost factor for the first scheme in PASSWORD_SCHEMES
+(pbkdf2_sha256 iterations by default).
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+import httpx
+
+from harness import load_app, login_roll_no, percentile, seed, summarize, teardown
+
+
+async def hash_all(server, passwords, roll_numbers):
+    for roll_no in roll_numbers:
+        await server.users_collection.update_one(
+            {"roll_no": roll_no}, {"$set": {"password_hash": passwords.hash_password(roll_no)}}
+        )
+
+
+async def surge(client, roll_numbers, concurrency):
+    latencies = []
+    statuses = {}
+    remaining = iter(roll_numbers)
+
+    async def worker():
+        for roll_no in remaining:
+            start = time.perf_counter()
+            response = await client.post("/api/auth/login", json={"roll_no": roll_no, "password": roll_no})
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - start, sum(n for code, n in statuses.items() if code != 200)), statuses
+
+
+async def probe(client, stop):
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/api/health")
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.01)
+    return latencies
+
+
+async def run(args):
+    env = {}
+    if args.workers:
+        env["PASSWORD_WORKERS"] = str(args.workers)
+    if args.queue_timeout is not None:
+        env["PASSWORD_QUEUE_TIMEOUT_SECONDS"] = str(args.queue_timeout)
+    server = load_app(args.store, args.mongo_url, env)
+    import passwords
+
+    await seed(server, args.users)
+    roll_numbers = [login_roll_no(i) for i in range(min(args.users, 1000))]
+    print(f"   {passwords.password_verifier.workers} verification workers, "
+          f"queue timeout {passwords.password_verifier.queue_timeout}s")
+
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for rounds in args.rounds:
+            passwords.password_context = passwords.build_context(rounds=rounds)
+            await hash_all(server, passwords, roll_numbers)
+            server.user_cache.clear()
+
+            stop = asyncio.Event()
+            probe_task = asyncio.create_task(probe(client, stop))
+            stats, statuses = await surge(client, roll_numbers, args.concurrency)
+            stop.set()
+            health = await probe_task
+
+            print(f"   rounds {rounds:>7}   {stats['requests_per_s']:>8} logins/s   p50 {stats['p50_ms']:>9} ms   "
+                  f"p99 {stats['p99_ms']:>9} ms   503s {statuses.get(503, 0):>4}   "
+                  f"health p99 {percentile(health, 99) * 1000:7.2f} ms")
+
+    await teardown(server, args.store)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--store", choices=("mongomock", "mongod"), default="mongomock")
+    parser.add_argument("--mongo-url", help="mongod to use with --store mongod")
+    parser.add_argument("--users", type=int, default=200, help="students logging in (at most 1000 can log in)")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rounds", type=int, nargs="+", default=[10000, 29000, 100000])
+    parser.add_argument("--workers", type=int, help="override PASSWORD_WORKERS")
+    parser.add_argument("--queue-timeout", type=float, help="override PASSWORD_QUEUE_TIMEOUT_SECONDS")
+    args = parser.parse_args()
+
+    print(f"🚀 {args.store}, {args.users} students logging in at concurrency {args.concurrency}")
+    asyncio.run(run(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""Per-request overhead of MetricsMiddleware.
+
+Calls a trivial ASGI app directly, with and without the middleware in front of
+it, so the difference is the instrumentation cost alone:
+
+    python benchmarks/metrics_overhead_bench.py --iterations 200000
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+import harness  # noqa: F401  (puts backend/ on sys.path)
+from metrics import MetricsMiddleware, MetricsRegistry
+
+
+class Route:
+    path = "/api/notices"
+
+
+async def trivial_app(scope, receive, send):
+    scope["route"] = Route
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"[]"})
+
+
+async def receive():
+    return {"type": "http.request", "body": b""}
+
+
+async def send(message):
+    pass
+
+
+async def time_app(app, iterations):
+    scope = {"type": "http", "method": "GET", "path": "/api/notices"}
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200000)
+    args = parser.parse_args()
+
+    instrumented = MetricsMiddleware(trivial_app, MetricsRegistry(enabled=True))
+    bare = asyncio.run(time_app(trivial_app, args.iterations))
+    wrapped = asyncio.run(time_app(instrumented, args.iterations))
+    print(f"   bare app:        {bare * 1e6:.2f} µs/request")
+    print(f"   with metrics:    {wrapped * 1e6:.2f} µs/request")
+    print(f"   overhead:        {(wrapped - bare) * 1e6:.2f} µs/request")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+"""Load test for the /api/stream push channel.
+
+In-process mode (default) attaches N subscribers to the PushHub through the same
+stream generator the endpoint serves, publishes events, and reports fan-out
+latency, memory per idle subscriber and how many deliberately slow consumers got dropped:
+
+    python benchmarks/push_load_test.py --subscribers 5000
+
+HTTP mode opens real SSE connections to a running server and publishes through
+POST /api/notices with an admin token (raise `ulimit -n` first):
+
+    python benchmarks/push_load_test.py --subscribers 5000 --base-url http://localhost:8001 --token <admin JWT>
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+
+import httpx
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from push_hub import PushHub  # noqa: E402
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))] if ordered else 0.0
+
+
+class Deliveries:
+    def __init__(self):
+        self.count = 0
+        self.target = 0
+        self.reached = asyncio.Event()
+
+    def record(self):
+        self.count += 1
+        if self.count == self.target:
+            self.reached.set()
+
+
+async def consume(hub, subscriber, deliveries, slow):
+    async for frame in hub.stream(subscriber):
+        if slow:
+            # Never finishes reading: its queue fills up and the hub drops it
+            await asyncio.sleep(3600)
+        if frame.startswith(b"id:"):
+            deliveries.record()
+
+
+async def run_in_process(subscribers, events, slow_fraction, queue_size):
+    hub = PushHub(queue_size=queue_size)
+    slow_count = int(subscribers * slow_fraction)
+    fast_count = subscribers - slow_count
+    deliveries = Deliveries()
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    tasks = [
+        asyncio.create_task(consume(hub, hub.subscribe(), deliveries, slow=n < slow_count))
+        for n in range(subscribers)
+    ]
+    await asyncio.sleep(0.1)
+    per_subscriber = (tracemalloc.get_traced_memory()[0] - baseline) / subscribers
+    tracemalloc.stop()
+
+    latencies = []
+    start = time.perf_counter()
+    for i in range(events):
+        deliveries.target = fast_count * (i + 1)
+        deliveries.reached.clear()
+        published_at = time.perf_counter()
+        hub.publish("notice.created", {"id": str(i), "title": f"Notice {i}"})
+        await deliveries.reached.wait()
+        latencies.append(time.perf_counter() - published_at)
+    elapsed = time.perf_counter() - start
+
+    await hub.stop()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    return {
+        "subscribers": subscribers,
+        "events": events,
+        "deliveries": deliveries.count,
+        "deliveries_per_s": round(deliveries.count / elapsed, 1),
+        "fan_out_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 2),
+            "p99": round(percentile(latencies, 99) * 1000, 2),
+            "max": round(max(latencies) * 1000, 2),
+        },
+        "bytes_per_idle_subscriber": round(per_subscriber),
+        "slow_consumers": slow_count,
+        "dropped": hub.dropped,
+    }
+
+
+async def run_http(base_url, subscribers, events, token):
+    async with httpx.AsyncClient(base_url=base_url, timeout=None,
+                                 limits=httpx.Limits(max_connections=subscribers + 10)) as client:
+        counts = [0] * subscribers
+        connected = asyncio.Semaphore(0)
+
+        async def subscribe(n):
+            async with client.stream("GET", f"/api/stream?token={token}") as response:
+                connected.release()
+                async for line in response.aiter_lines():
+                    if line.startswith("event:"):
+                        counts[n] += 1
+                        if counts[n] == events:
+                            return
+
+        tasks = [asyncio.create_task(subscribe(n)) for n in range(subscribers)]
+        for _ in range(subscribers):
+            await connected.acquire()
+        print(f"   {subscribers} subscribers connected")
+
+        headers = {"Authorization": f"Bearer {token}"}
+        start = time.perf_counter()
+        for i in range(events):
+            await client.post("/api/notices", headers=headers, json={
+                "title": f"Load test notice {i}", "description": "push load test",
+                "category": "General", "date": "2024-03-01",
+            })
+        await asyncio.wait(tasks, timeout=60)
+        elapsed = time.perf_counter() - start
+        for task in tasks:
+            task.cancel()
+        return {
+            "subscribers": subscribers,
+            "events": events,
+            "deliveries": sum(counts),
+            "complete_subscribers": sum(1 for c in counts if c == events),
+            "elapsed_s": round(elapsed, 3),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subscribers", type=int, default=5000)
+    parser.add_argument("--events", type=int, default=20)
+    parser.add_argument("--slow-fraction", type=float, default=0.01)
+    parser.add_argument("--queue-size", type=int, default=8)
+    parser.add_argument("--base-url", help="test a running server over HTTP instead of in-process")
+    parser.add_argument("--token", help="admin JWT used to publish in HTTP mode")
+    args = parser.parse_args()
+
+    print(f"🚀 Push load test: {args.subscribers} subscribers, {args.events} events")
+    if args.base_url:
+        if not args.token:
+            parser.error("--token is required with --base-url")
+        result = asyncio.run(run_http(args.base_url, args.subscribers, args.events, args.token))
+    else:
+        result = asyncio.run(run_in_process(args.subscribers, args.events, args.slow_fraction, args.queue_size))
+    for key, value in result.items():
+        print(f"   {key}: {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""Query latency of the in-memory search index.
+
+Indexes a synthetic mix of notices, events and resources (no Mongo needed) and
+times single- and multi-term queries, with and without the student semester filter,
+after an untimed warm-up. A third run writes a document before every query, like a
+notice posted between two searches, and times the write and the query together.
+Descriptions draw from a Zipf-distributed vocabulary, like real text; the
+department words sit among the most frequent ranks, so the queried terms match
+thousands of documents each:
+
+    python benchmarks/search_bench.py --documents 100000 --queries 2000
+
+The target is a p99 under 5 ms at 100k documents.
+"""
+import argparse
+import random
+import sys
+import time
+
+import harness
+from search_index import SearchIndex
+
+SUBJECTS = [
+    "Machine Learning", "Deep Learning", "Data Structures", "Operating Systems", "Computer Networks",
+    "Database Management", "Natural Language Processing", "Computer Vision", "Probability and Statistics",
+    "Reinforcement Learning", "Compiler Design", "Cloud Computing",
+]
+WORDS = (
+    "exam schedule syllabus lab internal assessment workshop seminar hackathon project review "
+    "assignment submission deadline results placement drive guest lecture holiday circular fee "
+    "registration timetable revised unit notes question bank model paper practical viva orientation "
+    "club meeting sports fest cultural library hours scholarship notice department students faculty"
+).split()
+QUERIES = [
+    "exam schedule", "syllabus", "machine learning notes", "hackathon", "internal assessment results",
+    "deep learning lab", "placement drive", "question bank operating systems", "holiday circular",
+    "project review deadline", "guest lecture computer vision", "fee registration",
+]
+
+
+def zipf_vocabulary(size):
+    # Department words take ranks 10.., the rest is filler ("w123")
+    vocabulary = [f"w{rank}" for rank in range(size)]
+    vocabulary[10:10 + len(WORDS)] = WORDS
+    cumulative, total = [], 0.0
+    for rank in range(size):
+        total += 1 / (rank + 1)
+        cumulative.append(total)
+    return vocabulary, cumulative
+
+
+def make_documents(count, rng, vocabulary_size):
+    vocabulary, cumulative = zipf_vocabulary(vocabulary_size)
+    for i in range(count):
+        kind = ("notices", "events", "resources")[i % 3]
+        subject = rng.choice(SUBJECTS)
+        title = " ".join(rng.choices(WORDS, k=3)) + " " + subject
+        document = {"id": f"{kind}-{i}", "title": title}
+        if kind == "resources":
+            document.update(subject=subject, semester=f"SEM-{i % 8 + 1}", file_url=f"/files/{i}.pdf")
+        else:
+            description = " ".join(rng.choices(vocabulary, cum_weights=cumulative, k=30))
+            document.update(description=description, date=f"2024-{i % 12 + 1:02d}-01",
+                            category="Academic", location="Auditorium")
+        yield kind, document
+
+
+def run_queries(index, queries, semester, writes=None):
+    latencies = []
+    start = time.perf_counter()
+    for query in queries:
+        began = time.perf_counter()
+        if writes is not None:
+            kind, document = next(writes)
+            index.add(kind, [document])
+        index.search(query, limit=20, semester=semester)
+        latencies.append(time.perf_counter() - began)
+    return harness.summarize(latencies, time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--vocabulary", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    index = SearchIndex()
+    start = time.perf_counter()
+    for kind, document in make_documents(args.documents, rng, args.vocabulary):
+        index.add(kind, [document])
+    print(f"🚀 Indexed {len(index)} documents ({len(index.postings)} terms) in {time.perf_counter() - start:.2f}s")
+
+    queries = [rng.choice(QUERIES) for _ in range(args.queries)]
+    run_queries(index, queries[:100], None)
+    # Rewrites of existing documents, which touch the same common terms the queries use
+    writes = make_documents(args.documents, random.Random(args.seed + 1), args.vocabulary)
+    runs = (("admin (no filter)", None, None), ("student (SEM-3)", "SEM-3", None), ("write + admin", None, writes))
+    for label, semester, run_writes in runs:
+        result = run_queries(index, queries, semester, run_writes)
+        verdict = "✅" if result["p99_ms"] < 5 else "❌"
+        print(f"{verdict} {label:<18} p50 {result['p50_ms']:.3f} ms   p95 {result['p95_ms']:.3f} ms   "
+              f"p99 {result['p99_ms']:.3f} ms   {result['requests_per_s']:.0f} queries/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
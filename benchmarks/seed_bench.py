@@ -0,0 +1,81 @@
+"""Startup seeding benchmark: per-document find_one/insert_one vs batched bulk_write upserts.
+
+Seeds a generated roster into throwaway databases on a running mongod and
+reports the wall time of each strategy, cold (empty database) and warm (reboot):
+
+    python benchmarks/seed_bench.py --students 10000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from motor.motor_asyncio import AsyncIOMotorClient  # noqa: E402
+
+from seeding import seed_database, student_document  # noqa: E402
+
+
+def generate_roster(count):
+    return {
+        f"2473A31{i:06d}": {"name": f"Student {i}", "semester": f"SEM-{i % 8 + 1}", "section": f"S{i % 6}"}
+        for i in range(count)
+    }
+
+
+async def seed_per_document(database, students):
+    # The pre-bulk startup_event: two serial round-trips per student
+    for roll_no, info in students.items():
+        if not await database.users.find_one({"roll_no": roll_no}):
+            await database.users.insert_one(student_document(roll_no, info))
+
+
+async def seed_bulk(database, students):
+    await seed_database(students, {}, database=database)
+
+
+async def timed(label, strategy, database, students):
+    start = time.perf_counter()
+    await strategy(database, students)
+    elapsed = time.perf_counter() - start
+    print(f"   {label}: {elapsed:.2f}s")
+    return elapsed
+
+
+async def run(mongo_url, count):
+    client = AsyncIOMotorClient(mongo_url)
+    students = generate_roster(count)
+    results = {}
+    for label, strategy in (("per-document", seed_per_document), ("bulk upsert", seed_bulk)):
+        db_name = f"seed_bench_{uuid.uuid4().hex[:8]}"
+        database = client[db_name]
+        await database.users.create_index("roll_no", unique=True)
+        print(f"\n🔍 {label} ({count} students)")
+        results[label] = {
+            "cold": await timed("cold boot", strategy, database, students),
+            "warm": await timed("warm reboot", strategy, database, students),
+        }
+        await client.drop_database(db_name)
+    client.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--students", type=int, default=10000)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.mongo_url, args.students))
+    before, after = results["per-document"], results["bulk upsert"]
+    print("\n📊 Summary")
+    for phase in ("cold", "warm"):
+        print(f"   {phase}: {before[phase]:.2f}s → {after[phase]:.2f}s ({before[phase] / after[phase]:.1f}x faster)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
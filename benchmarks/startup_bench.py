@@ -0,0 +1,76 @@
+"""Time from process start to first request, and to readiness, for a fresh worker.
+
+Each run starts a new interpreter that imports server.py, runs the startup
+hook and serves /api/health/live, then polls /api/health/ready until the
+background database preparation has finished. All times are measured from the
+moment the parent spawned the process, so interpreter start is included:
+
+    python benchmarks/startup_bench.py --runs 10
+    python benchmarks/startup_bench.py --store mongod --mongo-url mongodb://localhost:27017
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+STAGES = ("imported", "started", "first_request", "ready")
+
+
+async def child(args):
+    marks = {}
+    from harness import load_app, teardown
+
+    server = load_app(args.store, args.mongo_url)
+    marks["imported"] = time.time()
+
+    import httpx
+
+    await server.startup_event()
+    marks["started"] = time.time()
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        (await client.get("/api/health/live")).raise_for_status()
+        marks["first_request"] = time.time()
+        while (await client.get("/api/health/ready")).status_code != 200:
+            await asyncio.sleep(0.005)
+        marks["ready"] = time.time()
+    await teardown(server, args.store)
+    print(json.dumps(marks))
+
+
+def run_once(args):
+    command = [sys.executable, os.path.abspath(__file__), "--child", "--store", args.store]
+    if args.mongo_url:
+        command += ["--mongo-url", args.mongo_url]
+    spawned_at = time.time()
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    marks = json.loads(output.strip().splitlines()[-1])
+    return {stage: (marks[stage] - spawned_at) * 1000 for stage in STAGES}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--store", choices=("mongomock", "mongod"), default="mongomock")
+    parser.add_argument("--mongo-url", help="mongod to use with --store mongod")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        asyncio.run(child(args))
+        return 0
+
+    print(f"🚀 {args.store}, {args.runs} fresh processes")
+    runs = [run_once(args) for _ in range(args.runs)]
+    for stage in STAGES:
+        values = [run[stage] for run in runs]
+        print(f"   {stage:<14} median {statistics.median(values):8.1f} ms   max {max(values):8.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -25,6 +25,15 @@ import {
 } from 'lucide-react';
 import './App.css';
 
+// Notice and event dates arrive as ISO datetimes
+const formatDate = (value) => new Date(value).toLocaleDateString();
+
+// The refresh currently in progress, if any
+let refreshInFlight = null;
+
+// Read the token per request: a refresh may have replaced it since the caller started
+const authHeaders = () => ({ Authorization: `Bearer ${localStorage.getItem('token')}` });
+
 function App() {
   const [user, setUser] = useState(null);
   const [loading, setLoading] = useState(false);
@@ -33,64 +42,121 @@ function App() {
   const [notices, setNotices] = useState([]);
   const [events, setEvents] = useState([]);
   const [timetable, setTimetable] = useState([]);
+  const [timetableGrid, setTimetableGrid] = useState(null);
   const [faculty, setFaculty] = useState([]);
   const [resources, setResources] = useState([]);
+  // Where the next page of notices and events starts; null once everything is loaded
+  const [noticesCursor, setNoticesCursor] = useState(null);
+  const [eventsCursor, setEventsCursor] = useState(null);
 
   const API_BASE = process.env.REACT_APP_BACKEND_URL;
 
+  // Access tokens are short-lived: on a 401, trade the refresh token for a new pair and retry once.
+  // Refresh tokens are single-use, so requests that fail together share one refresh.
+  useEffect(() => {
+    const refreshTokens = () => {
+      if (!refreshInFlight) {
+        refreshInFlight = axios.post(`${API_BASE}/api/auth/refresh`, { refresh_token: localStorage.getItem('refresh_token') })
+          .then(({ data }) => {
+            localStorage.setItem('token', data.access_token);
+            localStorage.setItem('refresh_token', data.refresh_token);
+            return data.access_token;
+          })
+          .finally(() => { refreshInFlight = null; });
+      }
+      return refreshInFlight;
+    };
+    const interceptor = axios.interceptors.response.use(null, async (error) => {
+      const original = error.config;
+      const refreshToken = localStorage.getItem('refresh_token');
+      if (error.response?.status !== 401 || !refreshToken || original._retried || original.url.match(/\/api\/auth\/(refresh|logout)$/)) {
+        return Promise.reject(error);
+      }
+      original._retried = true;
+      // If another request refreshed while this one was in flight, the stored token is already new
+      const current = localStorage.getItem('token');
+      const accessToken = current && original.headers.Authorization !== `Bearer ${current}` ? current : await refreshTokens();
+      original.headers.Authorization = `Bearer ${accessToken}`;
+      return axios(original);
+    });
+    return () => axios.interceptors.response.eject(interceptor);
+  }, []);
+
   // Check for existing token on app load
   useEffect(() => {
-    const token = localStorage.getItem('token');
-    if (token) {
-      fetchUserData(token);
+    if (localStorage.getItem('token')) {
+      fetchUserData();
     }
   }, []);
 
-  const fetchUserData = async (token) => {
+  const fetchUserData = async () => {
     try {
-      const response = await axios.get(`${API_BASE}/api/auth/me`, {
-        headers: { Authorization: `Bearer ${token}` }
-      });
+      const response = await axios.get(`${API_BASE}/api/auth/me`, { headers: authHeaders() });
       setUser(response.data);
-      fetchAllData(token);
+      fetchAllData();
     } catch (error) {
       localStorage.removeItem('token');
+      localStorage.removeItem('refresh_token');
       setUser(null);
     }
   };
 
-  const fetchAllData = async (token) => {
+  const fetchAllData = async () => {
     try {
-      const headers = { Authorization: `Bearer ${token}` };
-      const [noticesRes, eventsRes, timetableRes, facultyRes, resourcesRes] = await Promise.all([
-        axios.get(`${API_BASE}/api/notices`, { headers }),
-        axios.get(`${API_BASE}/api/events`, { headers }),
-        axios.get(`${API_BASE}/api/timetable`, { headers }),
-        axios.get(`${API_BASE}/api/faculty`, { headers }),
-        axios.get(`${API_BASE}/api/resources`, { headers })
-      ]);
+      const headers = authHeaders();
+      // The server builds each section's weekly grid; admins have no section and use the raw rows
+      axios.get(`${API_BASE}/api/timetable/grid`, { headers })
+        .then(({ data }) => setTimetableGrid(data))
+        .catch(() => setTimetableGrid(null));
+      const { data } = await axios.get(`${API_BASE}/api/dashboard`, { headers });
       
-      setNotices(noticesRes.data);
-      setEvents(eventsRes.data);
-      setTimetable(timetableRes.data);
-      setFaculty(facultyRes.data);
-      setResources(resourcesRes.data);
+      setNotices(data.notices.items);
+      setNoticesCursor(data.notices.next_cursor);
+      setEvents(data.events.items);
+      setEventsCursor(data.events.next_cursor);
+      setTimetable(data.timetable);
+      setFaculty(data.faculty);
+      setResources(data.resources);
+
+      // The dashboard caps each list; load the ones it cut short in full from their own routes
+      const fullLists = {
+        timetable: ['/api/timetable', setTimetable],
+        resources: ['/api/resources', setResources],
+        faculty: ['/api/faculty', setFaculty],
+      };
+      (data.truncated || []).forEach((name) => {
+        const [path, setList] = fullLists[name];
+        axios.get(`${API_BASE}${path}`, { headers: authHeaders() })
+          .then(({ data: items }) => setList(items))
+          .catch((error) => console.error(`Failed to fetch ${name}:`, error));
+      });
     } catch (error) {
       console.error('Failed to fetch data:', error);
     }
   };
 
+  const loadMore = async (path, cursor, setItems, setCursor) => {
+    try {
+      const { data } = await axios.get(`${API_BASE}${path}`, { params: { cursor }, headers: authHeaders() });
+      setItems((items) => [...items, ...data.items]);
+      setCursor(data.next_cursor);
+    } catch (error) {
+      console.error('Failed to load more:', error);
+    }
+  };
+
   const handleLogin = async (e) => {
     e.preventDefault();
     setLoading(true);
     
     try {
       const response = await axios.post(`${API_BASE}/api/auth/login`, loginData);
-      const { access_token, user: userData } = response.data;
+      const { access_token, refresh_token, user: userData } = response.data;
       
       localStorage.setItem('token', access_token);
+      localStorage.setItem('refresh_token', refresh_token);
       setUser(userData);
-      fetchAllData(access_token);
+      fetchAllData();
       setLoginData({ roll_no: '', password: '' });
     } catch (error) {
       alert('Login failed: ' + (error.response?.data?.detail || 'Please check your credentials'));
@@ -100,11 +166,21 @@ function App() {
   };
 
   const handleLogout = () => {
+    // The refresh token alone is enough to log out, even once the access token has expired
+    const refreshToken = localStorage.getItem('refresh_token');
+    if (refreshToken) {
+      axios.post(`${API_BASE}/api/auth/logout`, { refresh_token: refreshToken }, { headers: authHeaders() })
+        .catch(() => {});
+    }
     localStorage.removeItem('token');
+    localStorage.removeItem('refresh_token');
     setUser(null);
     setNotices([]);
+    setNoticesCursor(null);
     setEvents([]);
+    setEventsCursor(null);
     setTimetable([]);
+    setTimetableGrid(null);
     setFaculty([]);
     setResources([]);
     setActiveTab('home');
@@ -175,7 +251,9 @@ function App() {
     );
   }
 
-  const timetableByDay = groupTimetableByDay(timetable);
+  const timetableByDay = timetableGrid
+    ? Object.fromEntries(timetableGrid.days.map(({ day, classes }) => [day, classes]))
+    : groupTimetableByDay(timetable);
 
   return (
     <div className="min-h-screen bg-gradient-to-br from-blue-50 to-indigo-100">
@@ -318,7 +396,7 @@ function App() {
                       <div className="flex-1">
                         <h4 className="font-semibold text-gray-800">{notice.title}</h4>
                         <p className="text-sm text-gray-600 mt-1">{notice.description}</p>
-                        <p className="text-xs text-gray-500 mt-2">{notice.date}</p>
+                        <p className="text-xs text-gray-500 mt-2">{formatDate(notice.date)}</p>
                       </div>
                     </div>
                   ))}
@@ -335,6 +413,11 @@ function App() {
                   <Clock className="w-5 h-5" />
                   <span>Weekly Timetable - Semester {user.semester}, Section {user.section}</span>
                 </CardTitle>
+                {timetableGrid && (
+                  <a href={`${API_BASE}${timetableGrid.calendar_url}`} className="text-sm text-blue-600 hover:underline">
+                    Subscribe in your calendar app
+                  </a>
+                )}
               </CardHeader>
               <CardContent>
                 <div className="grid grid-cols-1 lg:grid-cols-2 gap-4">
@@ -380,7 +463,7 @@ function App() {
                     <div key={index} className="border rounded-lg p-4 bg-gray-50">
                       <div className="flex items-start justify-between mb-2">
                         <Badge variant="secondary">{notice.category}</Badge>
-                        <p className="text-sm text-gray-500">{notice.date}</p>
+                        <p className="text-sm text-gray-500">{formatDate(notice.date)}</p>
                       </div>
                       <h3 className="font-semibold text-lg text-gray-800 mb-2">{notice.title}</h3>
                       <p className="text-gray-600">{notice.description}</p>
@@ -393,6 +476,12 @@ function App() {
                     </div>
                   ))}
                 </div>
+                {noticesCursor && (
+                  <Button variant="outline" className="w-full mt-4"
+                    onClick={() => loadMore('/api/notices', noticesCursor, setNotices, setNoticesCursor)}>
+                    Load more notices
+                  </Button>
+                )}
               </CardContent>
             </Card>
           </TabsContent>
@@ -415,7 +504,7 @@ function App() {
                       <div className="space-y-2">
                         <div className="flex items-center text-sm text-gray-600">
                           <Calendar className="w-4 h-4 mr-2" />
-                          <span>{event.date}</span>
+                          <span>{formatDate(event.date)}</span>
                         </div>
                         <div className="flex items-center text-sm text-gray-600">
                           <MapPin className="w-4 h-4 mr-2" />
@@ -430,6 +519,12 @@ function App() {
                     </div>
                   ))}
                 </div>
+                {eventsCursor && (
+                  <Button variant="outline" className="w-full mt-4"
+                    onClick={() => loadMore('/api/events', eventsCursor, setEvents, setEventsCursor)}>
+                    Load more events
+                  </Button>
+                )}
               </CardContent>
             </Card>
           </TabsContent>
@@ -0,0 +1,93 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+import admission  # noqa: E402
+from admission import ConcurrencyGate, Overloaded, RateLimiter, gated, login_key, login_wait  # noqa: E402
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(admission.time, "monotonic", clock)
+    return clock
+
+
+def test_rate_limiter_allows_burst_then_refills(clock):
+    limiter = RateLimiter(rate=2, burst=3)
+    assert [limiter.acquire("a") for _ in range(3)] == [0, 0, 0]
+    assert limiter.acquire("a") == pytest.approx(0.5)
+    # Other keys have their own bucket
+    assert limiter.acquire("b") == 0
+    clock.now += 0.5
+    assert limiter.acquire("a") == 0
+    assert limiter.stats()["rejected"] == 1
+
+
+def test_rate_limiter_evicts_only_full_buckets(clock):
+    limiter = RateLimiter(rate=1, burst=5)
+    limiter.acquire("idle")
+    clock.now += 4
+    limiter.acquire("active")
+    assert limiter.stats()["buckets"] == 2
+    clock.now += 1
+    limiter.acquire("active")
+    # "idle" has been refilling for 5 seconds, so a fresh bucket is the same thing
+    assert limiter.stats() == {"buckets": 1, "allowed": 3, "rejected": 0, "evicted": 1}
+
+
+def test_login_key_separates_accounts_behind_one_address(monkeypatch):
+    headers = {"x-forwarded-for": "203.0.113.7, 10.0.0.1"}
+    assert login_key(headers, ("10.0.0.1", 5000), "2473A31001") == "10.0.0.1|2473A31001"
+    assert login_key(headers, ("10.0.0.1", 5000), "2473A31001") != login_key(headers, ("10.0.0.1", 5000), "2473A31002")
+    monkeypatch.setattr(admission, "TRUST_FORWARDED_FOR", True)
+    assert login_key(headers, ("10.0.0.1", 5000), "2473A31001") == "203.0.113.7|2473A31001"
+
+
+def test_login_wait_bounds_one_address_across_accounts(clock, monkeypatch):
+    monkeypatch.setattr(admission, "login_limiter", RateLimiter(rate=1, burst=2))
+    monkeypatch.setattr(admission, "login_ip_limiter", RateLimiter(rate=5, burst=5))
+    client = ("198.51.100.9", 5000)
+    # Each account has its own bucket...
+    assert [login_wait({}, client, "2473A31001") for _ in range(3)][-1] == pytest.approx(1)
+    # ...but cycling through accounts runs into the address's bucket
+    waits = [login_wait({}, client, f"2473A31{n:03d}") for n in range(2, 6)]
+    assert waits[:2] == [0, 0] and waits[-1] == pytest.approx(0.2)
+    assert login_wait({}, ("198.51.100.10", 5000), "2473A31009") == 0
+
+
+def test_gated_paths():
+    assert gated("/api/notices")
+    assert not gated("/api/health/ready")
+    assert not gated("/api/resources/abc/download")
+    assert not gated("/metrics")
+
+
+def test_concurrency_gate_sheds_when_queue_is_full():
+    async def run():
+        gate = ConcurrencyGate(limit=1, queue_limit=1, queue_timeout=0.05)
+        await gate.acquire()
+        waiter = asyncio.ensure_future(gate.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded):
+            await gate.acquire()
+        with pytest.raises(Overloaded):
+            await waiter
+        gate.release()
+        await gate.acquire()
+        return gate.stats()
+
+    stats = asyncio.run(run())
+    assert stats["shed"] == 1 and stats["timeouts"] == 1 and stats["admitted"] == 2
@@ -0,0 +1,35 @@
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from archival import naive_utc, parse_date  # noqa: E402
+from serialization import dumps  # noqa: E402
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2024-03-01", datetime(2024, 3, 1)),
+    ("2024-03-01T10:30:00+05:30", datetime(2024, 3, 1, 5, 0)),
+    ("01-03-2024", datetime(2024, 3, 1)),
+    ("01/03/2024", datetime(2024, 3, 1)),
+    ("March 1, 2024", datetime(2024, 3, 1)),
+    ("1 Mar 2024", datetime(2024, 3, 1)),
+    (" 2024-03-01 ", datetime(2024, 3, 1)),
+    ("next week", None),
+    ("", None),
+])
+def test_parse_date(value, expected):
+    assert parse_date(value) == expected
+
+
+def test_naive_utc():
+    ist = timezone(timedelta(hours=5, minutes=30))
+    assert naive_utc(datetime(2026, 10, 2, 2, 0, tzinfo=ist)) == datetime(2026, 10, 1, 20, 30)
+    assert naive_utc(datetime(2026, 10, 1, 20, 30)) == datetime(2026, 10, 1, 20, 30)
+
+
+def test_naive_dates_serialize_as_utc():
+    assert dumps({"date": datetime(2026, 10, 1, 20, 30)}) == b'{"date":"2026-10-01T20:30:00+00:00"}'
@@ -0,0 +1,42 @@
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from change_log import (  # noqa: E402
+    SYNC_SETTLE_SECONDS, InvalidSyncToken, decode_token, encode_token, settled_through, without_change_fields,
+)
+
+
+def entry(seq, age_seconds):
+    changed_at = datetime.utcnow() - timedelta(seconds=age_seconds)
+    return (seq, "notices", "upsert", {"id": str(seq), "seq": seq, "changed_at": changed_at})
+
+
+def test_token_round_trip():
+    now = time.time()
+    assert decode_token(encode_token(42, now)) == (42, int(now))
+
+
+# "WyJhIiwxXQ" is ["a",1]: valid base64 and JSON, but not a sequence number
+@pytest.mark.parametrize("token", ["", "garbage", "WyJhIiwxXQ"])
+def test_invalid_token(token):
+    with pytest.raises(InvalidSyncToken):
+        decode_token(token)
+
+
+def test_settled_through_stops_at_first_recent_change():
+    old = SYNC_SETTLE_SECONDS + 60
+    assert settled_through([], 7) == 7
+    assert settled_through([entry(8, old), entry(9, old)], 7) == 9
+    # 11 is settled, but 10 may still have slower writes in flight behind it
+    assert settled_through([entry(8, old), entry(10, 0), entry(11, old)], 7) == 8
+    assert settled_through([entry(8, 0)], 7) == 7
+
+
+def test_without_change_fields():
+    assert without_change_fields({"id": "a", "seq": 3, "changed_at": datetime(2024, 1, 1)}) == {"id": "a"}
@@ -0,0 +1,70 @@
+import asyncio
+import gzip
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from compression import CompressionMiddleware, negotiate  # noqa: E402
+
+BODY = b"x" * 5000
+
+
+def respond(status, headers, body=BODY):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": status,
+                    "headers": [(name.encode(), value.encode()) for name, value in headers.items()]})
+        await send({"type": "http.response.body", "body": body})
+    return app
+
+
+def call(app, accept_encoding="gzip"):
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": [(b"accept-encoding", accept_encoding.encode())]}
+    asyncio.run(CompressionMiddleware(app)(scope, None, send))
+    start, body = messages
+    return start["status"], dict(start["headers"]), body["body"]
+
+
+def test_negotiate():
+    assert negotiate(None) is None
+    assert negotiate("gzip") == "gzip"
+    assert negotiate("gzip;q=0, identity") is None
+    assert negotiate("*") in ("br", "gzip")
+    assert negotiate("deflate") is None
+
+
+def test_compresses_json_and_keeps_vary():
+    status, headers, body = call(respond(200, {"content-type": "application/json", "vary": "Origin"}))
+    assert headers[b"content-encoding"] == b"gzip"
+    assert headers[b"vary"] == b"Origin, Accept-Encoding"
+    assert int(headers[b"content-length"]) == len(body)
+    assert gzip.decompress(body) == BODY
+
+
+def test_skips_small_and_binary_bodies():
+    assert b"content-encoding" not in call(respond(200, {"content-type": "application/json"}, b"{}"))[1]
+    assert b"content-encoding" not in call(respond(200, {"content-type": "application/pdf"}))[1]
+
+
+def test_skips_partial_and_rangeable_responses():
+    partial = {"content-type": "text/plain", "content-range": "bytes 0-4999/9000", "accept-ranges": "bytes"}
+    status, headers, body = call(respond(206, partial))
+    assert status == 206 and body == BODY and b"content-encoding" not in headers
+
+    download = {"content-type": "text/plain", "accept-ranges": "bytes", "etag": '"abc"'}
+    status, headers, body = call(respond(200, download))
+    assert body == BODY and headers[b"etag"] == b'"abc"' and b"content-encoding" not in headers
+
+
+def test_compressed_variant_gets_its_own_etag():
+    status, headers, body = call(respond(200, {"content-type": "text/plain", "etag": '"abc"'}))
+    assert headers[b"content-encoding"] == b"gzip"
+    assert headers[b"etag"] == b'"abc-gzip"'
+
+    status, headers, body = call(respond(200, {"content-type": "text/plain", "etag": 'W/"abc"'}))
+    assert headers[b"etag"] == b'W/"abc-gzip"'
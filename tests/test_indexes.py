@@ -0,0 +1,281 @@
+"""Run the API against a seeded 50k-record dataset and explain every query it sent; none may be a COLLSCAN.
+
+The queries are not listed here. A pymongo command listener records what the boot
+work, the archiver, revocation polling and the routes actually send while they run
+for real, and each distinct query shape is replayed through explain. A query added
+to the code is therefore checked without touching this file.
+
+Needs a reachable mongod (TEST_MONGO_URL, default mongodb://localhost:27017);
+the tests are skipped otherwise. They work in a throwaway database that is dropped afterwards.
+"""
+import asyncio
+import os
+import sys
+import uuid
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+
+import httpx
+import pytest
+from pymongo import MongoClient, monitoring
+from pymongo.errors import PyMongoError
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "backend"))
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from motor.motor_asyncio import AsyncIOMotorClient  # noqa: E402
+
+import database  # noqa: E402
+from indexes import build_indexes  # noqa: E402
+from student_data import STUDENT_DATA  # noqa: E402
+
+TEST_MONGO_URL = os.environ.get("TEST_MONGO_URL", "mongodb://localhost:27017")
+RECORDS = int(os.environ.get("INDEX_TEST_RECORDS", "50000"))
+
+# Commands that select documents, and the field holding their statements (None: the command is the statement)
+QUERY_COMMANDS = {"find": None, "findAndModify": None, "aggregate": None, "count": None, "distinct": None,
+                  "update": "updates", "delete": "deletes"}
+# Session and transport fields that explain does not take inside the explained command
+GENERIC_FIELDS = {"lsid", "txnNumber", "writeConcern", "readConcern", "apiVersion", "apiStrict", "apiDeprecationErrors"}
+
+
+class CommandRecorder(monitoring.CommandListener):
+    """Keeps every query command sent to one database; called on the driver's threads."""
+
+    def __init__(self):
+        self.database_name = None
+        self.commands = []
+
+    def started(self, event):
+        if event.database_name == self.database_name and event.command_name in QUERY_COMMANDS:
+            self.commands.append(dict(event.command))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+recorder = CommandRecorder()
+monitoring.register(recorder)
+
+
+@pytest.fixture(scope="module")
+def seeded_db():
+    client = MongoClient(TEST_MONGO_URL, serverSelectionTimeoutMS=1000)
+    try:
+        client.admin.command("ping")
+    except PyMongoError:
+        pytest.skip(f"MongoDB not reachable at {TEST_MONGO_URL}")
+
+    db_name = f"index_test_{uuid.uuid4().hex[:8]}"
+    database = client[db_name]
+    per_collection = RECORDS // 5
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    database.users.insert_many(
+        {"roll_no": f"2473A31{i:06d}", "name": f"Student {i}", "semester": f"SEM-{i % 8}",
+         "section": f"S{i % 10}", "role": "student"}
+        for i in range(per_collection)
+    )
+    # Dates spread across the retention windows, so the archiver has old documents to move
+    database.notices.insert_many(
+        {"id": str(uuid.uuid4()), "title": f"Notice {i}", "description": "", "category": "General",
+         "date": today - timedelta(days=i % 200)}
+        for i in range(per_collection)
+    )
+    # Dates stored as strings before dates were typed, one of them unparseable, for migrate_dates
+    database.notices.insert_many(
+        {"id": str(uuid.uuid4()), "title": f"Legacy notice {i}", "description": "", "category": "General", "date": date}
+        for i, date in enumerate(("01-03-2026", "March 5, 2026", "next week"))
+    )
+    database.events.insert_many(
+        {"id": str(uuid.uuid4()), "title": f"Event {i}", "description": "", "location": "Hall",
+         "date": today - timedelta(days=i % 40)}
+        for i in range(per_collection)
+    )
+    database.timetables.insert_many(
+        {"id": str(uuid.uuid4()), "day": "Monday", "time": "09:00-10:00", "subject": f"Subject {i}",
+         "faculty": "Dr. Smith", "semester": f"SEM-{i % 8}", "section": f"S{i % 10}"}
+        for i in range(per_collection)
+    )
+    database.resources.insert_many(
+        {"id": str(uuid.uuid4()), "title": f"Resource {i}", "subject": "AI", "semester": f"SEM-{i % 8}",
+         "file_url": "", "uploaded_by": "admin", "upload_date": "2024-03-01"}
+        for i in range(per_collection)
+    )
+    database.faculty.insert_many(
+        {"id": str(uuid.uuid4()), "name": f"Faculty {i}", "designation": "Professor", "email": f"faculty{i}@example.com"}
+        for i in range(1000)
+    )
+
+    async def build():
+        motor_client = AsyncIOMotorClient(TEST_MONGO_URL)
+        drift = await build_indexes(motor_client[db_name])
+        motor_client.close()
+        return drift
+
+    assert asyncio.run(build()) == {}
+    yield database
+    client.drop_database(db_name)
+    client.close()
+
+
+def bind_backend(url: str, db_name: str) -> None:
+    """Point the backend's lazy client and collections at another server and database."""
+    database.close_client()
+    database.MONGO_URL, database.DB_NAME = url, db_name
+    for value in vars(database).values():
+        if isinstance(value, database.LazyCollection):
+            value._collection = None
+
+
+async def exercise_api(server) -> None:
+    """Boot a worker and call every route that queries Mongo, as a student and as an admin, plus the background jobs."""
+    server.archiver.enabled = False
+    await server.startup_event()
+    await server.boot_task
+    try:
+        await server.archiver.run_once()
+        student = next(iter(STUDENT_DATA))
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            async def call(method, url, expected=200, token=None, headers=None, **kwargs):
+                headers = {**(headers or {}), **({"Authorization": f"Bearer {token}"} if token else {})}
+                response = await client.request(method, url, headers=headers, **kwargs)
+                assert response.status_code == expected, f"{method} {url}: {response.status_code} {response.text}"
+                return response
+
+            login = (await call("POST", "/api/auth/login", json={"roll_no": student, "password": student})).json()
+            refreshed = (await call("POST", "/api/auth/refresh", json={"refresh_token": login["refresh_token"]})).json()
+            token = refreshed["access_token"]
+            admin = server.create_jwt_token("admin", "admin")
+
+            await call("GET", "/api/auth/me", token=token)
+            for url in ("/api/notices", "/api/events"):
+                page = (await call("GET", url, token=token)).json()
+                await call("GET", url, token=token, params={"cursor": page["next_cursor"]})
+                await call("GET", url, token=token, params={"from": "2026-01-01T00:00:00", "to": "2026-12-31T00:00:00"})
+                await call("GET", url, token=token, params={"legacy": "true"})
+            for user in (token, admin):
+                await call("GET", "/api/timetable", token=user)
+                await call("GET", "/api/timetable", token=user, params={"stream": "true"})
+                await call("GET", "/api/resources", token=user)
+                await call("GET", "/api/resources", token=user, params={"stream": "true"})
+                await call("GET", "/api/dashboard", token=user)
+                await call("GET", "/api/search", token=user, params={"q": "notice"})
+            grid = (await call("GET", "/api/timetable/grid", token=token)).json()
+            await call("GET", "/api/timetable/grid", token=admin, params={"semester": "SEM-3", "section": "S3"})
+            calendar = urlsplit(grid["calendar_url"])
+            await call("GET", calendar.path, params={"key": calendar.query.split("=", 1)[1]})
+            await call("GET", "/api/faculty", token=token)
+            resource = (await call("GET", "/api/resources", token=admin)).json()[0]
+            # No blob was ever stored for the seeded resources
+            await call("GET", f"/api/resources/{resource['id']}/download", expected=404, token=admin)
+
+            await call("POST", "/api/notices", token=admin, json={
+                "title": "Index test notice", "description": "", "category": "General", "date": "2026-10-01T00:00:00",
+            })
+            await call("POST", "/api/events/bulk", token=admin, json=[{
+                "title": "Index test event", "description": "", "location": "Hall", "date": "2026-10-02T00:00:00",
+            }])
+            snapshot = (await call("GET", "/api/sync", token=admin)).json()
+            await call("GET", "/api/sync", token=admin, params={"since": snapshot["token"]})
+            await call("POST", "/api/admin/students/import", token=admin,
+                       content="roll_no,name,semester,section\n2473A31998,Index Test,SEM-3,S3\n",
+                       headers={"Content-Type": "text/csv"})
+            await call("POST", "/api/auth/logout", json={"refresh_token": refreshed["refresh_token"]})
+            await call("POST", f"/api/admin/users/{student}/revoke-tokens", token=admin)
+            await server.revocations.sync()
+    finally:
+        await server.shutdown_event()
+
+
+@pytest.fixture(scope="module")
+def recorded_queries(seeded_db):
+    import server
+
+    bound_to = database.MONGO_URL, database.DB_NAME
+    recorder.database_name = seeded_db.name
+    bind_backend(TEST_MONGO_URL, seeded_db.name)
+    try:
+        asyncio.run(exercise_api(server))
+    finally:
+        recorder.database_name = None
+        bind_backend(*bound_to)
+    return distinct_queries(recorder.commands)
+
+
+def query_shape(value):
+    # Values do not change the plan's shape here; operators and field names do
+    if isinstance(value, dict):
+        return tuple((key, query_shape(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return tuple(sorted({query_shape(item) for item in value}, key=repr))
+    return type(value).__name__
+
+
+def distinct_queries(commands):
+    """One explainable single-statement command per collection and query shape."""
+    queries = {}
+    for command in commands:
+        name = next(iter(command))
+        body = {key: value for key, value in command.items() if key not in GENERIC_FIELDS and not key.startswith("$")}
+        statements_field = QUERY_COMMANDS[name]
+        statements = command[statements_field] if statements_field else [None]
+        for statement in statements:
+            single = {**body, statements_field: [statement]} if statements_field else body
+            selector = statement["q"] if statement is not None else command.get("filter", command.get("query"))
+            shape = (name, command[name], query_shape(selector), query_shape(command.get("sort")),
+                     query_shape(command.get("pipeline")))
+            queries.setdefault(shape, single)
+    return list(queries.values())
+
+
+def deliberate_full_read(command) -> bool:
+    # Loading a whole collection (the search index, the cache versions, a first revocation sync) reads everything anyway
+    return next(iter(command)) == "find" and not command.get("filter") and not command.get("sort")
+
+
+def plan_stages(plan):
+    yield plan.get("stage")
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            yield from plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from plan_stages(child)
+
+
+def winning_stages(explained):
+    # Aggregations nest their query planner output inside the pipeline stages
+    if isinstance(explained, dict):
+        for key, value in explained.items():
+            if key == "winningPlan":
+                yield from plan_stages(value)
+            else:
+                yield from winning_stages(value)
+    elif isinstance(explained, list):
+        for item in explained:
+            yield from winning_stages(item)
+
+
+def test_api_exercised_the_query_paths(recorded_queries):
+    collections = {command[next(iter(command))] for command in recorded_queries}
+    assert {"users", "notices", "events", "timetables", "resources", "faculty", "tombstones",
+            "revoked_tokens", "refresh_families", "notices_archive"} <= collections
+
+
+def test_no_query_does_collscan(seeded_db, recorded_queries):
+    for command in recorded_queries:
+        if deliberate_full_read(command):
+            continue
+        explained = seeded_db.command("explain", command, verbosity="queryPlanner")
+        stages = list(winning_stages(explained))
+        assert "COLLSCAN" not in stages, f"{command} does a COLLSCAN: {stages}"
+
+
+def test_roll_no_index_is_unique(seeded_db):
+    existing = seeded_db.users.find_one({}, {"_id": 0})
+    with pytest.raises(PyMongoError):
+        seeded_db.users.insert_one(dict(existing))
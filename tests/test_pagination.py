@@ -0,0 +1,46 @@
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from pagination import (  # noqa: E402
+    PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX, InvalidCursor, clamp_page_size, date_range, decode_cursor, encode_cursor,
+    keyset_filter,
+)
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor({"date": datetime(2024, 3, 1, 9, 30), "id": "abc"})
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (datetime(2024, 3, 1, 9, 30), "abc")
+
+
+@pytest.mark.parametrize("cursor", ["", "not base64!", "WzEsMl0", "eyJhIjoxfQ"])
+def test_invalid_cursor(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
+
+
+def test_keyset_filter_continues_after_cursor():
+    assert keyset_filter(None) == {}
+    cursor = encode_cursor({"date": datetime(2024, 3, 1), "id": "abc"})
+    assert keyset_filter(cursor) == {"$or": [
+        {"date": {"$lt": datetime(2024, 3, 1)}},
+        {"date": datetime(2024, 3, 1), "id": {"$lt": "abc"}},
+    ]}
+
+
+def test_date_range():
+    assert date_range() == {}
+    assert date_range(datetime(2024, 1, 1)) == {"date": {"$gte": datetime(2024, 1, 1)}}
+    assert date_range(None, datetime(2024, 2, 1)) == {"date": {"$lte": datetime(2024, 2, 1)}}
+
+
+def test_clamp_page_size():
+    assert clamp_page_size(None) == PAGE_SIZE_DEFAULT
+    assert clamp_page_size(0) == PAGE_SIZE_DEFAULT
+    assert clamp_page_size(10) == 10
+    assert clamp_page_size(PAGE_SIZE_MAX + 1) == PAGE_SIZE_MAX
@@ -0,0 +1,45 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from roster_import import RosterTooLarge, iter_lines, iter_rows  # noqa: E402
+
+
+async def chunks(*parts):
+    for part in parts:
+        yield part
+
+
+async def collect(iterator):
+    return [item async for item in iterator]
+
+
+def test_iter_lines_joins_split_lines_and_strips_bom():
+    lines = asyncio.run(collect(iter_lines(chunks("﻿roll_no,name\r\n2473A3".encode(), b"1001,Asha\n2473A31002,Ravi"))))
+    assert lines == ["roll_no,name", "2473A31001,Asha", "2473A31002,Ravi"]
+
+
+def test_iter_lines_enforces_size_limit():
+    with pytest.raises(RosterTooLarge):
+        asyncio.run(collect(iter_lines(chunks(b"a" * 10, b"b" * 10), max_bytes=15)))
+
+
+def test_iter_rows_csv():
+    lines = chunks(" roll_no , name,semester", "2473A31001, Asha ,", "", '2473A31002,"Ravi, K",SEM-3')
+    rows = asyncio.run(collect(iter_rows(lines, "csv")))
+    assert rows == [
+        (1, {"roll_no": "2473A31001", "name": "Asha"}, None),
+        (2, {"roll_no": "2473A31002", "name": "Ravi, K", "semester": "SEM-3"}, None),
+    ]
+
+
+def test_iter_rows_ndjson_reports_bad_lines():
+    lines = chunks('{"roll_no": "2473A31001"}', "[1, 2]", "{broken")
+    rows = asyncio.run(collect(iter_rows(lines, "ndjson")))
+    assert rows[0] == (1, {"roll_no": "2473A31001"}, None)
+    assert rows[1][0] == 2 and rows[1][1] is None and "not a JSON object" in rows[1][2]
+    assert rows[2][0] == 3 and rows[2][1] is None
@@ -0,0 +1,75 @@
+import os
+import sys
+from email.utils import formatdate
+
+import pytest
+from starlette.requests import Request
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from storage import content_disposition, not_modified, parse_range  # noqa: E402
+
+SIZE = 5000
+MTIME = 1_700_000_000.5
+
+
+def request(**headers):
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("bytes=0-2047", (0, 2047)),
+    ("bytes=4000-", (4000, 4999)),
+    ("bytes=4000-9999", (4000, 4999)),
+    ("bytes=-500", (4500, 4999)),
+    ("bytes=-9999", (0, 4999)),
+    ("bytes=5-2", None),
+    ("bytes=0-1,5-6", None),
+    ("bytes=abc", None),
+    ("bytes=-", None),
+    ("bytes=--3", None),
+    ("items=0-1", None),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, SIZE) == expected
+
+
+@pytest.mark.parametrize("header, size", [("bytes=-0", SIZE), ("bytes=5000-", SIZE), ("bytes=0-", 0), ("bytes=-5", 0)])
+def test_parse_range_unsatisfiable(header, size):
+    with pytest.raises(ValueError):
+        parse_range(header, size)
+
+
+def test_not_modified():
+    etag = '"abc"'
+    assert not not_modified(request(), etag, MTIME)
+    assert not_modified(request(if_none_match='"abc"'), etag, MTIME)
+    assert not_modified(request(if_none_match='W/"abc", "def"'), etag, MTIME)
+    assert not not_modified(request(if_none_match='"def"'), etag, MTIME)
+    assert not_modified(request(if_modified_since=formatdate(MTIME, usegmt=True)), etag, MTIME)
+    assert not not_modified(request(if_modified_since=formatdate(MTIME - 60, usegmt=True)), etag, MTIME)
+    assert not not_modified(request(if_modified_since="not a date"), etag, MTIME)
+    # If-None-Match wins over If-Modified-Since
+    assert not not_modified(
+        request(if_none_match='"def"', if_modified_since=formatdate(MTIME, usegmt=True)), etag, MTIME
+    )
+
+
+def test_content_disposition_is_latin1_safe():
+    header = content_disposition('నోట్స్ "unit 1".pdf', "application/pdf")
+    header.encode("latin-1")
+    assert header.startswith("inline; filename*=UTF-8''")
+    assert '"' not in header
+
+
+@pytest.mark.parametrize("content_type, disposition", [
+    ("application/pdf", "inline"),
+    ("image/PNG", "inline"),
+    ("text/html; charset=utf-8", "attachment"),
+    ("image/svg+xml", "attachment"),
+    ("application/octet-stream", "attachment"),
+])
+def test_content_disposition_only_inlines_safe_types(content_type, disposition):
+    assert content_disposition("notes", content_type).startswith(f"{disposition};")
@@ -0,0 +1,82 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from datetime import date  # noqa: E402
+
+from timetable_grid import (  # noqa: E402
+    TIMETABLE_TIMEZONE, _fold, build_grid, feed_key, feed_key_matches, parse_slot, render_calendar, timezone_lines,
+)
+
+
+def entry(entry_id, day, time, subject="AI"):
+    return {"id": entry_id, "day": day, "time": time, "subject": subject}
+
+
+def test_parse_slot():
+    assert parse_slot("09:00-10:00") == (540, 600)
+    assert parse_slot(" 9:30 - 10:15 ") == (570, 615)
+    assert parse_slot("10:00-09:00") is None
+    assert parse_slot("09:75-10:00") is None
+    assert parse_slot("morning") is None
+    assert parse_slot("") is None
+
+
+def test_build_grid_orders_days_and_slots():
+    grid = build_grid("SEM-3", "A", [
+        entry("b", "Monday", "11:00-12:00"),
+        entry("a", "Monday", "09:00-10:00"),
+        entry("c", "Friday", "09:00-10:00"),
+        entry("x", "Sunday", "09:00-10:00"),
+        entry("y", "Tuesday", "whenever"),
+    ])
+    assert [day["day"] for day in grid["days"]] == ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+    assert [e["id"] for e in grid["days"][0]["classes"]] == ["a", "b"]
+    assert [e["id"] for e in grid["unscheduled"]] == ["x", "y"]
+    assert grid["clashes"] == []
+
+
+def test_build_grid_finds_clashes_with_longest_earlier_class():
+    grid = build_grid("SEM-3", "A", [
+        entry("long", "Monday", "09:00-12:00"),
+        entry("short", "Monday", "09:30-10:00"),
+        entry("late", "Monday", "11:00-12:30"),
+        entry("after", "Monday", "12:30-13:00"),
+    ])
+    assert [clash["entries"] for clash in grid["clashes"]] == [["long", "short"], ["long", "late"]]
+
+
+def test_fold_keeps_lines_within_75_octets_and_characters_whole():
+    assert _fold("SUMMARY:short") == "SUMMARY:short"
+    line = "SUMMARY:" + "అ" * 60
+    folded = _fold(line)
+    parts = folded.split("\r\n")
+    assert all(len(part.encode()) <= 75 for part in parts)
+    assert all(part.startswith(" ") for part in parts[1:])
+    assert "".join(part[1:] if i else part for i, part in enumerate(parts)) == line
+
+
+def test_feed_key():
+    key = feed_key("secret", "SEM-3", "A")
+    assert feed_key_matches("secret", "SEM-3", "A", key)
+    assert not feed_key_matches("secret", "SEM-3", "B", key)
+    assert not feed_key_matches("secret", "SEM-3", "A", None)
+
+
+def test_calendar_defines_its_timezone():
+    grid = build_grid("SEM-3", "A", [entry("a", "Monday", "09:00-10:00", "Machine Learning")])
+    feed = render_calendar(grid).decode()
+    assert feed.endswith("END:VCALENDAR\r\n")
+    assert f"BEGIN:VTIMEZONE\r\nTZID:{TIMETABLE_TIMEZONE}\r\n" in feed
+    assert feed.index("END:VTIMEZONE") < feed.index("BEGIN:VEVENT")
+    assert f"DTSTART;TZID={TIMETABLE_TIMEZONE}:" in feed
+
+
+def test_timezone_lines_follow_daylight_saving():
+    lines = timezone_lines("Europe/London", date(2024, 1, 1), date(2024, 12, 31))
+    assert lines[:2] == ("BEGIN:VTIMEZONE", "TZID:Europe/London")
+    daylight = lines.index("BEGIN:DAYLIGHT")
+    assert lines[daylight + 1:daylight + 4] == ("DTSTART:20240331T010000", "TZOFFSETFROM:+0000", "TZOFFSETTO:+0100")
+    assert "DTSTART:20241027T020000" in lines
+    assert timezone_lines("Asia/Kolkata", date(2024, 1, 1), date(2024, 12, 31)).count("TZOFFSETTO:+0530") == 1
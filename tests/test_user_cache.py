@@ -0,0 +1,24 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from response_cache import response_cache  # noqa: E402
+from user_cache import USERS_VERSION, UserCache  # noqa: E402
+
+
+def test_users_version_bump_invalidates_every_entry():
+    cache = UserCache(max_size=10, ttl_seconds=300)
+    cache.set("2473A31001", {"role": "admin"})
+    assert cache.get("2473A31001") == {"role": "admin"}
+    # What a mark_changed(USERS_VERSION) here, or a version sync after one on another worker, does
+    response_cache.bump(USERS_VERSION)
+    assert cache.get("2473A31001") is None
+
+
+def test_entry_read_before_a_bump_is_stale():
+    cache = UserCache(max_size=10, ttl_seconds=300)
+    version = cache.version()
+    response_cache.bump(USERS_VERSION)
+    cache.set("2473A31001", {"role": "admin"}, version)
+    assert cache.get("2473A31001") is None